@@ -1,102 +1,57 @@
-from flask import Flask, request, jsonify
-from flask_socketio import SocketIO
+import async_runtime
+if __name__ == '__main__':
+    # Before anything below imports socket, see async_runtime.py. Only when run as the server:
+    # frame workers are spawned and import this module again, as __mp_main__
+    async_runtime.patch()
+
+from flask import Flask, Blueprint, current_app, request, jsonify
+from flask_socketio import SocketIO, join_room
 from flask_cors import CORS
-from pypdf import PdfReader
 import re
-import chromadb
 import os
 import json
-import google.generativeai as genai
 from dotenv import load_dotenv
 from werkzeug.utils import secure_filename
 import tempfile
-import io
-import base64
-from google.cloud import speech, vision
-from pydub import AudioSegment
-from kafka import KafkaProducer, KafkaConsumer
 import threading
-import time
 import traceback
-from datetime import datetime
 from urllib.parse import urlparse
-from bs4 import BeautifulSoup
-import requests
 from flask_sqlalchemy import SQLAlchemy
 from werkzeug.security import generate_password_hash, check_password_hash
 import jwt
 import datetime
 from functools import wraps
-import cv2
-from PIL import Image
-import numpy as np
-from deepface import DeepFace
-import mediapipe as mp
-from scipy.spatial import distance
-import queue
 import logging 
 import socket
+import itertools
+from async_runtime import in_loop, offload
+from audio_decoder import StreamDecoder, container_format, is_wav
+from audio_dsp import prepare_speech_audio, prepare_speech_pcm
+from event_bus import create_event_bus
+from frame_workers import FrameWorkerPool
+from google_clients import GoogleClients
+from media_channel import MEDIA_MAX_AUDIO_BYTES, MediaChannel
+from prosody import ProsodyTracker, extract_prosody, fuse_engagement
+from readiness import Readiness
+from session_executor import SessionExecutor
+from session_registry import SessionRegistry
+from speech_analytics import SpeechAnalytics
+from vad import VoiceActivityDetector
+from speech_stream import FakeSpeechBackend, GoogleSpeechBackend, SpeechSession
+from timeline import EngagementTimeline
+from transcript import TranscriptAssembler
+from update_coalescer import UpdateCoalescer
+
+# Heavy clients (chromadb, Gemini, Google Cloud, Kafka) are imported
+# where they are first used or during warm-up, so importing this module
+# stays cheap and does not need any external service to be up.
 
 
 load_dotenv()
 
-# Initialize Flask app
-app = Flask(__name__)
-app.config['SECRET_KEY'] = os.getenv("SECRET_KEY")
-app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("DATABASE_URL", "sqlite:///site.db")
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-db = SQLAlchemy(app)
-CORS(app, resources={
-    r"/api/*": {
-        "origins": ["http://localhost:3000"],
-        "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"],
-        "expose_headers": ["X-Custom-Header"],
-        "supports_credentials": True,  # If using cookies/auth
-        "max_age": 86400  # Cache preflight for 24 hours
-    },
-    r"/generate_questions": {
-        "origins": ["http://localhost:3000"],  # Your React app's origin
-        "methods": ["POST", "OPTIONS"],  # Allowed methods
-        "allow_headers": ["Content-Type"]
-    },
-    r"/*": {  # Apply to all routes
-        "origins": ["http://localhost:3000"],  # Your React app
-        "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-        "allow_headers": ["Content-Type", "Authorization"],
-        "supports_credentials": True
-    }
-})
-
-
-socketio = SocketIO(app, cors_allowed_origins="*", async_mode="threading")  # Changed to threading mode
-
-# Initialize Face Analysis components
-mp_face_mesh = mp.solutions.face_mesh
-face_mesh = mp_face_mesh.FaceMesh(
-    min_detection_confidence=0.5,
-    min_tracking_confidence=0.5,
-    static_image_mode=False
-)
-
-
-# Emotion weights for engagement score calculation
-emotion_weights = {
-    "happy": 1.0, "surprise": 0.8, "neutral": 0.5,
-    "angry": 0.2, "sad": 0.1, "fear": 0.3, "disgust": 0.2
-}
-
-# Landmark indices
-LEFT_EYE = [33, 160, 158, 133, 153, 144]
-RIGHT_EYE = [362, 385, 387, 263, 373, 380]
-NOSE_TIP = 1
-CHIN = 199
-LEFT_EAR = 234
-RIGHT_EAR = 454
-
-# Frame processing queue
-frame_queue = queue.Queue(maxsize=10)
-result_queue = queue.Queue()
+db = SQLAlchemy()
+socketio = SocketIO()
+bp = Blueprint('interview', __name__)
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -105,119 +60,54 @@ logger.setLevel(logging.INFO)
 handler = logging.StreamHandler()
 handler.setLevel(logging.INFO)
 
-class FaceAnalyzer:
-    def __init__(self):
-        self.prev_face_center = None
-        self.blink_counter = 0
-        self.start_time = time.time()
-        self.engagement_history = []
-        self.last_emotion = "neutral"
-        self.frame_count = 0
-        self.skip_frames = 2  # Process every 3rd frame
-
-    def eye_aspect_ratio(self, landmarks, eye_points):
-        A = distance.euclidean(landmarks[eye_points[1]], landmarks[eye_points[5]])
-        B = distance.euclidean(landmarks[eye_points[2]], landmarks[eye_points[4]])
-        C = distance.euclidean(landmarks[eye_points[0]], landmarks[eye_points[3]])
-        return (A + B) / (2.0 * C)
-
-    def calculate_head_tilt(self, landmarks):
-        nose = landmarks[NOSE_TIP]
-        chin = landmarks[CHIN]
-        left_ear = landmarks[LEFT_EAR]
-        right_ear = landmarks[RIGHT_EAR]
-        vertical_angle = abs(nose[1] - chin[1]) / abs(left_ear[0] - right_ear[0] + 1e-6)
-        return -0.5 if vertical_angle < 0.8 else 0.0
-
-    def calculate_engagement(self, emotion, blinks_per_sec, head_movement, head_tilt_score):
-        emotion_score = emotion_weights.get(emotion, 0)
-        blink_score = min(blinks_per_sec / 5, 1.0)
-        movement_score = max(1.0 - min(head_movement / 50, 1.0), 0.1)
-        final_score = (0.5 * emotion_score) + (0.2 * blink_score) + (0.3 * movement_score) + (0.2 * head_tilt_score)
-        return max(0.0, min(final_score, 1.0))
-
-    def process_frame(self, frame):
-        self.frame_count += 1
-        if self.frame_count % (self.skip_frames + 1) != 0:
-            return None
-        
-        try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = face_mesh.process(rgb_frame)
-            
-            dominant_emotion = self.last_emotion
-            head_movement = 0
-            head_tilt_score = 0
-            ear = 0.3  # Default
-            
-            if results.multi_face_landmarks:
-                for face_landmarks in results.multi_face_landmarks:
-                    landmarks = {i: (lm.x * frame.shape[1], lm.y * frame.shape[0]) 
-                               for i, lm in enumerate(face_landmarks.landmark)}
-                    
-                    leftEAR = self.eye_aspect_ratio(landmarks, LEFT_EYE)
-                    rightEAR = self.eye_aspect_ratio(landmarks, RIGHT_EYE)
-                    ear = (leftEAR + rightEAR) / 2.0
-                    
-                    if ear < 0.25:
-                        self.blink_counter += 1
-                    
-                    face_center = np.mean([landmarks[i] for i in range(468)], axis=0)
-                    if self.prev_face_center is not None:
-                        head_movement = np.linalg.norm(np.array(face_center) - np.array(self.prev_face_center))
-                    self.prev_face_center = face_center
-                    head_tilt_score = self.calculate_head_tilt(landmarks)
-            
-            elapsed_time = time.time() - self.start_time
-            blinks_per_sec = self.blink_counter / elapsed_time if elapsed_time > 0 else 0
-            
-            if elapsed_time > 10:
-                self.blink_counter = 0
-                self.start_time = time.time()
-            
-            if self.frame_count % 15 == 0:
-                try:
-                    result = DeepFace.analyze(frame, actions=['emotion'], enforce_detection=False)
-                    self.last_emotion = result[0]['dominant_emotion']
-                except Exception as e:
-                    logger.error(f"Emotion detection error: {str(e)}")
-                    self.last_emotion = "neutral"
-            
-            engagement_score = self.calculate_engagement(
-                self.last_emotion,
-                blinks_per_sec,
-                head_movement,
-                head_tilt_score
-            )
-            
-            self.engagement_history.append(engagement_score)
-            if len(self.engagement_history) > 5:
-                self.engagement_history.pop(0)
-            
-            return {
-                "status": "success",
-                "engagement_score": np.mean(self.engagement_history[-5:]) if self.engagement_history else 0,
-                "emotion": self.last_emotion,
-                "positivity_score": self.calculate_positivity(self.last_emotion, engagement_score)
-            }
-            
-        except Exception as e:
-            logger.error(f"Frame processing error: {str(e)}")
-            return {
-                "status": "error",
-                "error": str(e)
-            }
+# Process-wide workers and channels, created by start_services() when the app is built rather than on import
+updates = interim_transcripts = frame_pool = audio_executor = media_channel = event_bus = None
+
+def emit_frame_result(session_id, result):
+    """Record an analysed frame and push it to its own session's Socket.IO room"""
+    # The frame's credit goes back at once, even if its update waits to be coalesced. Frames
+    # posted to /send_video never took one.
+    if result.get('credit'):
+        media_channel.return_credit(session_id)
+    if result.get('status') == 'skipped':
+        return
+    if result.get('status') != 'success':
+        emit_to_session(session_id, 'analysis_error', {'error': result.get('error'), 'seq': result.get('seq')})
+        return
+    tracker = prosody_trackers.peek(session_id)
+    vocal = tracker.current() if tracker is not None else None
+    fused_engagement = fuse_engagement(result['engagement_score'], vocal)
+    timelines.get(session_id).append(
+        result['engagement_score'],
+        result['emotion'],
+        result.get('blink_rate', 0.0),
+        result.get('head_movement', 0.0),
+        result['positivity_score'],
+        fused_engagement=fused_engagement
+    )
+    updates.update(session_id, {
+        'engagement_score': result['engagement_score'],
+        'vocal_engagement': vocal['vocal_engagement'] if vocal is not None else None,
+        'fused_engagement_score': fused_engagement,
+        'emotion': result['emotion'],
+        'positivity_score': result['positivity_score'],
+        'analysis_mode': result.get('analysis_mode'),
+        'seq': result.get('seq')
+    })
 
-    def calculate_positivity(self, emotion, engagement_score):
-        emotion_weights = {
-            "happy": 1.0, "surprise": 0.8, "neutral": 0.8,
-            "sad": 0.3, "angry": 0.1, "fear": 0.2, "disgust": -0.1
-        }
-        emotion_score = emotion_weights.get(emotion, 0.5)
-        return (0.6 * emotion_score) + (0.4 * engagement_score)
+def emit_to_session(session_id, event, payload):
+    # Sessions streaming over the media namespace get results (and credits) back on it
+    if not media_channel.send(session_id, event, payload):
+        socketio.emit(event, payload, to=session_id)
+
+# Per-session engagement timelines, kept for the whole interview
+timelines = SessionRegistry(EngagementTimeline, max_sessions=1024, idle_timeout=3600, label="timeline")
+
+# Per-session voice prosody, fused into the engagement stream while the candidate is speaking
+prosody_trackers = SessionRegistry(ProsodyTracker, max_sessions=1024, idle_timeout=3600, label="prosody")
 
-# Initialize analyzer
-analyzer = FaceAnalyzer()
+# Per-session frame sequence numbers
+frame_sequences = SessionRegistry(lambda: itertools.count(1), max_sessions=4096, label="frame sequence")
 
 # User Model
 class User(db.Model):
@@ -230,10 +120,6 @@ class User(db.Model):
         return f'<User {self.email}>'
 
 
-# Create tables
-with app.app_context():
-    db.create_all()
-
 # Auth Decorator
 def token_required(f):
     @wraps(f)
@@ -242,57 +128,189 @@ def token_required(f):
         if not token:
             return jsonify({'message': 'Token is missing!'}), 401
         try:
-            data = jwt.decode(token.split()[1], app.config['SECRET_KEY'], algorithms=["HS256"])
+            data = jwt.decode(token.split()[1], current_app.config['SECRET_KEY'], algorithms=["HS256"])
             current_user = User.query.get(data['user_id'])
         except:
             return jsonify({'message': 'Token is invalid!'}), 401
         return f(current_user, *args, **kwargs)
     return decorated
 
-def process_frames():
-    """Worker thread for processing frames"""
-    while True:
-        try:
-            frame = frame_queue.get(timeout=1)
-            if frame is None:
-                break
-                
-            result = analyzer.process_frame(frame)
-            if result:
-                result_queue.put(result)
-        except queue.Empty:
-            continue
-        except Exception as e:
-            logger.error(f"Processing thread error: {str(e)}")
+def get_session_id():
+    """Interview session the current request belongs to"""
+    return (request.form.get('session_id')
+            or request.args.get('session_id')
+            or request.headers.get('X-Session-ID')
+            or 'default')
+
+@socketio.on('connect')
+def handle_connect():
+    # Clients that pass ?session_id= get their session's updates without a separate join
+    if request.args.get('session_id'):
+        join_room(request.args['session_id'])
+
+@socketio.on('join_session')
+def handle_join_session(data):
+    session_id = (data or {}).get('session_id')
+    if not session_id:
+        return {'status': 'error', 'error': 'session_id is required'}
+    join_room(session_id)
+    return {'status': 'joined', 'session_id': session_id}
+
+AUDIO_WORKERS = int(os.getenv("AUDIO_WORKERS", "4"))
+AUDIO_MAX_BACKLOG = int(os.getenv("AUDIO_MAX_BACKLOG", "8"))
+# Continuation slices of a compressed recording cannot be skipped, so they queue past AUDIO_MAX_BACKLOG up to this
+AUDIO_MAX_STREAM_BACKLOG = int(os.getenv("AUDIO_MAX_STREAM_BACKLOG", "120"))
+
+VAD_ENABLED = os.getenv("VAD_ENABLED", "true").lower() == "true"
+PROSODY_ENABLED = os.getenv("PROSODY_ENABLED", "true").lower() == "true"
+
+# Silent chunks are dropped and the rest trimmed before they reach the speech API
+vad = VoiceActivityDetector() if VAD_ENABLED else None
+
+# Compressed browser audio is decoded by one long-lived ffmpeg process per session and recording
+audio_decoders = SessionRegistry(None, max_sessions=256, idle_timeout=300, label="audio decoder")
+
+# Sessions whose latest recording was rejected at its header; its other slices have nothing to decode them
+_rejected_recordings = set()
+_rejected_lock = threading.Lock()
+
+def submit_audio_chunk(session_id, audio_bytes):
+    """Queue a WAV or WebM/Ogg Opus chunk for the session's recognizer; False if it is too far behind.
+
+    Only WAV chunks and the header chunks that start a recording are turned
+    away at AUDIO_MAX_BACKLOG. A recording's later slices cannot be decoded
+    without the ones before them, so they are only rejected past
+    AUDIO_MAX_STREAM_BACKLOG, which takes a client sending faster than it records.
+    """
+    if is_wav(audio_bytes):
+        return audio_executor.submit(session_id, process_audio, audio_bytes, session_id)
+    with _rejected_lock:
+        if container_format(audio_bytes) is not None:
+            queued = audio_executor.submit(session_id, process_audio, audio_bytes, session_id)
+            if queued:
+                _rejected_recordings.discard(session_id)
+            else:
+                # Keep its slices out of the previous recording's decoder
+                _rejected_recordings.add(session_id)
+            return queued
+        if session_id in _rejected_recordings:
+            return False
+        return audio_executor.submit(session_id, process_audio, audio_bytes, session_id,
+                                     max_backlog=AUDIO_MAX_STREAM_BACKLOG)
 
 # Configure upload folder
 UPLOAD_FOLDER = tempfile.gettempdir()
-app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
 
 # Configure Google services
 if os.getenv("GOOGLE_APPLICATION_CREDENTIALS"):
     os.environ["GOOGLE_APPLICATION_CREDENTIALS"] = os.getenv("GOOGLE_APPLICATION_CREDENTIALS")
 
-# Initialize Gemini
-genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
-gemini_model = genai.GenerativeModel("learnlm-1.5-pro-experimental")
+# Shared Socket.IO queue (e.g. redis://...) so a node can emit to rooms whose clients are on another node
+SOCKETIO_MESSAGE_QUEUE = os.getenv("SOCKETIO_MESSAGE_QUEUE") or None
+
+WARMUP_TIMEOUT = float(os.getenv("WARMUP_TIMEOUT", "300"))
+
+# Where `python app.py` listens; SOCKETIO_ASYNC_MODE (async_runtime.py) picks the server behind it
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", "5000"))
+SERVER_DEBUG = os.getenv("SERVER_DEBUG", "true").lower() == "true"
+
+# Lazily created clients, see get_gemini_model()
+_gemini_model = None
+_clients_lock = threading.Lock()
+
+def get_gemini_model():
+    global _gemini_model
+    with _clients_lock:
+        if _gemini_model is None:
+            import google.generativeai as genai
+            genai.configure(api_key=os.getenv("GOOGLE_API_KEY"))
+            _gemini_model = genai.GenerativeModel("learnlm-1.5-pro-experimental")
+        return _gemini_model
+
+# Shared Speech/Vision clients, one gRPC channel each per process
+google_clients = GoogleClients()
+
+# Speech recognition: "google", or "fake" to run without credentials
+SPEECH_BACKEND = os.getenv("SPEECH_BACKEND", "google")
+_speech_backend = None
+
+def get_speech_backend():
+    global _speech_backend
+    with _clients_lock:
+        if _speech_backend is None:
+            _speech_backend = FakeSpeechBackend() if SPEECH_BACKEND == "fake" else GoogleSpeechBackend(google_clients)
+        return _speech_backend
+
+# Per-session final transcripts, in order and without words recognised twice
+transcripts = SessionRegistry(TranscriptAssembler, max_sessions=1024, idle_timeout=3600, label="transcript")
+
+# Per-session speaking rate, pauses, fillers and low-confidence spans
+speech_analytics = SessionRegistry(SpeechAnalytics, max_sessions=1024, idle_timeout=3600, label="speech analytics")
+
+# Orders interim transcripts leaving the coalescer against the finals that supersede them
+_transcript_lock = threading.Lock()
+
+def emit_interim_transcript(session_id, payload):
+    """Send a coalesced interim, unless a final arrived after it was produced"""
+    version = payload.pop('seq', 0)
+    with _transcript_lock:
+        assembler = transcripts.peek(session_id)
+        if assembler is not None and version < assembler.finals:
+            return
+        socketio.emit('transcript', payload, to=session_id)
+
+def emit_transcript(session_id, result):
+    """Push an interim transcript, or the new in-order segments of a final one, to the session"""
+    if not result.is_final:
+        # Versioned by the finals seen so far, so an interim already on its way is dropped once a final is out
+        interim_transcripts.update(session_id, {
+            'text': result.text,
+            'is_final': False,
+            'confidence': result.confidence,
+            'seq': transcripts.get(session_id).finals
+        })
+        return
+
+    # Finals go out immediately; a pending interim they supersede is dropped
+    interim_transcripts.discard(session_id)
+    with _transcript_lock:
+        segments = transcripts.get(session_id).add(result)
+        for segment in segments:
+            socketio.emit('transcript', {
+                'text': segment.text,
+                'is_final': True,
+                'confidence': result.confidence
+            }, to=session_id)
+    if not segments:
+        return
+    analytics = speech_analytics.get(session_id)
+    for segment in segments:
+        analytics.add(segment)
+        event_bus.publish('interview_transcripts', {
+            'session_id': session_id,
+            'transcript': segment.text,
+            'confidence': result.confidence,
+            'is_final': True
+        })
+    event_bus.publish('interview_updates', {'session_id': session_id, 'speech_metrics': analytics.snapshot()})
 
-# Initialize Kafka
-KAFKA_BROKER = os.getenv("KAFKA_BROKER", "localhost:9092")
-producer = KafkaProducer(
-    bootstrap_servers=KAFKA_BROKER,
-    value_serializer=lambda v: json.dumps(v).encode('utf-8')
+# One streaming recognizer per interview, fed as audio chunks arrive
+speech_sessions = SessionRegistry(
+    lambda session_id: SpeechSession(get_speech_backend(),
+                                     in_loop(lambda result: emit_transcript(session_id, result))),
+    max_sessions=256, idle_timeout=900, label="speech session", keyed=True
 )
 
 # Global variables for live interview
-latest_transcript = ""
-candidate_answer = ""
 latest_positivity_score = 0.5
 current_question_index = 0
 interview_questions = []
 
 class GeminiEmbeddingFunction:
     def __call__(self, input):
+        import google.generativeai as genai
+        get_gemini_model()  # Ensures the API key is configured
         return genai.embed_content(
             model="models/embedding-001",
             content=input,
@@ -314,6 +332,9 @@ def scrape_company_info(url, timeout=20, max_retries=2):
     - Improved content extraction
     - Comprehensive error handling
     """
+    import requests
+    from bs4 import BeautifulSoup
+
     def is_valid_url(url):
         try:
             result = urlparse(url)
@@ -413,6 +434,7 @@ def scrape_company_info(url, timeout=20, max_retries=2):
         session.close()
 
 def process_pdf(file_path):
+    from pypdf import PdfReader
     reader = PdfReader(file_path)
     text = ""
     for page in reader.pages:
@@ -420,6 +442,7 @@ def process_pdf(file_path):
     return re.split('\n \n', text)
 
 def create_chroma_db(documents, path, name):
+    import chromadb
     chroma_client = chromadb.PersistentClient(path=path)
     try:
         chroma_client.delete_collection(name)
@@ -478,7 +501,7 @@ Return only **valid JSON** in the following format, with **exactly** 10 question
         """
 
         
-        response = gemini_model.generate_content(prompt)
+        response = get_gemini_model().generate_content(prompt)
         response_text = response.text.strip()
         
         # Clean response
@@ -494,109 +517,73 @@ Return only **valid JSON** in the following format, with **exactly** 10 question
         raise
 
 
-# Kafka Consumer Function
-def kafka_consumer():
-    consumer = KafkaConsumer(
-        'interview_updates',
-        bootstrap_servers=KAFKA_BROKER,
-        auto_offset_reset='latest',
-        value_deserializer=lambda x: json.loads(x.decode('utf-8')))
-    
-    for message in consumer:
-        data = message.value
-        if 'transcript' in data:
-            socketio.emit('update', {'transcript': data['transcript']})
-        elif 'positivity_score' in data:
-            socketio.emit('update', {'positivity_score': data['positivity_score']})
-
-# Start Kafka consumer in a separate thread
-kafka_thread = threading.Thread(target=kafka_consumer)
-kafka_thread.daemon = True
-kafka_thread.start()
+def deliver_update(event, session_id):
+    """Merge an interview_updates event into its own session's next update only"""
+    if session_id is None:
+        logger.warning("Dropping update without a session id")
+        return
+    updates.update(session_id, {key: value for key, value in event.items() if key != 'session_id'})
 
 # Audio/Video Processing Functions
-def convert_audio(audio_bytes):
-    audio = AudioSegment.from_wav(io.BytesIO(audio_bytes))
-    if audio.channels > 1:
-        audio = audio.set_channels(1)  # Convert to mono
-    audio = audio.set_frame_rate(16000)  # Standard sample rate for speech recognition
-    audio = audio.set_sample_width(2)  # 16-bit samples
-    audio = audio.high_pass_filter(80)  # Remove low-frequency noise
-    audio = audio.low_pass_filter(8000)  # Remove high-frequency noise
-    buffer = io.BytesIO()
-    audio.export(buffer, format="wav", parameters=[
-        "-ac", "1",          # Mono channel
-        "-ar", "16000",      # Sample rate
-        "-acodec", "pcm_s16le"  # 16-bit PCM
-    ])
-    return buffer.getvalue()
-
-def process_audio(audio_bytes):
-    global latest_transcript, candidate_answer
+def feed_speech(session_id, prepared):
+    # Transcripts are emitted by the session as the recognizer produces them. Chunks trimmed
+    # to nothing are fed too, so the silence still counts towards the session's timing.
+    speech_sessions.get(session_id).feed(prepared.pcm, prepared.offset, prepared.duration)
+
+def prosody_observer(session_id):
+    """Measures each prepared chunk's prosody for the session and pushes the smoothed result"""
+    if not PROSODY_ENABLED:
+        return None
+
+    def observe(mono, rate):
+        try:
+            features = extract_prosody(mono, rate)
+            if features is not None:
+                report = prosody_trackers.get(session_id).push(features)
+                event_bus.publish('interview_updates', {'session_id': session_id, 'prosody': report})
+        except Exception as e:
+            logger.error(f"Prosody error: {str(e)}")
+    return observe
+
+def process_audio(audio_bytes, session_id='default'):
     try:
-        mono_audio = convert_audio(audio_bytes)
-        
-        client = speech.SpeechClient()
-        audio = speech.RecognitionAudio(content=mono_audio)
-        
-        config = speech.RecognitionConfig(
-            encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
-            sample_rate_hertz=16000,
-            language_code="en-US",
-            enable_automatic_punctuation=True,
-            model="latest_long",
-            use_enhanced=True,
-            audio_channel_count=1,
-            enable_word_confidence=True,
-            enable_word_time_offsets=True
-        )
-        
-        # Increase timeout for larger chunks
-        operation = client.long_running_recognize(config=config, audio=audio)
-        response = operation.result(timeout=15)  # Increased from 10 to 15 seconds
-        
-        if response.results:
-            transcript_piece = " ".join([result.alternatives[0].transcript 
-                                      for result in response.results])
-            candidate_answer += " " + transcript_piece
-            producer.send('interview_updates', {
-                'transcript': transcript_piece,
-                'positivity_score': latest_positivity_score,
-                'is_final': True
-            })
-            
+        if is_wav(audio_bytes):
+            feed_speech(session_id, prepare_speech_audio(audio_bytes, vad=vad, observe=prosody_observer(session_id)))
+            return
+
+        input_format = container_format(audio_bytes)
+        if input_format is not None:
+            # A new recording starts with its container header; replacing the
+            # previous decoder flushes that recording's tail first
+            observe = prosody_observer(session_id)
+            decoder = StreamDecoder(
+                input_format,
+                lambda pcm: feed_speech(session_id, prepare_speech_pcm(pcm, vad=vad, observe=observe))
+            )
+            audio_decoders.put(session_id, decoder)
+        else:
+            decoder = audio_decoders.peek(session_id, touch=True)
+            if decoder is None:
+                raise ValueError("Compressed audio must start with a WebM or Ogg header")
+        if not decoder.feed(audio_bytes):
+            raise RuntimeError("Audio decoder exited")
+
     except Exception as e:
-        producer.send('interview_errors', {
+        event_bus.publish('interview_errors', {
+            'session_id': session_id,
             'error': str(e),
             'type': 'audio_processing'
         })
 
 
-def preprocess_audio(audio_bytes):
-    """Improved audio preprocessing without equalize"""
-    audio = AudioSegment.from_wav(io.BytesIO(audio_bytes))
-    
-    # Normalize volume
-    audio = audio.normalize()
-    
-    # Apply noise reduction
-    audio = audio.low_pass_filter(8000).high_pass_filter(80)
-    
-    # Simple volume boost instead of equalization
-    audio = audio + 3  # Boost volume by 3dB
-    
-    buffer = io.BytesIO()
-    audio.export(buffer, format="wav")
-    return buffer.getvalue()
-
-def process_video(image_bytes):
+def process_video(image_bytes, session_id='default'):
     global latest_positivity_score
+    from google.cloud import vision
     try:
-        producer.send('video_stream', {'image': base64.b64encode(image_bytes).decode('utf-8')})
+        event_bus.publish('video_stream', image_bytes, session_id=session_id)
         
-        client = vision.ImageAnnotatorClient()
         image = vision.Image(content=image_bytes)
-        response = client.face_detection(image=image)
+        response = google_clients.call("vision", "face_detection", image=image)
         if response.face_annotations:
             face = response.face_annotations[0]
             emotions = {
@@ -606,12 +593,15 @@ def process_video(image_bytes):
             }
             positivity_score = (emotions["joy"] - emotions["anger"] - emotions["sorrow"]) / 4
             latest_positivity_score = max(0, min(1, positivity_score))
-            producer.send('interview_updates', {'positivity_score': latest_positivity_score})
+            event_bus.publish('interview_updates', {
+                'session_id': session_id,
+                'positivity_score': latest_positivity_score
+            })
     except Exception as e:
-        producer.send('interview_errors', {'error': str(e)})
+        event_bus.publish('interview_errors', {'session_id': session_id, 'error': str(e)})
 
 #  Routes
-@app.route('/generate_questions', methods=['POST'])
+@bp.route('/generate_questions', methods=['POST'])
 def generate_questions_endpoint():
     global interview_questions, current_question_index
     if 'resume' not in request.files:
@@ -624,7 +614,7 @@ def generate_questions_endpoint():
     try:
         # Save resume
         filename = secure_filename(file.filename)
-        filepath = os.path.join(app.config['UPLOAD_FOLDER'], filename)
+        filepath = os.path.join(current_app.config['UPLOAD_FOLDER'], filename)
         file.save(filepath)
         
         # Get form data
@@ -641,16 +631,16 @@ def generate_questions_endpoint():
         if not all([form_data['jobRole'], form_data['company'], form_data['jobDescription']]):
             return jsonify({"error": "Missing required fields"}), 400
         
-        # Process resume and company info
-        resume_text = process_pdf(filepath)
-        company_text = scrape_company_info(form_data['companyWebsite']) if is_valid_url(form_data['companyWebsite']) else ""
+        # Process resume and company info; the slow steps run off the event loop
+        resume_text = offload(process_pdf, filepath)
+        company_text = offload(scrape_company_info, form_data['companyWebsite']) if is_valid_url(form_data['companyWebsite']) else ""
         all_documents = resume_text + [company_text] if company_text else resume_text
         
         # Create vector store
-        db = create_chroma_db(all_documents, app.config['UPLOAD_FOLDER'], "interview_data")
+        db = offload(create_chroma_db, all_documents, current_app.config['UPLOAD_FOLDER'], "interview_data")
         
         # Generate questions using RAG
-        questions_data = generate_questions_with_rag(db, form_data)
+        questions_data = offload(generate_questions_with_rag, db, form_data)
         
         # Validate questions
         if not questions_data.get('questions'):
@@ -687,26 +677,24 @@ def generate_questions_endpoint():
             os.remove(filepath)
 
 
-@app.route('/send_audio', methods=['POST'])
+@bp.route('/send_audio', methods=['POST'])
 def handle_audio():
     if 'audio' not in request.files:
         return jsonify({"error": "No audio file"}), 400
     
     try:
         audio_bytes = request.files['audio'].read()
-        processed_audio = preprocess_audio(audio_bytes)
-        
-        # Process in background with increased timeout
-        threading.Thread(
-            target=process_audio,
-            args=(processed_audio,),
-            daemon=True
-        ).start()
-        
+        session_id = get_session_id()
+        if not submit_audio_chunk(session_id, audio_bytes):
+            logger.warning(f"Audio backlog full for session {session_id} - rejecting chunk")
+            return jsonify({
+                "status": "throttled",
+                "error": "Too many audio chunks queued for this session"
+            }), 429, {"Retry-After": "1"}
+
         return jsonify({
             "status": "processing",
-            "chunk_size": len(processed_audio),
-            "chunk_duration": 5.0  # Indicate the expected duration in seconds
+            "queued": audio_executor.backlog(session_id)
         })
     except Exception as e:
         return jsonify({
@@ -716,41 +704,28 @@ def handle_audio():
     
 
 
-# Start processing thread
-processing_thread = threading.Thread(target=process_frames, daemon=True)
-processing_thread.start()
-
-
-@app.route('/send_video', methods=['POST'])
+@bp.route('/send_video', methods=['POST'])
 def handle_video():
     if 'video' not in request.files:
         return jsonify({"error": "No video file provided"}), 400
     
     try:
         image_bytes = request.files['video'].read()
-        if len(image_bytes) > 5 * 1024 * 1024:
+        if len(image_bytes) > frame_pool.slot_bytes:
             return jsonify({"error": "File too large"}), 413
-            
-        image = Image.open(io.BytesIO(image_bytes))
-        frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)
-        
-        try:
-            frame_queue.put(frame, block=False)
-        except queue.Full:
+
+        session_id = get_session_id()
+        seq = next(frame_sequences.get(session_id))
+
+        # Frames stay compressed until a worker decodes them; the result is
+        # pushed to the session's Socket.IO room tagged with the same seq
+        if not frame_pool.submit(session_id, image_bytes, seq):
             logger.warning("Frame queue full - dropping frame")
-            return jsonify({"status": "queued"})
-        
-        try:
-            result = result_queue.get_nowait()
-            socketio.emit('update', {
-                'engagement_score': result['engagement_score'],
-                'emotion': result['emotion'],
-                'positivity_score': result['positivity_score']
-            })
-            return jsonify(result)
-        except queue.Empty:
-            return jsonify({"status": "processing"})
-            
+            return jsonify({"status": "dropped", "session_id": session_id, "seq": seq})
+
+        return jsonify({"status": "queued", "session_id": session_id, "seq": seq})
+
+
     except Exception as e:
         logger.error(f"Video endpoint error: {str(e)}")
         return jsonify({
@@ -758,8 +733,42 @@ def handle_video():
             "error": str(e)
         }), 500
 
+
+@bp.route('/session/<session_id>/timeline', methods=['GET'])
+def get_session_timeline(session_id):
+    """Engagement timeline for a session, downsampled to ?resolution= buckets"""
+    timeline = timelines.peek(session_id)
+    if timeline is None:
+        return jsonify({"error": "Unknown session"}), 404
+
+    # Without a default, type=int gives None for a value that is not a number
+    resolution = request.args.get('resolution', type=int) if 'resolution' in request.args else 100
+    if resolution is None or not 1 <= resolution <= 5000:
+        return jsonify({"error": "resolution must be between 1 and 5000"}), 400
+
+    tracker = prosody_trackers.peek(session_id)
+    return jsonify({
+        "session_id": session_id,
+        **timeline.summary(),
+        "prosody": tracker.summary() if tracker is not None else None,
+        "series": timeline.series(resolution)
+    })
+
     
-@app.route('/analyze_response', methods=['POST'])
+@bp.route('/session/<session_id>/transcript', methods=['GET'])
+def get_session_transcript(session_id):
+    transcript = transcripts.peek(session_id)
+    if transcript is None:
+        return jsonify({"error": "Unknown session"}), 404
+    analytics = speech_analytics.peek(session_id)
+    return jsonify({
+        "session_id": session_id,
+        "transcript": transcript.text(),
+        **transcript.summary(),
+        "speech_metrics": analytics.snapshot() if analytics is not None else None
+    })
+
+@bp.route('/analyze_response', methods=['POST'])
 def analyze_response():
     """Process the candidate's response and generate feedback."""
     try:
@@ -774,6 +783,18 @@ def analyze_response():
         question = data['question'][:1000]  # Limit length for safety
         response = data['response'][:5000]  # Limit length for safety
 
+        # Delivery metrics from the session's streamed audio, when there is one
+        analytics = speech_analytics.peek(str(data.get('session_id', '')))
+        speech_metrics = analytics.snapshot() if analytics is not None else None
+        delivery = ""
+        if speech_metrics:
+            delivery = f"""
+        SPEECH DELIVERY (measured from the audio): {speech_metrics['wpm']} words per minute,
+        {speech_metrics['pauses']['count']} pauses (longest {speech_metrics['pauses']['longest_seconds']}s),
+        {speech_metrics['fillers']['total']} filler words ({speech_metrics['fillers']['per_100_words']} per 100 words).
+        Take these into account for communication skills.
+        """
+
         # Gemini API prompt
         prompt = f"""
 
@@ -790,7 +811,7 @@ def analyze_response():
         - Technical knowledge and skills
         - Communication skills
         - Overall impression
-
+        {delivery}
         Provide feedback in this exact JSON format:
         {{
             "concise_feedback": "Brief summary of performance",
@@ -807,10 +828,10 @@ def analyze_response():
 
         # Call Gemini API with timeout
         try:
-            genai_response = gemini_model.generate_content(
+            genai_response = offload(lambda: get_gemini_model().generate_content(
                 prompt,
                 generation_config={"temperature": 0.3}
-            )
+            ))
             
             # Clean the response
             response_text = genai_response.text.strip()
@@ -833,7 +854,8 @@ def analyze_response():
                 
             return jsonify({
                 "status": "success",
-                "feedback": feedback
+                "feedback": feedback,
+                "speech_metrics": speech_metrics
             })
 
         except json.JSONDecodeError as e:
@@ -859,7 +881,7 @@ def analyze_response():
             "traceback": traceback.format_exc()
         }), 500
 
-@app.route('/current_question', methods=['GET'])
+@bp.route('/current_question', methods=['GET'])
 def get_current_question():
     return jsonify({
         "question": interview_questions[current_question_index] if interview_questions else "",
@@ -867,10 +889,10 @@ def get_current_question():
         "total": len(interview_questions)
     })
 
-@app.route('/api/register', methods=['POST'])
+@bp.route('/api/register', methods=['POST'])
 def register():
     data = request.get_json()
-    hashed_password = generate_password_hash(data['password'], method='pbkdf2:sha256')
+    hashed_password = offload(generate_password_hash, data['password'], method='pbkdf2:sha256')
     
     if User.query.filter_by(email=data['email']).first():
         return jsonify({'error': 'Email already exists'}), 400
@@ -884,18 +906,18 @@ def register():
     db.session.commit()
     return jsonify({'message': 'Registered successfully'}), 201
 
-@app.route('/api/login', methods=['POST'])
+@bp.route('/api/login', methods=['POST'])
 def login():
     data = request.get_json()
     user = User.query.filter_by(email=data['email']).first()
     
-    if not user or not check_password_hash(user.password, data['password']):
+    if not user or not offload(check_password_hash, user.password, data['password']):
         return jsonify({'error': 'Invalid credentials'}), 401
     
     token = jwt.encode({
         'user_id': user.id,
         'exp': datetime.datetime.now() + datetime.timedelta(hours=24)
-    }, app.config['SECRET_KEY'])
+    }, current_app.config['SECRET_KEY'])
     
     return jsonify({
         'token': token,
@@ -903,7 +925,7 @@ def login():
         'name': user.name
     })
 
-@app.route('/api/check-auth', methods=['GET'])
+@bp.route('/api/check-auth', methods=['GET'])
 @token_required
 def check_auth(current_user):
     return jsonify({
@@ -913,11 +935,131 @@ def check_auth(current_user):
     })
 
 
+@bp.route('/healthz', methods=['GET'])
+def healthz():
+    """Liveness: the process is up and serving requests"""
+    return jsonify({'status': 'ok'})
+
+@bp.route('/metrics', methods=['GET'])
+def metrics():
+    return jsonify({
+        'google_clients': google_clients.stats(),
+        'audio_queue': audio_executor.stats(),
+        'event_bus': event_bus.stats(),
+        'updates': updates.stats(),
+        'interim_transcripts': interim_transcripts.stats(),
+        'vad': vad.stats() if vad is not None else None,
+        'server': async_runtime.stats()
+    })
+
+@bp.route('/readyz', methods=['GET'])
+def readyz():
+    """Readiness: every required warm-up step has finished"""
+    readiness = current_app.extensions['readiness']
+    ready = readiness.is_ready()
+    return jsonify({
+        'status': 'ready' if ready else 'not_ready',
+        'steps': readiness.report()
+    }), 200 if ready else 503
+
+
+def start_services():
+    """Create the process-wide workers and channels; their threads start here, not when this module is imported"""
+    global updates, interim_transcripts, frame_pool, audio_executor, media_channel, event_bus
+    if event_bus is not None:
+        return
+
+    # Scores, emotion and metrics for each session, merged and sent at most UPDATE_MAX_RATE times a second
+    updates = UpdateCoalescer(in_loop(lambda session_id, payload: emit_to_session(session_id, 'update', payload)))
+
+    # Interim transcripts replace one another, so only the latest per flush is sent
+    interim_transcripts = UpdateCoalescer(in_loop(emit_interim_transcript), label="transcript")
+
+    # Frame analysis worker processes; results arrive on the pool's collector thread
+    frame_pool = FrameWorkerPool(on_result=in_loop(emit_frame_result))
+
+    # Audio chunks are prepared and fed in order per session, on a fixed number of threads
+    audio_executor = SessionExecutor(AUDIO_WORKERS, AUDIO_MAX_BACKLOG, label="audio")
+
+    # Binary frame/audio streaming over Socket.IO, see media_channel.py
+    media_channel = MediaChannel(frame_pool.submit, submit_audio_chunk, max_frame_bytes=frame_pool.slot_bytes)
+    socketio.on_namespace(media_channel)
+
+    # Scores and transcripts on their way to Socket.IO: in-process, or through Kafka across nodes
+    event_bus = create_event_bus()
+    event_bus.subscribe('interview_updates', deliver_update)
+
+def create_app(config=None):
+    """Build the Flask app and start warming up slow dependencies in the background"""
+    start_services()
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = os.getenv("SECRET_KEY")
+    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv("DATABASE_URL", "sqlite:///site.db")
+    app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+    app.config['UPLOAD_FOLDER'] = UPLOAD_FOLDER
+    if config:
+        app.config.update(config)
+
+    db.init_app(app)
+    CORS(app, resources={
+        r"/api/*": {
+            "origins": ["http://localhost:3000"],
+            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+            "allow_headers": ["Content-Type", "Authorization"],
+            "expose_headers": ["X-Custom-Header"],
+            "supports_credentials": True,  # If using cookies/auth
+            "max_age": 86400  # Cache preflight for 24 hours
+        },
+        r"/generate_questions": {
+            "origins": ["http://localhost:3000"],  # Your React app's origin
+            "methods": ["POST", "OPTIONS"],  # Allowed methods
+            "allow_headers": ["Content-Type"]
+        },
+        r"/*": {  # Apply to all routes
+            "origins": ["http://localhost:3000"],  # Your React app
+            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
+            "allow_headers": ["Content-Type", "Authorization"],
+            "supports_credentials": True
+        }
+    })
+    # Loop-bound callbacks and offloaded calls attach to the thread that will run the server
+    async_runtime.start()
+    # Media namespace messages carry whole audio chunks, above Engine.IO's 1 MB default
+    socketio.init_app(app, cors_allowed_origins="*", async_mode=async_runtime.SOCKETIO_ASYNC_MODE,
+                      message_queue=SOCKETIO_MESSAGE_QUEUE,
+                      max_http_buffer_size=max(MEDIA_MAX_AUDIO_BYTES, frame_pool.slot_bytes) + 4096)
+    app.register_blueprint(bp)
+
+    def create_tables():
+        with app.app_context():
+            db.create_all()
+
+    def start_frame_workers():
+        if not frame_pool.wait_ready(timeout=WARMUP_TIMEOUT):
+            raise RuntimeError(f"Frame workers not ready after {WARMUP_TIMEOUT}s")
+
+    # The Kafka bus is optional: the app serves without it and its consumers keep retrying
+    readiness = Readiness()
+    readiness.add("database", create_tables)
+    readiness.add("frame_workers", start_frame_workers)
+    readiness.add("gemini", get_gemini_model)
+    readiness.add("event_bus", event_bus.start, required=False)
+    app.extensions['readiness'] = readiness
+    readiness.start()
+    return app
+
 
 if __name__ == '__main__':
     try:
-        socketio.run(app, debug=True, port=5000, use_reloader=False)
+        # In threading mode this is Werkzeug's development server, also when started without a terminal
+        socketio.run(create_app(), host=SERVER_HOST, port=SERVER_PORT, debug=SERVER_DEBUG, use_reloader=False,
+                     allow_unsafe_werkzeug=True)
     finally:
-        frame_queue.put(None)  # Signal processing thread to stop
-        processing_thread.join()
-        face_mesh.close()
\ No newline at end of file
+        audio_executor.shutdown()
+        audio_decoders.close_all()
+        speech_sessions.close_all()
+        google_clients.close()
+        frame_pool.shutdown()
+        event_bus.close()
+        updates.close()
+        interim_transcripts.close()
@@ -0,0 +1,116 @@
+"""How Socket.IO connections are served, and the bridges between them and the worker threads.
+
+SOCKETIO_ASYNC_MODE picks the server:
+
+- "threading" (default): Werkzeug with one OS thread per connection. Fine for
+  development and a handful of interviews.
+- "gevent": every connection is a greenlet on one event loop, so an idle
+  socket costs a few KB instead of a thread and one process holds thousands
+  of them. patch() must run before anything imports socket; app.py calls it
+  first when run as the server. Threads are left unpatched on purpose: the audio executor, speech
+  streams, frame-pool collector, coalescer timers and event bus stay real OS
+  threads, so decoding, DSP and blocking gRPC calls never stall the loop.
+
+Two bridges keep that safe, and are plain calls in threading mode:
+
+- ``in_loop(fn)`` wraps callbacks fired on those threads so they run on the
+  loop, in the order they were made, where Socket.IO may write to clients.
+- ``offload(fn, ...)`` runs a blocking call made from a request handler
+  (Gemini, PDF parsing, password hashing) on one of OFFLOAD_THREADS real
+  threads while only the calling greenlet waits.
+"""
+import functools
+import logging
+import os
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+SOCKETIO_ASYNC_MODE = os.getenv("SOCKETIO_ASYNC_MODE", "threading")  # threading or gevent
+OFFLOAD_THREADS = int(os.getenv("OFFLOAD_THREADS", "16"))
+
+ASYNC_MODES = ("threading", "gevent")
+
+_loop = None  # The _LoopBridge once start() has run in gevent mode
+
+
+def patch(mode=SOCKETIO_ASYNC_MODE):
+    """Make sockets cooperative for the gevent server; threads, queues and subprocesses stay native"""
+    if mode not in ASYNC_MODES:
+        raise ValueError(f"Unknown SOCKETIO_ASYNC_MODE: {mode}")
+    if mode == "gevent":
+        from gevent import monkey
+        monkey.patch_all(thread=False, queue=False, subprocess=False)
+
+
+def start(mode=SOCKETIO_ASYNC_MODE, threads=OFFLOAD_THREADS):
+    """Bind the bridges to the event loop of the calling thread, the one that will run the server"""
+    global _loop
+    if mode == "gevent" and _loop is None:
+        _loop = _LoopBridge(threads)
+
+
+def in_loop(fn):
+    """fn, run on the event loop when called from any other thread"""
+    if SOCKETIO_ASYNC_MODE == "threading":
+        return fn
+
+    @functools.wraps(fn)
+    def call(*args, **kwargs):
+        if _loop is None or _loop.owns_thread():
+            return fn(*args, **kwargs)
+        _loop.call(fn, args, kwargs)
+    return call
+
+
+def offload(fn, *args, **kwargs):
+    """fn(*args, **kwargs) on a real thread, without blocking the event loop meanwhile"""
+    if _loop is None or not _loop.owns_thread():
+        return fn(*args, **kwargs)
+    return _loop.pool.spawn(fn, *args, **kwargs).get()
+
+
+def stats():
+    return {
+        "async_mode": SOCKETIO_ASYNC_MODE,
+        "loop_calls": _loop.calls if _loop is not None else None,
+        "loop_backlog": len(_loop.pending) if _loop is not None else None,
+        "offload_threads": _loop.pool.maxsize if _loop is not None else None
+    }
+
+
+class _LoopBridge:
+    def __init__(self, threads):
+        import gevent
+        from gevent.event import Event
+        from gevent.threadpool import ThreadPool
+        self.hub = gevent.get_hub()
+        self.thread_id = threading.get_ident()
+        self.pool = ThreadPool(threads)
+        self.pending = deque()  # (fn, args, kwargs); appended by any thread, drained on the loop
+        self.calls = 0
+        self._ready = Event()
+        # Watcher callbacks run on the loop; send() is the one loop operation other threads may use
+        self._wakeup = self.hub.loop.async_()
+        self._wakeup.start(self._ready.set)
+        gevent.spawn(self._run)
+
+    def owns_thread(self):
+        return threading.get_ident() == self.thread_id
+
+    def call(self, fn, args, kwargs):
+        self.pending.append((fn, args, kwargs))
+        self._wakeup.send()
+
+    def _run(self):
+        while True:
+            self._ready.wait()
+            self._ready.clear()
+            while self.pending:
+                fn, args, kwargs = self.pending.popleft()
+                self.calls += 1
+                try:
+                    fn(*args, **kwargs)
+                except Exception as e:
+                    logger.error(f"Loop callback {getattr(fn, '__name__', fn)} failed: {str(e)}")
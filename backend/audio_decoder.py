@@ -0,0 +1,114 @@
+"""Long-lived per-session decoding of compressed browser audio.
+
+MediaRecorder produces one WebM (or Ogg) Opus stream per recording and slices
+it into chunks. Only the first chunk carries the container header, so the
+chunks cannot be decoded one by one. A StreamDecoder keeps one ffmpeg process
+per session, writes every chunk to its stdin as it arrives and reads 16 kHz
+mono LINEAR16 back from stdout on a reader thread. Process start-up and the
+container header are paid once per recording instead of once per chunk.
+"""
+import logging
+import os
+import subprocess
+import threading
+
+from speech_stream import SPEECH_SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+FFMPEG_BINARY = os.getenv("FFMPEG_BINARY", "ffmpeg")
+AUDIO_DECODE_CHUNK_SECONDS = float(os.getenv("AUDIO_DECODE_CHUNK_SECONDS", "1.0"))
+
+# Container magic bytes -> ffmpeg demuxer
+CONTAINER_FORMATS = {
+    b"\x1a\x45\xdf\xa3": "matroska",  # EBML header: WebM / Matroska
+    b"OggS": "ogg",
+}
+
+
+def is_wav(data):
+    return data[:4] == b"RIFF"
+
+
+def container_format(data):
+    """ffmpeg demuxer for a chunk that starts a new stream, or None for a continuation chunk"""
+    return CONTAINER_FORMATS.get(bytes(data[:4]))
+
+
+class StreamDecoder:
+    """One ffmpeg process decoding a session's audio stream incrementally.
+
+    ``on_pcm(pcm)`` is called from the reader thread with LINEAR16 mono
+    bytes, in roughly AUDIO_DECODE_CHUNK_SECONDS pieces and in stream order.
+    """
+
+    def __init__(self, input_format, on_pcm, sample_rate=SPEECH_SAMPLE_RATE,
+                 chunk_seconds=AUDIO_DECODE_CHUNK_SECONDS, ffmpeg=FFMPEG_BINARY):
+        self.on_pcm = on_pcm
+        self.chunk_bytes = max(2, int(sample_rate * chunk_seconds) * 2)
+        self.bytes_in = 0
+        self.bytes_out = 0
+        # Small probe and no analysis: the header is in the first chunk and output should start at once
+        self.process = subprocess.Popen(
+            [ffmpeg, "-hide_banner", "-loglevel", "error", "-nostdin",
+             "-probesize", "4096", "-analyzeduration", "0", "-fflags", "nobuffer",
+             "-f", input_format, "-i", "pipe:0",
+             "-f", "s16le", "-acodec", "pcm_s16le", "-ac", "1", "-ar", str(sample_rate), "pipe:1"],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        self._lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read, name="audio-decoder", daemon=True)
+        self._reader.start()
+
+    def feed(self, data):
+        """Write the next piece of the compressed stream; False if the decoder has exited"""
+        with self._lock:
+            if self.process.stdin.closed or self.process.poll() is not None:
+                return False
+            try:
+                self.process.stdin.write(data)
+                self.process.stdin.flush()
+            except (BrokenPipeError, ValueError):
+                return False
+            self.bytes_in += len(data)
+            return True
+
+    def close(self, timeout=5):
+        """End the stream, deliver whatever is still buffered and stop the process"""
+        with self._lock:
+            if not self.process.stdin.closed:
+                try:
+                    self.process.stdin.close()
+                except BrokenPipeError:
+                    pass
+        self._reader.join(timeout=timeout)
+        try:
+            self.process.wait(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        if self.process.returncode:
+            logger.warning(f"Audio decoder exited with code {self.process.returncode}")
+
+    def _read(self):
+        pending = bytearray()
+        stdout = self.process.stdout
+        while True:
+            data = stdout.read1(65536)
+            if not data:
+                break
+            pending += data
+            if len(pending) >= self.chunk_bytes:
+                # Whole samples only
+                size = len(pending) - len(pending) % 2
+                self._emit(bytes(pending[:size]))
+                del pending[:size]
+        if len(pending) >= 2:
+            self._emit(bytes(pending[:len(pending) - len(pending) % 2]))
+
+    def _emit(self, pcm):
+        self.bytes_out += len(pcm)
+        try:
+            self.on_pcm(pcm)
+        except Exception as e:
+            logger.error(f"Decoded audio callback error: {str(e)}")
@@ -0,0 +1,127 @@
+"""Single-pass speech audio preparation on NumPy arrays.
+
+Uploaded WAV chunks are parsed once and processed as float32 samples:
+downmix to mono, polyphase resampling to SPEECH_SAMPLE_RATE, an 80 Hz-7.6 kHz
+band-pass, optional silence trimming (vad.py) and peak normalisation of what
+is left. The result is encoded once, as the raw LINEAR16 bytes that streaming
+recognition consumes. Nothing is re-exported through ffmpeg along the way.
+Alongside it comes where the kept audio started in the chunk and how long the
+whole chunk was, so speech timing can be measured against the audio captured
+rather than the audio sent.
+"""
+import io
+import os
+import wave
+from collections import namedtuple
+from functools import lru_cache
+from math import gcd
+
+import numpy as np
+from scipy import signal
+
+from speech_stream import SPEECH_SAMPLE_RATE
+
+AUDIO_HIGHPASS_HZ = float(os.getenv("AUDIO_HIGHPASS_HZ", "80"))
+AUDIO_LOWPASS_HZ = float(os.getenv("AUDIO_LOWPASS_HZ", "7600"))
+AUDIO_PEAK_DBFS = float(os.getenv("AUDIO_PEAK_DBFS", "-1.0"))
+AUDIO_MAX_GAIN_DB = float(os.getenv("AUDIO_MAX_GAIN_DB", "30"))
+
+_INT_DTYPES = {1: np.uint8, 2: np.dtype("<i2"), 4: np.dtype("<i4")}
+
+# LINEAR16 bytes to recognise; offset, in seconds into the chunk, of their first sample; duration of the whole chunk
+PreparedAudio = namedtuple("PreparedAudio", ["pcm", "offset", "duration"])
+
+
+def read_wav(data):
+    """(samples, sample_rate) from PCM WAV bytes; samples are float32 in [-1, 1], shaped (frames, channels)"""
+    with wave.open(io.BytesIO(data), "rb") as wav:
+        channels, width, rate = wav.getnchannels(), wav.getsampwidth(), wav.getframerate()
+        raw = wav.readframes(wav.getnframes())
+
+    if width == 3:
+        # 24-bit: widen each little-endian sample to int32 by prefixing a zero low byte
+        packed = np.frombuffer(raw, dtype=np.uint8).reshape(-1, 3)
+        samples = np.zeros((len(packed), 4), dtype=np.uint8)
+        samples[:, 1:] = packed
+        samples = samples.view("<i4").ravel().astype(np.float32) / 2 ** 31
+    elif width == 1:
+        samples = (np.frombuffer(raw, dtype=np.uint8).astype(np.float32) - 128.0) / 128.0
+    elif width in _INT_DTYPES:
+        samples = np.frombuffer(raw, dtype=_INT_DTYPES[width]).astype(np.float32) / 2 ** (8 * width - 1)
+    else:
+        raise ValueError(f"Unsupported WAV sample width: {width} bytes")
+    return samples.reshape(-1, channels), rate
+
+
+@lru_cache(maxsize=8)
+def _bandpass(rate):
+    high = min(AUDIO_LOWPASS_HZ, 0.45 * rate)
+    sos = signal.butter(4, [AUDIO_HIGHPASS_HZ, high], btype="bandpass", fs=rate, output="sos")
+    return sos, signal.sosfilt_zi(sos)
+
+
+def to_mono(samples):
+    return samples[:, 0] if samples.shape[1] == 1 else samples.mean(axis=1, dtype=np.float32)
+
+
+def resample(mono, rate, target_rate=SPEECH_SAMPLE_RATE):
+    """Polyphase resampling; the FIR's anti-aliasing replaces a separate low-pass"""
+    if rate == target_rate:
+        return mono
+    divisor = gcd(rate, target_rate)
+    return signal.resample_poly(mono, target_rate // divisor, rate // divisor).astype(np.float32, copy=False)
+
+
+def bandpass(mono, rate=SPEECH_SAMPLE_RATE):
+    if not len(mono):
+        return mono
+    sos, zi = _bandpass(rate)
+    # Start the filter settled on the first sample so chunks do not begin with a click
+    filtered, _ = signal.sosfilt(sos, mono, zi=zi * mono[0])
+    return filtered.astype(np.float32, copy=False)
+
+
+def normalize(mono, peak_dbfs=AUDIO_PEAK_DBFS, max_gain_db=AUDIO_MAX_GAIN_DB):
+    """Scale so the loudest sample sits at peak_dbfs, without boosting near-silence past max_gain_db"""
+    peak = float(np.max(np.abs(mono))) if len(mono) else 0.0
+    if peak == 0.0:
+        return mono
+    gain = min(10 ** (peak_dbfs / 20) / peak, 10 ** (max_gain_db / 20))
+    mono *= gain
+    return mono
+
+
+def to_linear16(mono):
+    return (np.clip(mono, -1.0, 1.0) * 32767.0).astype("<i2").tobytes()
+
+
+def prepare_speech_audio(wav_bytes, target_rate=SPEECH_SAMPLE_RATE, vad=None, observe=None):
+    """WAV upload -> PreparedAudio: mono, resampled, band-passed, normalised LINEAR16 PCM for recognition.
+
+    With a VoiceActivityDetector the chunk is trimmed to its speech first, and
+    a chunk without speech comes back with empty pcm. ``observe(mono, rate)``
+    sees the whole band-passed chunk before trimming and normalisation, which
+    is where level-dependent features such as prosody are measured.
+    """
+    samples, rate = read_wav(wav_bytes)
+    return _prepare(to_mono(samples), rate, target_rate, vad, observe)
+
+
+def prepare_speech_pcm(pcm, rate=SPEECH_SAMPLE_RATE, target_rate=SPEECH_SAMPLE_RATE, vad=None, observe=None):
+    """The prepare_speech_audio() pipeline for raw LINEAR16 mono, e.g. from a StreamDecoder"""
+    mono = np.frombuffer(pcm, dtype="<i2").astype(np.float32) / 32768.0
+    return _prepare(mono, rate, target_rate, vad, observe)
+
+
+def _prepare(mono, rate, target_rate, vad, observe=None):
+    mono = bandpass(resample(mono, rate, target_rate), target_rate)
+    if observe is not None:
+        observe(mono, target_rate)
+    duration = len(mono) / target_rate
+    start = 0
+    if vad is not None:
+        # Before normalising, which would lift silence towards speech level
+        mono, start = vad.trim(mono, target_rate)
+        if mono is None:
+            return PreparedAudio(b"", duration, duration)
+    return PreparedAudio(to_linear16(normalize(mono)), start / target_rate, duration)
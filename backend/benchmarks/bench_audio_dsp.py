@@ -0,0 +1,77 @@
+"""/send_audio preprocessing throughput: pydub preprocess + convert vs audio_dsp.
+
+The pydub path is the one app.py used before: preprocess_audio() decodes,
+filters, normalises and exports through ffmpeg, then convert_audio() decodes
+that WAV again, resamples, filters again and exports again. Needs pydub and an
+ffmpeg binary on PATH for the baseline.
+
+Run from the backend folder:
+    python -m benchmarks.bench_audio_dsp
+"""
+import io
+import timeit
+import wave
+
+import numpy as np
+
+from audio_dsp import prepare_speech_audio
+
+CHUNK_SECONDS = 5.0
+
+
+def make_wav(rate, channels, seconds=CHUNK_SECONDS, seed=0):
+    rng = np.random.default_rng(seed)
+    t = np.arange(int(rate * seconds)) / rate
+    # Voice-band harmonics with a slow envelope, plus mains hum and hiss for the filters to remove
+    voice = sum(np.sin(2 * np.pi * f * t) / k for k, f in enumerate([180, 360, 720, 1440], start=1))
+    voice *= 0.5 + 0.5 * np.sin(2 * np.pi * 2 * t)
+    mono = 0.2 * voice + 0.05 * np.sin(2 * np.pi * 50 * t) + 0.01 * rng.standard_normal(len(t))
+    samples = np.repeat(mono[:, np.newaxis], channels, axis=1)
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(channels)
+        wav.setsampwidth(2)
+        wav.setframerate(rate)
+        wav.writeframes((np.clip(samples, -1, 1) * 32767).astype("<i2").tobytes())
+    return buffer.getvalue()
+
+
+def pydub_path(data):
+    from pydub import AudioSegment
+    # preprocess_audio
+    audio = AudioSegment.from_wav(io.BytesIO(data))
+    audio = audio.normalize()
+    audio = audio.low_pass_filter(8000).high_pass_filter(80)
+    audio = audio + 3
+    buffer = io.BytesIO()
+    audio.export(buffer, format="wav")
+    # convert_audio
+    audio = AudioSegment.from_wav(io.BytesIO(buffer.getvalue()))
+    if audio.channels > 1:
+        audio = audio.set_channels(1)
+    audio = audio.set_frame_rate(16000)
+    audio = audio.set_sample_width(2)
+    audio = audio.high_pass_filter(80)
+    audio = audio.low_pass_filter(8000)
+    buffer = io.BytesIO()
+    audio.export(buffer, format="wav", parameters=["-ac", "1", "-ar", "16000", "-acodec", "pcm_s16le"])
+    return buffer.getvalue()
+
+
+def bench(label, fn, number):
+    best = min(timeit.repeat(fn, number=number, repeat=3)) / number
+    print(f"  {label:<10} {best * 1e3:8.2f} ms/chunk  {CHUNK_SECONDS / best:8.0f}x realtime")
+    return best
+
+
+if __name__ == "__main__":
+    for rate, channels in [(16000, 1), (44100, 2), (48000, 2)]:
+        data = make_wav(rate, channels)
+        print(f"{CHUNK_SECONDS:.0f} s chunk, {rate} Hz x {channels} channel(s), {len(data)} bytes")
+        new = bench("audio_dsp", lambda: prepare_speech_audio(data), number=20)
+        try:
+            old = bench("pydub", lambda: pydub_path(data), number=3)
+        except (ImportError, FileNotFoundError) as e:
+            print(f"  pydub baseline skipped: {e}")
+            continue
+        print(f"  speedup    {old / new:8.1f}x")
@@ -0,0 +1,326 @@
+"""Interview sockets per node: SOCKETIO_ASYNC_MODE=threading vs gevent.
+
+For each mode app.py is started on a local port (a scripted recognizer,
+in-memory database) and CONNECTIONS interview sockets are opened against it.
+While they sit idle the server's RSS and thread count are read and /healthz
+and join_session acks are timed. Then ACTIVE_SHARE of the sessions go live:
+each streams a CHUNK_SECONDS WAV chunk of voiced audio over the media
+namespace per CHUNK_SECONDS and round-trips a join_session ack every second,
+while the same latencies are taken again and the transcripts and updates
+pushed back are counted.
+
+The clients are greenlets speaking Engine.IO 4 / Socket.IO 5 over
+simple-websocket, so one client process holds thousands of sockets.
+
+Run from the backend folder:
+    python -m benchmarks.bench_connections [connections ...]
+"""
+from gevent import monkey
+monkey.patch_all()
+
+import io
+import json
+import os
+import resource
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+import wave
+from http.client import HTTPConnection
+
+import gevent
+import numpy as np
+import simple_websocket
+from gevent.event import Event
+from gevent.pool import Pool
+
+CONNECTIONS = (1000, 3000)
+ACTIVE_SHARE = 0.05
+ACTIVE_SECONDS = 10.0
+CHUNK_SECONDS = 0.5
+CONNECT_CONCURRENCY = 50
+SAMPLE_RATE = 16000
+UTTERANCE_CHUNKS = 8
+
+# app.py with a recognizer that hears one word per chunk and ends an utterance every
+# UTTERANCE_CHUNKS. The fake backend reads PCM as UTF-8 and would produce hundreds of
+# nonsense words per chunk, transcripts far heavier than any speaker's.
+SERVER = f"""
+import runpy
+import speech_stream
+
+def recognize(self, chunks):
+    words, position = [], 0.0
+    for chunk in chunks:
+        duration = len(chunk) / (2.0 * self.sample_rate)
+        words.append(speech_stream.Word(f"word{{len(words)}}", position, position + duration))
+        position += duration
+        if len(words) < {UTTERANCE_CHUNKS}:
+            yield speech_stream.TranscriptResult(" ".join(word.text for word in words), False, 0.0)
+        else:
+            yield speech_stream.TranscriptResult(" ".join(word.text for word in words), True, 0.9,
+                                                 tuple(word._replace(confidence=0.9) for word in words))
+            words = []
+
+speech_stream.FakeSpeechBackend.recognize = recognize
+runpy.run_path("app.py", run_name="__main__")
+"""
+
+
+def voiced_chunk(seconds=CHUNK_SECONDS, rate=SAMPLE_RATE):
+    """A WAV chunk of a 150 Hz voice with syllable-rate loudness changes, so VAD keeps it"""
+    t = np.arange(int(seconds * rate)) / rate
+    envelope = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t)
+    signal = envelope * (np.sin(2 * np.pi * 150 * t) + 0.4 * np.sin(2 * np.pi * 300 * t))
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as out:
+        out.setnchannels(1)
+        out.setsampwidth(2)
+        out.setframerate(rate)
+        out.writeframes((signal * 9000).astype(np.int16).tobytes())
+    return buffer.getvalue()
+
+
+class InterviewSocket:
+    """One interview's Socket.IO connection, with the media namespace joined when it goes live"""
+
+    def __init__(self, port, session_id):
+        self.session_id = session_id
+        self.ws = simple_websocket.Client.connect(
+            f"ws://127.0.0.1:{port}/socket.io/?EIO=4&transport=websocket&session_id={session_id}"
+        )
+        self.namespaces = {}
+        self.acks = {}
+        self.ack_ids = iter(range(1, 1 << 30))
+        self.ack_latencies = []
+        self.events = 0
+        self.audio_status = {}
+        self.reader = gevent.spawn(self._read)
+        # Sent without waiting for the open packet: simple-websocket's client can hold a frame
+        # that arrived with the handshake response until the next one
+        self.join("")
+
+    def join(self, namespace):
+        joined = Event()
+        self.namespaces[namespace] = joined
+        self.ws.send(f"40{namespace}," if namespace else "40")
+        if not joined.wait(timeout=30):
+            raise RuntimeError(f"Namespace '{namespace}' not joined")
+
+    def ping(self):
+        """join_session round trip on the default namespace"""
+        ack = next(self.ack_ids)
+        self.acks[ack] = (time.perf_counter(), None)
+        self.ws.send(f"42{ack}" + json.dumps(["join_session", {"session_id": self.session_id}]))
+
+    def send_audio(self, seq, data):
+        ack = next(self.ack_ids)
+        self.acks[ack] = (time.perf_counter(), "audio")
+        payload = json.dumps(["audio", {"seq": seq, "data": {"_placeholder": True, "num": 0}}])
+        self.ws.send(f"451-/media,{ack}{payload}")
+        self.ws.send(data)
+
+    def close(self):
+        self.reader.kill()
+        try:
+            self.ws.close()
+        except simple_websocket.ConnectionClosed:
+            pass
+
+    def _read(self):
+        while True:
+            try:
+                packet = self.ws.receive()
+            except simple_websocket.ConnectionClosed:
+                return
+            if packet == "2":
+                self.ws.send("3")
+            elif packet.startswith("40"):
+                namespace = packet[2:].split(",", 1)[0] if packet.startswith("40/") else ""
+                self.namespaces[namespace].set()
+            elif packet.startswith("42"):
+                self.events += 1
+            elif packet.startswith("43"):
+                body = packet[2:].split(",", 1)[1] if packet.startswith("43/") else packet[2:]
+                ack = int(body[:body.index("[")])
+                start, kind = self.acks.pop(ack)
+                if kind == "audio":
+                    status = json.loads(body[body.index("["):])[0].get("status")
+                    self.audio_status[status] = self.audio_status.get(status, 0) + 1
+                else:
+                    self.ack_latencies.append(time.perf_counter() - start)
+
+
+def free_port():
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def server_usage(pid):
+    fields = {}
+    with open(f"/proc/{pid}/status") as status:
+        for line in status:
+            name, _, value = line.partition(":")
+            fields[name] = value.split()[:1]
+    return int(fields["VmRSS"][0]) / 1024, int(fields["Threads"][0])
+
+
+def server_cpu_seconds(pid):
+    with open(f"/proc/{pid}/stat") as stat:
+        fields = stat.read().rsplit(")", 1)[1].split()
+    return (int(fields[11]) + int(fields[12])) / os.sysconf("SC_CLK_TCK")
+
+
+def healthz(port, timeout=10):
+    connection = HTTPConnection("127.0.0.1", port, timeout=timeout)
+    try:
+        connection.request("GET", "/healthz")
+        connection.getresponse().read()
+    finally:
+        connection.close()
+
+
+def healthz_latencies(port, requests=50, until=None):
+    """Request latencies, with None for requests that timed out"""
+    latencies = []
+    for _ in range(requests):
+        if until is not None and time.monotonic() >= until:
+            break
+        start = time.perf_counter()
+        try:
+            healthz(port)
+            latencies.append(time.perf_counter() - start)
+        except OSError:
+            latencies.append(None)
+        gevent.sleep(0.02)
+    return latencies
+
+
+def ack_latencies(clients, rounds=3):
+    for client in clients:
+        client.ack_latencies.clear()
+    for _ in range(rounds):
+        for client in clients:
+            client.ping()
+        gevent.sleep(1.0)
+    return [latency for client in clients for latency in client.ack_latencies]
+
+
+def percentiles(latencies):
+    answered = [latency for latency in latencies if latency is not None]
+    if not answered:
+        return "no answer"
+    p50, p99 = np.percentile(np.array(answered) * 1e3, [50, 99])
+    timed_out = len(latencies) - len(answered)
+    return f"p50 {p50:7.1f} ms  p99 {p99:7.1f} ms" + (f" ({timed_out} timed out)" if timed_out else "")
+
+
+def start_server(mode, port, log):
+    env = dict(
+        os.environ,
+        SOCKETIO_ASYNC_MODE=mode,
+        SERVER_PORT=str(port),
+        SERVER_DEBUG="false",
+        SPEECH_BACKEND="fake",
+        EVENT_BUS="inprocess",
+        DATABASE_URL="sqlite://",
+        FRAME_WORKERS="1"
+    )
+    server = subprocess.Popen([sys.executable, "-c", SERVER], env=env, stdout=log, stderr=subprocess.STDOUT)
+    deadline = time.monotonic() + 120
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"app.py exited with code {server.returncode}")
+        try:
+            healthz(port)
+            return server
+        except OSError:
+            gevent.sleep(0.5)
+    server.kill()
+    raise RuntimeError("app.py did not start serving")
+
+
+def go_live(client, chunk, until):
+    client.join("/media")
+    seq = 0
+    next_ping = time.monotonic()
+    while time.monotonic() < until:
+        seq += 1
+        client.send_audio(seq, chunk)
+        if time.monotonic() >= next_ping:
+            client.ping()
+            next_ping += 1.0
+        gevent.sleep(CHUNK_SECONDS)
+
+
+def run(mode, connections):
+    port = free_port()
+    with tempfile.TemporaryFile() as log:
+        server = start_server(mode, port, log)
+        clients = []
+        try:
+            pool = Pool(CONNECT_CONCURRENCY)
+            failures = []
+
+            def connect(i):
+                try:
+                    clients.append(InterviewSocket(port, f"bench-{i}"))
+                except Exception as e:
+                    failures.append(str(e))
+
+            start = time.perf_counter()
+            pool.map(connect, range(connections))
+            connect_seconds = time.perf_counter() - start
+            gevent.sleep(2.0)
+            rss, threads = server_usage(server.pid)
+            print(f"  {mode:<9} {len(clients):5d} connected in {connect_seconds:5.1f} s ({len(failures)} failed)"
+                  f"  server {rss:7.1f} MB  {threads:5d} threads")
+            if failures:
+                print(f"            first failure: {failures[0]}")
+            sample = clients[::max(1, len(clients) // 100)]
+            print(f"            idle    /healthz {percentiles(healthz_latencies(port))}"
+                  f"   ack {percentiles(ack_latencies(sample))}")
+
+            live = clients[:max(1, int(len(clients) * ACTIVE_SHARE))]
+            chunk = voiced_chunk()
+            until = time.monotonic() + ACTIVE_SECONDS
+            for client in live:
+                client.ack_latencies.clear()
+            cpu_start = server_cpu_seconds(server.pid)
+            streams = [gevent.spawn(go_live, client, chunk, until) for client in live]
+            gevent.sleep(1.0)
+            live_healthz = healthz_latencies(port, requests=int(ACTIVE_SECONDS * 50), until=until)
+            gevent.joinall(streams, timeout=ACTIVE_SECONDS + 30)
+            cpu = (server_cpu_seconds(server.pid) - cpu_start) / ACTIVE_SECONDS
+            gevent.sleep(1.0)
+            rss, threads = server_usage(server.pid)
+            statuses = {}
+            for client in live:
+                for status, count in client.audio_status.items():
+                    statuses[status] = statuses.get(status, 0) + count
+            events = sum(client.events for client in live)
+            print(f"            {len(live)} live  /healthz {percentiles(live_healthz)}"
+                  f"   ack {percentiles([t for c in live for t in c.ack_latencies])}")
+            print(f"            {events / ACTIVE_SECONDS:7.0f} events/s pushed  audio acks {statuses}"
+                  f"  server {rss:7.1f} MB  {threads:5d} threads  {cpu:4.0%} CPU")
+        finally:
+            for client in clients:
+                client.close()
+            server.terminate()
+            try:
+                server.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                server.kill()
+
+
+if __name__ == "__main__":
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+    counts = [int(arg) for arg in sys.argv[1:]] or CONNECTIONS
+    print(f"{ACTIVE_SHARE:.0%} of sessions live: {CHUNK_SECONDS:g} s audio chunks for {ACTIVE_SECONDS:g} s")
+    for connections in counts:
+        for mode in ("threading", "gevent"):
+            run(mode, connections)
@@ -0,0 +1,67 @@
+"""Emotion-inference input cost: full-frame face detection vs landmark ROI crop.
+
+The full-frame path is what DeepFace.analyze(enforce_detection=False) does
+before the model runs: an OpenCV Haar-cascade face search over the whole
+frame, then crop and resize. The ROI path crops the MediaPipe landmark box
+directly. If DeepFace is installed the end-to-end call is timed as well.
+
+Run from the backend folder:
+    python -m benchmarks.bench_emotion_roi
+"""
+import timeit
+
+import cv2
+import numpy as np
+
+import landmark_geometry as geometry
+from emotion_batcher import EMOTION_INPUT_SIZE, face_roi_input
+
+WIDTH, HEIGHT = 640, 480
+
+
+def make_frame_and_points(seed=0):
+    rng = np.random.default_rng(seed)
+    frame = rng.integers(0, 255, size=(HEIGHT, WIDTH, 3), dtype=np.uint8)
+    # A face-sized cloud of landmarks around the middle of the frame
+    points = rng.normal([WIDTH / 2, HEIGHT / 2], [45, 60], size=(geometry.NUM_LANDMARKS, 2)).astype(np.float32)
+    return frame, points
+
+
+def full_frame_input(frame, cascade):
+    gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+    faces = cascade.detectMultiScale(gray, 1.1, 10)
+    if len(faces):
+        x, y, w, h = faces[0]
+        gray = gray[y:y + h, x:x + w]
+    gray = cv2.resize(gray, (EMOTION_INPUT_SIZE, EMOTION_INPUT_SIZE), interpolation=cv2.INTER_AREA)
+    return gray.astype(np.float32) / 255.0
+
+
+def bench(label, fn, number):
+    best = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"{label:<44} {best * 1e3:9.3f} ms/call")
+    return best
+
+
+if __name__ == "__main__":
+    frame, points = make_frame_and_points()
+    cascade = cv2.CascadeClassifier(cv2.data.haarcascades + "haarcascade_frontalface_default.xml")
+    box = geometry.face_bbox(points, WIDTH, HEIGHT)
+
+    full = bench("full frame: cascade detect + crop + resize", lambda: full_frame_input(frame, cascade), 20)
+    roi = bench("landmark ROI: crop + resize", lambda: face_roi_input(frame, box), 2000)
+    print(f"input preparation speedup: {full / roi:.0f}x")
+    print(f"bytes handed to the batcher per call: {frame.nbytes} (frame copy) vs {face_roi_input(frame, box).nbytes} (ROI input)")
+
+    try:
+        from deepface import DeepFace
+        from emotion_batcher import DeepFaceEmotionModel
+    except ImportError:
+        print("deepface not installed - skipping end-to-end model timings")
+    else:
+        model = DeepFaceEmotionModel()
+        roi_input = face_roi_input(frame, box)
+        DeepFace.analyze(frame, actions=["emotion"], enforce_detection=False, silent=True)
+        bench("DeepFace.analyze on full frame", lambda: DeepFace.analyze(
+            frame, actions=["emotion"], enforce_detection=False, silent=True), 5)
+        bench("emotion model on ROI input", lambda: model.predict([roi_input]), 20)
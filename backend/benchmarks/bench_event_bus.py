@@ -0,0 +1,73 @@
+"""End-to-end update latency through the event bus: publish() to subscriber call.
+
+The in-process backend is always measured. The Kafka backend is measured
+too when kafka-python is installed and KAFKA_BROKER is reachable; without a
+broker, the per-event JSON encode/decode the old path paid is timed instead,
+as a lower bound on what it added before any network hop.
+
+Run from the backend folder:
+    python -m benchmarks.bench_event_bus
+"""
+import json
+import threading
+import time
+import uuid
+
+import numpy as np
+
+from event_bus import InProcessEventBus, KafkaEventBus
+
+EVENTS = 5000
+TOPIC = "bench_event_bus"
+
+
+def measure(bus, events=EVENTS, interval=0.0, settle=0.0):
+    latencies = []
+    done = threading.Event()
+
+    def handler(event, session_id):
+        latencies.append(time.perf_counter() - event["sent"])
+        if len(latencies) == events:
+            done.set()
+
+    bus.subscribe(TOPIC, handler)
+    bus.start()
+    time.sleep(settle)  # A Kafka consumer only sees events sent after it joins its group
+    session_id = str(uuid.uuid4())
+    start = time.perf_counter()
+    for _ in range(events):
+        bus.publish(TOPIC, {"session_id": session_id, "positivity_score": 0.5, "sent": time.perf_counter()})
+        if interval:
+            time.sleep(interval)
+    done.wait(timeout=60)
+    elapsed = time.perf_counter() - start
+    bus.close()
+    return np.array(latencies) * 1e3, len(latencies) / elapsed
+
+
+def report(label, latencies, rate):
+    if not len(latencies):
+        print(f"  {label:<28} no events delivered")
+        return
+    p50, p99 = np.percentile(latencies, [50, 99])
+    print(f"  {label:<28} p50 {p50:8.3f} ms  p99 {p99:8.3f} ms  {rate:10.0f} events/s")
+
+
+if __name__ == "__main__":
+    print(f"{EVENTS} score updates, one session")
+    report("inprocess, burst", *measure(InProcessEventBus()))
+    report("inprocess, 1 ms apart", *measure(InProcessEventBus(), events=1000, interval=0.001))
+
+    event = {"session_id": str(uuid.uuid4()), "positivity_score": 0.5}
+    start = time.perf_counter()
+    for _ in range(EVENTS):
+        json.loads(json.dumps(event).encode("utf-8").decode("utf-8"))
+    print(f"  {'JSON round trip only':<28} {(time.perf_counter() - start) / EVENTS * 1e3:8.4f} ms/event")
+
+    try:
+        import kafka  # noqa: F401
+        # Sparse events, as a live session produces them; a burst measures queueing, not latency
+        bus = KafkaEventBus(group_id=f"bench-{uuid.uuid4()}")
+        report("kafka, 10 ms apart", *measure(bus, events=500, interval=0.01, settle=10.0))
+    except Exception as e:
+        print(f"  Kafka backend skipped (needs kafka-python and a broker): {e}")
@@ -0,0 +1,45 @@
+"""/send_video decode cost and queued bytes: PIL + two color conversions vs frame_decode.
+
+Run from the backend folder:
+    python -m benchmarks.bench_frame_decode
+"""
+import io
+import timeit
+
+import cv2
+import numpy as np
+from PIL import Image
+
+from frame_decode import FRAME_HEIGHT, FRAME_WIDTH, decode_frame
+
+
+def make_jpeg(width, height, seed=0):
+    rng = np.random.default_rng(seed)
+    # Smooth gradients plus a little noise compress like a webcam frame, unlike pure noise
+    y, x = np.mgrid[0:height, 0:width]
+    base = np.stack([x * 255 // width, y * 255 // height, (x + y) * 255 // (width + height)], axis=2)
+    pixels = np.clip(base + rng.normal(0, 8, base.shape), 0, 255).astype(np.uint8)
+    return cv2.imencode(".jpg", pixels, [cv2.IMWRITE_JPEG_QUALITY, 92])[1].tobytes()
+
+
+def pil_path(data):
+    image = Image.open(io.BytesIO(data))
+    frame = cv2.cvtColor(np.array(image), cv2.COLOR_RGB2BGR)  # handle_video
+    return cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)  # process_frame
+
+
+def bench(label, fn, number=50):
+    best = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"  {label:<28} {best * 1e3:8.2f} ms/frame")
+    return best
+
+
+if __name__ == "__main__":
+    for width, height in [(640, 480), (1280, 720), (1920, 1080)]:
+        data = make_jpeg(width, height)
+        print(f"{width}x{height} source, {FRAME_WIDTH}x{FRAME_HEIGHT} working resolution")
+        old = bench("PIL + BGR/RGB round trip", lambda: pil_path(data))
+        new = bench("frame_decode.decode_frame", lambda: decode_frame(data))
+        queued_array = width * height * 3
+        print(f"  speedup {old / new:.1f}x; queued bytes {queued_array} (array) vs {len(data)} (JPEG),"
+              f" {queued_array / len(data):.1f}x smaller")
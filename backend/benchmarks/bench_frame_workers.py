@@ -0,0 +1,67 @@
+"""Frame throughput of FrameWorkerPool for 1..N worker processes.
+
+Uses a CPU-bound stand-in for FaceAnalyzer so it runs without MediaPipe.
+Run from the backend folder:
+    python -m benchmarks.bench_frame_workers [max_workers]
+"""
+import os
+import sys
+import threading
+import time
+
+import cv2
+import numpy as np
+
+from frame_workers import FrameWorkerPool
+
+FRAMES = 400
+SESSIONS = 32
+
+
+class SyntheticAnalyzer:
+    """Roughly the cost profile of a mesh pass: a few full-frame filters"""
+
+    def process_frame(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_RGB2GRAY)
+        for _ in range(4):
+            gray = cv2.GaussianBlur(gray, (15, 15), 0)
+        return {"status": "success", "engagement_score": float(gray.mean()) / 255}
+
+    def close(self):
+        pass
+
+
+def run(num_workers, frame):
+    done = threading.Semaphore(0)
+    pool = FrameWorkerPool(num_workers=num_workers, on_result=lambda session_id, result: done.release(),
+                           analyzer_factory=SyntheticAnalyzer)
+    pool.start()
+    # Warm the workers up before timing
+    for i in range(num_workers * 2):
+        while not pool.submit(f"warmup-{i}", frame):
+            time.sleep(0.001)
+    for _ in range(num_workers * 2):
+        done.acquire()
+
+    start = time.perf_counter()
+    for i in range(FRAMES):
+        while not pool.submit(f"session-{i % SESSIONS}", frame):
+            time.sleep(0.0005)
+    for _ in range(FRAMES):
+        done.acquire()
+    elapsed = time.perf_counter() - start
+    pool.shutdown()
+    return FRAMES / elapsed
+
+
+if __name__ == "__main__":
+    max_workers = int(sys.argv[1]) if len(sys.argv) > 1 else (os.cpu_count() or 1)
+    pixels = np.random.default_rng(0).integers(0, 255, size=(480, 640, 3), dtype=np.uint8)
+    frame = cv2.imencode(".jpg", pixels)[1].tobytes()
+    baseline = None
+    for workers in sorted({1, 2, 4, max_workers}):
+        if workers > max_workers:
+            continue
+        fps = run(workers, frame)
+        baseline = baseline or fps
+        print(f"{workers:>2} workers: {fps:8.1f} frames/s  ({fps / baseline:.2f}x)")
@@ -0,0 +1,116 @@
+"""Kafka message size and throughput: JSON (base64 frames) vs event_codec.
+
+Bytes per event are measured for each message shape the app publishes, both
+one message at a time and as producer batches compressed the way the broker
+would store them. Throughput covers serialization alone; with kafka-python
+installed and KAFKA_BROKER reachable it also times the old producer settings
+against linger/batch/compression.
+
+Run from the backend folder:
+    python -m benchmarks.bench_kafka_codec
+"""
+import base64
+import gzip
+import json
+import os
+import time
+import timeit
+import uuid
+
+import numpy as np
+
+from event_codec import default_codec
+
+BATCH_EVENTS = 200
+PRODUCER_MESSAGES = 20000
+
+
+def make_events(seed=0):
+    rng = np.random.default_rng(seed)
+    session_id = str(uuid.UUID(int=int(rng.integers(1 << 62))))
+    # A JPEG body does not compress; random bytes stand in for one
+    frame = rng.integers(0, 256, 30000, dtype=np.uint8).tobytes()
+    return {
+        "score": ("interview_updates", {"session_id": session_id, "positivity_score": round(float(rng.random()), 3)}),
+        "transcript": ("interview_transcripts", {
+            "session_id": session_id,
+            "transcript": "I led the migration of our billing service to an event driven design",
+            "confidence": round(float(rng.random()), 2),
+            "is_final": True
+        }),
+        "error": ("interview_errors", {"error": "Audio decoder exited", "type": "audio_processing"}),
+        "video frame": ("video_stream", frame),
+    }
+
+
+def legacy(topic, value):
+    if topic == "video_stream":
+        value = {"image": base64.b64encode(value).decode("utf-8")}
+    return json.dumps(value).encode("utf-8")
+
+
+def compressors():
+    found = {"gzip": lambda data: gzip.compress(data, compresslevel=6)}
+    try:
+        import lz4.frame
+        found["lz4"] = lz4.frame.compress
+    except ImportError:
+        pass
+    try:
+        import zstandard
+        found["zstd"] = zstandard.ZstdCompressor().compress
+    except ImportError:
+        pass
+    return found
+
+
+def batch_bytes(messages, compress):
+    return len(compress(b"".join(messages))) / len(messages)
+
+
+def producer_throughput(topic, payloads, **config):
+    from kafka import KafkaProducer
+    producer = KafkaProducer(bootstrap_servers=os.getenv("KAFKA_BROKER", "localhost:9092"), **config)
+    start = time.perf_counter()
+    for i in range(PRODUCER_MESSAGES):
+        producer.send(topic, payloads[i % len(payloads)])
+    producer.flush()
+    elapsed = time.perf_counter() - start
+    producer.close()
+    return PRODUCER_MESSAGES / elapsed
+
+
+if __name__ == "__main__":
+    codec = default_codec("binary")
+    events = make_events()
+    available = compressors()
+
+    print(f"Bytes per event (batches of {BATCH_EVENTS} for the compressed columns)")
+    print(f"  {'event':<12} {'json':>8} {'binary':>8}" + "".join(f" {name + ' json':>10} {name + ' bin':>9}"
+                                                            for name in available))
+    for name, (topic, value) in events.items():
+        old, new = legacy(topic, value), codec.serialize(topic, value)
+        assert codec.deserialize(topic, new) is not None
+        row = f"  {name:<12} {len(old):8d} {len(new):8d}"
+        # Different sessions and scores per batch, as the producer would see them
+        batch = [make_events(seed)[name][1] for seed in range(BATCH_EVENTS)]
+        for compress in available.values():
+            row += f" {batch_bytes([legacy(topic, v) for v in batch], compress):10.0f}"
+            row += f" {batch_bytes([codec.serialize(topic, v) for v in batch], compress):9.0f}"
+        print(row)
+
+    print("Serialization throughput")
+    for name, (topic, value) in events.items():
+        old = min(timeit.repeat(lambda: legacy(topic, value), number=2000, repeat=3)) / 2000
+        new = min(timeit.repeat(lambda: codec.serialize(topic, value), number=2000, repeat=3)) / 2000
+        print(f"  {name:<12} json {1 / old:10.0f}/s  binary {1 / new:10.0f}/s  {old / new:5.1f}x")
+
+    try:
+        topic, value = events["score"]
+        payloads = [legacy(topic, value)]
+        baseline = producer_throughput("bench_kafka_codec", payloads)
+        batched = producer_throughput("bench_kafka_codec", [codec.serialize(topic, value)],
+                                      linger_ms=5, batch_size=65536, compression_type="gzip")
+        print(f"Producer: json/defaults {baseline:.0f} msg/s, binary/batched {batched:.0f} msg/s")
+    except Exception as e:
+        print(f"Producer throughput skipped (needs kafka-python and a broker): {e}")
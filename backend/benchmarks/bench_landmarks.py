@@ -0,0 +1,76 @@
+"""Per-frame face-mesh geometry cost: dict-of-tuples path vs (468, 2) array path.
+
+Run from the backend folder:
+    python -m benchmarks.bench_landmarks
+"""
+import timeit
+from types import SimpleNamespace
+
+import numpy as np
+from scipy.spatial import distance
+
+import landmark_geometry as geometry
+
+WIDTH, HEIGHT = 640, 480
+
+
+def make_face_landmarks(seed=0):
+    rng = np.random.default_rng(seed)
+    coords = rng.uniform(0.2, 0.8, size=(geometry.NUM_LANDMARKS, 2))
+    return SimpleNamespace(landmark=[SimpleNamespace(x=float(x), y=float(y)) for x, y in coords])
+
+
+def dict_path(face_landmarks, prev_center):
+    landmarks = {i: (lm.x * WIDTH, lm.y * HEIGHT) for i, lm in enumerate(face_landmarks.landmark)}
+
+    def ear(eye):
+        A = distance.euclidean(landmarks[eye[1]], landmarks[eye[5]])
+        B = distance.euclidean(landmarks[eye[2]], landmarks[eye[4]])
+        C = distance.euclidean(landmarks[eye[0]], landmarks[eye[3]])
+        return (A + B) / (2.0 * C)
+
+    value = (ear(geometry.LEFT_EYE) + ear(geometry.RIGHT_EYE)) / 2.0
+    center = np.mean([landmarks[i] for i in range(468)], axis=0)
+    movement = np.linalg.norm(np.array(center) - np.array(prev_center))
+    nose, chin = landmarks[geometry.NOSE_TIP], landmarks[geometry.CHIN]
+    left_ear, right_ear = landmarks[geometry.LEFT_EAR], landmarks[geometry.RIGHT_EAR]
+    tilt = abs(nose[1] - chin[1]) / abs(left_ear[0] - right_ear[0] + 1e-6)
+    return value, center, movement, tilt
+
+
+def array_path(face_landmarks, prev_center):
+    points = geometry.landmarks_to_array(face_landmarks, WIDTH, HEIGHT)
+    value = float(geometry.eye_aspect_ratios(points).mean())
+    center = geometry.face_center(points)
+    movement = geometry.head_movement(center, prev_center)
+    tilt = geometry.head_tilt_score(points)
+    return value, center, movement, tilt
+
+
+def array_geometry_only(points, prev_center):
+    value = float(geometry.eye_aspect_ratios(points).mean())
+    center = geometry.face_center(points)
+    movement = geometry.head_movement(center, prev_center)
+    tilt = geometry.head_tilt_score(points)
+    return value, center, movement, tilt
+
+
+def bench(label, fn, number=2000):
+    best = min(timeit.repeat(fn, number=number, repeat=5)) / number
+    print(f"{label:<40} {best * 1e6:10.1f} us/frame")
+    return best
+
+
+if __name__ == "__main__":
+    face = make_face_landmarks()
+    prev = np.array([WIDTH / 2, HEIGHT / 2], dtype=np.float32)
+    points = geometry.landmarks_to_array(face, WIDTH, HEIGHT)
+
+    legacy_ear = dict_path(face, prev)[0]
+    vector_ear = array_path(face, prev)[0]
+    assert abs(legacy_ear - vector_ear) < 1e-3, (legacy_ear, vector_ear)
+
+    legacy = bench("dict + scipy (previous)", lambda: dict_path(face, prev), number=500)
+    vector = bench("array conversion + vector ops", lambda: array_path(face, prev))
+    geometry_only = bench("vector ops on converted array", lambda: array_geometry_only(points, prev))
+    print(f"speedup: {legacy / vector:.1f}x end to end, {legacy / geometry_only:.1f}x geometry only")
@@ -0,0 +1,77 @@
+"""Socket.IO 'update' volume: one emit per frame/event vs update_coalescer.
+
+Simulates sessions streaming analysed frames at FRAME_RATE with slowly
+drifting scores, plus a duplicate positivity score per frame as the Kafka
+path re-published it, and counts the messages and JSON bytes that would be
+sent to clients either way.
+
+Run from the backend folder:
+    python -m benchmarks.bench_update_coalescer
+"""
+import json
+import threading
+import time
+
+import numpy as np
+
+from update_coalescer import UPDATE_MAX_RATE, UpdateCoalescer
+
+SESSIONS = 20
+FRAME_RATE = 15
+SECONDS = 4.0
+
+
+class Counter:
+    def __init__(self):
+        self.messages = 0
+        self.bytes = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, session_id, payload):
+        size = len(json.dumps(payload))
+        with self._lock:
+            self.messages += 1
+            self.bytes += size
+
+
+def frame_update(rng, state, seq):
+    state["engagement"] = float(np.clip(state["engagement"] + rng.normal(0, 0.004), 0, 1))
+    if rng.random() < 0.02:
+        state["emotion"] = rng.choice(["neutral", "happy", "surprise"])
+    return {
+        "engagement_score": state["engagement"],
+        "fused_engagement_score": state["engagement"],
+        "emotion": state["emotion"],
+        "positivity_score": 0.4 + 0.6 * state["engagement"],
+        "analysis_mode": "full",
+        "seq": seq
+    }
+
+
+def run(send):
+    rng = np.random.default_rng(0)
+    states = [{"engagement": 0.6, "emotion": "neutral"} for _ in range(SESSIONS)]
+    frames = int(SECONDS * FRAME_RATE)
+    start = time.monotonic()
+    for seq in range(1, frames + 1):
+        for i, state in enumerate(states):
+            update = frame_update(rng, state, seq)
+            send(f"session-{i}", update)
+            send(f"session-{i}", {"positivity_score": update["positivity_score"]})
+        time.sleep(max(0.0, start + seq / FRAME_RATE - time.monotonic()))
+
+
+if __name__ == "__main__":
+    direct = Counter()
+    run(direct)
+
+    coalesced = Counter()
+    coalescer = UpdateCoalescer(coalesced)
+    run(coalescer.update)
+    time.sleep(2.0 / UPDATE_MAX_RATE)
+    coalescer.close()
+
+    print(f"{SESSIONS} sessions x {FRAME_RATE} fps x {SECONDS:.0f} s, max {UPDATE_MAX_RATE:g} flushes/s per session")
+    print(f"  direct     {direct.messages:6d} messages {direct.bytes:9d} bytes")
+    print(f"  coalesced  {coalesced.messages:6d} messages {coalesced.bytes:9d} bytes")
+    print(f"  reduction  {direct.messages / coalesced.messages:6.1f}x        {direct.bytes / coalesced.bytes:9.1f}x")
@@ -0,0 +1,199 @@
+"""Micro-batched emotion inference shared by every session in a process.
+
+Analyzers submit face images with a callback instead of calling DeepFace
+inline. A scheduler thread collects requests for up to
+EMOTION_BATCH_WINDOW_MS or EMOTION_BATCH_SIZE items, runs one batched forward
+pass of the emotion model and hands each label back through its callback.
+Every request carries a deadline: a batch is flushed early when waiting any
+longer would push its oldest request past the deadline, and requests that
+have already expired are answered with ``None`` instead of being run.
+"""
+import logging
+import os
+import threading
+import time
+from collections import deque
+
+import cv2
+import numpy as np
+
+from emotion_labels import EMOTION_LABELS
+
+logger = logging.getLogger(__name__)
+
+EMOTION_BATCH_SIZE = int(os.getenv("EMOTION_BATCH_SIZE", "16"))
+EMOTION_BATCH_WINDOW_MS = float(os.getenv("EMOTION_BATCH_WINDOW_MS", "5"))
+EMOTION_DEADLINE_MS = float(os.getenv("EMOTION_DEADLINE_MS", "250"))
+
+EMOTION_INPUT_SIZE = 48
+
+
+class DeepFaceEmotionModel:
+    """Batched wrapper around DeepFace's facial-expression model"""
+
+    def __init__(self):
+        from deepface import DeepFace
+        try:
+            client = DeepFace.build_model(task="facial_attribute", model_name="Emotion")
+        except TypeError:
+            client = DeepFace.build_model("Emotion")
+        self.model = getattr(client, "model", client)
+
+    def preprocess(self, image):
+        """Locate the face in an RGB frame and return a 48x48 grayscale input in [0, 1]"""
+        from deepface import DeepFace
+        faces = DeepFace.extract_faces(np.ascontiguousarray(image[..., ::-1]), detector_backend="opencv",
+                                       enforce_detection=False)
+        face = faces[0]["face"] if faces else image
+        if face.dtype != np.uint8:
+            face = np.clip(face * 255, 0, 255).astype(np.uint8)
+        gray = cv2.cvtColor(face, cv2.COLOR_RGB2GRAY) if face.ndim == 3 else face
+        gray = cv2.resize(gray, (EMOTION_INPUT_SIZE, EMOTION_INPUT_SIZE), interpolation=cv2.INTER_AREA)
+        return gray.astype(np.float32) / 255.0
+
+    def predict(self, inputs):
+        """Dominant emotion for each preprocessed input, in one forward pass"""
+        batch = np.stack(inputs)[..., np.newaxis]
+        scores = self.model.predict(batch, verbose=0)
+        return [EMOTION_LABELS[i] for i in np.argmax(scores, axis=1)]
+
+
+def face_roi_input(frame, bbox):
+    """Crop an RGB frame to a face box and return the model's 48x48 grayscale input in [0, 1]"""
+    x0, y0, x1, y1 = bbox
+    gray = cv2.cvtColor(frame[y0:y1, x0:x1], cv2.COLOR_RGB2GRAY)
+    gray = cv2.resize(gray, (EMOTION_INPUT_SIZE, EMOTION_INPUT_SIZE), interpolation=cv2.INTER_AREA)
+    return gray.astype(np.float32) / 255.0
+
+
+class _EmotionRequest:
+    __slots__ = ("image", "callback", "submitted", "deadline", "preprocessed")
+
+    def __init__(self, image, callback, submitted, deadline, preprocessed):
+        self.image = image
+        self.callback = callback
+        self.submitted = submitted
+        self.deadline = deadline
+        self.preprocessed = preprocessed
+
+
+class EmotionBatcher:
+    """Deadline-aware micro-batching scheduler for emotion inference"""
+
+    def __init__(self, model=None, max_batch=EMOTION_BATCH_SIZE,
+                 window_ms=EMOTION_BATCH_WINDOW_MS, deadline_ms=EMOTION_DEADLINE_MS):
+        self._model = model
+        self.max_batch = max_batch
+        self.window = window_ms / 1000.0
+        self.deadline = deadline_ms / 1000.0
+        self._pending = deque()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._infer_estimate = 0.0  # EMA of batch latency, used to flush before deadlines
+        self.batches = 0
+        self.completed = 0
+        self.expired = 0
+        self._thread = threading.Thread(target=self._run, name="emotion-batcher", daemon=True)
+        self._thread.start()
+
+    @property
+    def model(self):
+        if self._model is None:
+            self._model = DeepFaceEmotionModel()
+        return self._model
+
+    def submit(self, image, callback, deadline_ms=None, preprocessed=False):
+        """Queue an image; ``callback(label)`` receives the emotion, or None if it expired.
+
+        With ``preprocessed=True`` the image is already a model input from
+        face_roi_input() and skips face detection.
+        """
+        now = time.monotonic()
+        deadline = now + (deadline_ms / 1000.0 if deadline_ms is not None else self.deadline)
+        with self._cond:
+            if self._closed:
+                return False
+            self._pending.append(_EmotionRequest(image, callback, now, deadline, preprocessed))
+            self._cond.notify()
+        return True
+
+    @property
+    def batch_latency(self):
+        """Running estimate of one batch's inference time, in seconds"""
+        return self._infer_estimate
+
+    def stats(self):
+        return {
+            "batches": self.batches,
+            "completed": self.completed,
+            "expired": self.expired,
+            "mean_batch_size": self.completed / self.batches if self.batches else 0.0,
+            "batch_latency_ms": self._infer_estimate * 1000.0,
+            "pending": len(self._pending)
+        }
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+        self._thread.join(timeout=5)
+
+    def _next_batch(self):
+        with self._cond:
+            while not self._pending and not self._closed:
+                self._cond.wait()
+            if not self._pending:
+                return None
+
+            flush_at = self._pending[0].submitted + self.window
+            while len(self._pending) < self.max_batch and not self._closed:
+                latest_start = min(r.deadline for r in self._pending) - self._infer_estimate
+                wait = min(flush_at, latest_start) - time.monotonic()
+                if wait <= 0:
+                    break
+                self._cond.wait(wait)
+
+            count = min(len(self._pending), self.max_batch)
+            return [self._pending.popleft() for _ in range(count)]
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                return
+
+            now = time.monotonic()
+            live = []
+            for request in batch:
+                if request.deadline <= now:
+                    self.expired += 1
+                    self._deliver(request, None)
+                else:
+                    live.append(request)
+            if not live:
+                continue
+
+            start = time.perf_counter()
+            try:
+                inputs = [
+                    request.image if request.preprocessed else self.model.preprocess(request.image)
+                    for request in live
+                ]
+                labels = self.model.predict(inputs)
+            except Exception as e:
+                logger.error(f"Emotion detection error: {str(e)}")
+                labels = ["neutral"] * len(live)
+            elapsed = time.perf_counter() - start
+            self._infer_estimate = elapsed if not self.batches else 0.8 * self._infer_estimate + 0.2 * elapsed
+            self.batches += 1
+            self.completed += len(live)
+
+            for request, label in zip(live, labels):
+                self._deliver(request, label)
+
+    @staticmethod
+    def _deliver(request, label):
+        try:
+            request.callback(label)
+        except Exception as e:
+            logger.error(f"Emotion callback error: {str(e)}")
@@ -0,0 +1,7 @@
+"""Emotion classes in the order the DeepFace emotion model scores them.
+
+Shared by the frame workers (emotion_batcher.py) and the timelines in the
+API process, which should not import OpenCV to learn the labels.
+"""
+
+EMOTION_LABELS = ["angry", "disgust", "fear", "happy", "sad", "surprise", "neutral"]
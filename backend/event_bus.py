@@ -0,0 +1,238 @@
+"""Session event bus with an in-process and a Kafka backend.
+
+Producers call ``publish(topic, event, session_id)`` and subscribers are
+called as ``handler(event, session_id)`` on the bus's own thread, whichever
+backend is in use. EVENT_BUS picks the backend:
+
+- "inprocess" (default): events are put, as the objects themselves, on a
+  bounded queue and handed to the topic's subscribers by one dispatcher
+  thread. Nothing is serialized and there is no network hop; topics nobody
+  subscribed to cost nothing. Right for a single API node.
+- "kafka": events are serialized per topic (event_codec.py), keyed by session
+  and sent through a batching, compressing producer. One consumer thread per
+  subscribed topic joins KAFKA_CONSUMER_GROUP, so several API nodes share the
+  partitions. A missing broker never blocks publishers: connection attempts
+  are spaced KAFKA_RETRY_SECONDS apart and events published meanwhile are
+  counted as dropped.
+"""
+import logging
+import os
+import queue
+import threading
+import time
+from collections import defaultdict
+
+from event_codec import default_codec
+
+logger = logging.getLogger(__name__)
+
+EVENT_BUS = os.getenv("EVENT_BUS", "inprocess")
+EVENT_BUS_MAX_QUEUE = int(os.getenv("EVENT_BUS_MAX_QUEUE", "10000"))
+
+KAFKA_BROKER = os.getenv("KAFKA_BROKER", "localhost:9092")
+KAFKA_RETRY_SECONDS = float(os.getenv("KAFKA_RETRY_SECONDS", "10"))
+# Producer batching: wait up to linger_ms to fill batch_size bytes per partition, then compress the batch
+KAFKA_LINGER_MS = int(os.getenv("KAFKA_LINGER_MS", "5"))
+KAFKA_BATCH_SIZE = int(os.getenv("KAFKA_BATCH_SIZE", "65536"))
+KAFKA_COMPRESSION = os.getenv("KAFKA_COMPRESSION", "lz4")  # lz4, zstd, gzip, snappy or none
+# API nodes in one group split the topics' partitions between them
+KAFKA_CONSUMER_GROUP = os.getenv("KAFKA_CONSUMER_GROUP", "interview-api")
+
+
+class EventBus:
+    def __init__(self):
+        self.handlers = defaultdict(list)
+        self.published = 0
+        self.delivered = 0
+        self.dropped = 0
+        self.failed = 0
+        self._lock = threading.Lock()
+
+    def subscribe(self, topic, handler):
+        self.handlers[topic].append(handler)
+
+    def publish(self, topic, event, session_id=None):
+        """Send an event for a session; False if the bus had to drop it"""
+        raise NotImplementedError
+
+    def start(self):
+        """Begin delivering to subscribers; raises if the backend cannot be reached"""
+
+    def close(self):
+        pass
+
+    def stats(self):
+        with self._lock:
+            return {
+                "backend": self.backend,
+                "published": self.published,
+                "delivered": self.delivered,
+                "dropped": self.dropped,
+                "failed": self.failed
+            }
+
+    def _count(self, name):
+        with self._lock:
+            setattr(self, name, getattr(self, name) + 1)
+
+    def _dispatch(self, topic, event, session_id):
+        for handler in self.handlers.get(topic, ()):
+            try:
+                handler(event, session_id)
+                self._count("delivered")
+            except Exception as e:
+                logger.error(f"Event handler error on {topic}: {str(e)}")
+                self._count("failed")
+
+
+def _session_of(event, session_id):
+    if session_id is None and isinstance(event, dict):
+        return event.get("session_id")
+    return session_id
+
+
+class InProcessEventBus(EventBus):
+    backend = "inprocess"
+
+    def __init__(self, max_queue=EVENT_BUS_MAX_QUEUE):
+        super().__init__()
+        self._queue = queue.Queue(max_queue)
+        self._thread = threading.Thread(target=self._run, name="event-bus", daemon=True)
+        self._thread.start()
+
+    def publish(self, topic, event, session_id=None):
+        if topic not in self.handlers:
+            return True
+        try:
+            self._queue.put_nowait((topic, event, _session_of(event, session_id)))
+        except queue.Full:
+            self._count("dropped")
+            return False
+        self._count("published")
+        return True
+
+    def close(self, timeout=5):
+        self._queue.put(None)
+        self._thread.join(timeout=timeout)
+
+    def stats(self):
+        return {**super().stats(), "queued": self._queue.qsize()}
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is None:
+                return
+            self._dispatch(*item)
+
+
+class KafkaEventBus(EventBus):
+    backend = "kafka"
+
+    def __init__(self, broker=KAFKA_BROKER, codec=None, group_id=KAFKA_CONSUMER_GROUP,
+                 retry_seconds=KAFKA_RETRY_SECONDS):
+        super().__init__()
+        self.broker = broker
+        self.codec = codec or default_codec()
+        self.group_id = group_id
+        self.retry_seconds = retry_seconds
+        self._producer = None
+        self._next_attempt = 0.0
+        self._producer_lock = threading.Lock()
+        self._closed = threading.Event()
+        self._consumers = []
+
+    def producer(self):
+        """The shared producer, or None while the broker is unreachable"""
+        with self._producer_lock:
+            if self._producer is None and time.monotonic() >= self._next_attempt:
+                from kafka import KafkaProducer
+                try:
+                    # Values are serialized per topic in publish()
+                    self._producer = KafkaProducer(
+                        bootstrap_servers=self.broker,
+                        linger_ms=KAFKA_LINGER_MS,
+                        batch_size=KAFKA_BATCH_SIZE,
+                        compression_type=kafka_compression()
+                    )
+                except Exception as e:
+                    self._next_attempt = time.monotonic() + self.retry_seconds
+                    logger.warning(f"Kafka producer unavailable: {str(e)}")
+            return self._producer
+
+    def publish(self, topic, event, session_id=None):
+        producer = self.producer()
+        if producer is None:
+            self._count("dropped")
+            return False
+        session_id = _session_of(event, session_id)
+        # The key keeps a session's events in order on one partition
+        key = str(session_id).encode("utf-8") if session_id is not None else None
+        producer.send(topic, self.codec.serialize(topic, event), key=key)
+        self._count("published")
+        return True
+
+    def start(self):
+        for topic in self.handlers:
+            thread = threading.Thread(target=self._consume, args=(topic,), name=f"kafka-{topic}", daemon=True)
+            thread.start()
+            self._consumers.append(thread)
+        if self.producer() is None:
+            raise RuntimeError(f"Kafka broker {self.broker} unreachable")
+
+    def close(self, timeout=5):
+        self._closed.set()
+        for thread in self._consumers:
+            thread.join(timeout=timeout)
+        with self._producer_lock:
+            if self._producer is not None:
+                self._producer.close(timeout=timeout)
+                self._producer = None
+
+    def _consume(self, topic):
+        from kafka import KafkaConsumer
+        while not self._closed.is_set():
+            try:
+                consumer = KafkaConsumer(
+                    topic,
+                    bootstrap_servers=self.broker,
+                    group_id=self.group_id,
+                    auto_offset_reset='latest',
+                    consumer_timeout_ms=1000  # Wake up to notice close()
+                )
+            except Exception as e:
+                # Keep serving without this topic until the broker comes back
+                logger.warning(f"Kafka consumer unavailable, retrying in {self.retry_seconds}s: {str(e)}")
+                self._closed.wait(self.retry_seconds)
+                continue
+
+            try:
+                while not self._closed.is_set():
+                    for message in consumer:
+                        event = self.codec.deserialize(topic, message.value)
+                        key = message.key.decode("utf-8") if message.key else None
+                        self._dispatch(topic, event, _session_of(event, None) or key)
+            except Exception as e:
+                logger.error(f"Kafka consumer error on {topic}: {str(e)}")
+            finally:
+                consumer.close()
+
+
+def kafka_compression():
+    """KAFKA_COMPRESSION if its codec library is installed, gzip (stdlib) if not"""
+    if KAFKA_COMPRESSION in ("", "none"):
+        return None
+    from kafka import codec
+    available = {"lz4": codec.has_lz4, "zstd": codec.has_zstd, "gzip": codec.has_gzip, "snappy": codec.has_snappy}
+    if KAFKA_COMPRESSION in available and available[KAFKA_COMPRESSION]():
+        return KAFKA_COMPRESSION
+    logger.warning(f"Kafka compression {KAFKA_COMPRESSION} unavailable, using gzip")
+    return "gzip"
+
+
+def create_event_bus(kind=EVENT_BUS):
+    if kind == "kafka":
+        return KafkaEventBus()
+    if kind != "inprocess":
+        raise ValueError(f"Unknown EVENT_BUS backend: {kind}")
+    return InProcessEventBus()
@@ -0,0 +1,217 @@
+"""Compact, versioned wire format for the events published to Kafka.
+
+Every binary message starts with a three-byte header: MAGIC, FORMAT_VERSION
+and an event type. The body depends on the type:
+
+- SCORE: session id, then (field code, float32) pairs for the SCORE_FIELDS present
+- TRANSCRIPT: session id, flags (final, has confidence), float32 confidence, text
+- ERROR: session id, error type, message
+- MEDIA: the raw payload bytes (e.g. a JPEG frame), with no base64 or JSON
+- JSON: UTF-8 JSON, for events outside these schemas
+
+Strings are length-prefixed UTF-8: one byte for ids and error types, four for
+free text. Messages without the header are read as the legacy JSON encoding,
+so consumers keep working while producers are upgraded.
+
+Serializers are chosen per topic through a TopicCodec; ``KAFKA_SERIALIZER``
+picks "binary" (default) or "json" for the event topics.
+"""
+import json
+import os
+import struct
+
+KAFKA_SERIALIZER = os.getenv("KAFKA_SERIALIZER", "binary")
+
+MAGIC = 0xEC
+FORMAT_VERSION = 1
+
+TYPE_JSON = 0
+TYPE_SCORE = 1
+TYPE_TRANSCRIPT = 2
+TYPE_ERROR = 3
+TYPE_MEDIA = 4
+
+# Append only: the position is the wire code
+SCORE_FIELDS = ("positivity_score", "engagement_score", "fused_engagement_score", "vocal_engagement",
+                "blink_rate", "head_movement")
+_SCORE_CODES = {name: code for code, name in enumerate(SCORE_FIELDS)}
+_TRANSCRIPT_KEYS = frozenset(("session_id", "transcript", "confidence", "is_final"))
+_ERROR_KEYS = frozenset(("session_id", "error", "type"))
+
+_HEADER = struct.Struct("<BBB")
+_SCORE = struct.Struct("<Bf")
+_TRANSCRIPT = struct.Struct("<Bf")
+_U8 = struct.Struct("<B")
+_U32 = struct.Struct("<I")
+
+FINAL = 0x01
+HAS_CONFIDENCE = 0x02
+
+
+class EventSerializer:
+    """Turns one topic's event values into bytes and back"""
+
+    def serialize(self, value):
+        raise NotImplementedError
+
+    def deserialize(self, data):
+        raise NotImplementedError
+
+
+class JsonSerializer(EventSerializer):
+    """The original encoding: a JSON document per message"""
+
+    def serialize(self, value):
+        return json.dumps(value).encode("utf-8")
+
+    def deserialize(self, data):
+        return decode_event(data)
+
+
+class BinarySerializer(EventSerializer):
+    """Score, transcript and error events in their binary schema; anything else as tagged JSON"""
+
+    def serialize(self, value):
+        return encode_event(value)
+
+    def deserialize(self, data):
+        return decode_event(data)
+
+
+class MediaSerializer(EventSerializer):
+    """Raw bytes behind the header; dicts from older callers still go through as JSON"""
+
+    def serialize(self, value):
+        if isinstance(value, (bytes, bytearray, memoryview)):
+            return _HEADER.pack(MAGIC, FORMAT_VERSION, TYPE_MEDIA) + bytes(value)
+        return encode_event(value)
+
+    def deserialize(self, data):
+        return decode_event(data)
+
+
+class TopicCodec:
+    """Per-topic serializers, with a default for unregistered topics"""
+
+    def __init__(self, default=None):
+        self.default = default or BinarySerializer()
+        self.serializers = {}
+
+    def register(self, topic, serializer):
+        self.serializers[topic] = serializer
+        return self
+
+    def serializer(self, topic):
+        return self.serializers.get(topic, self.default)
+
+    def serialize(self, topic, value):
+        return self.serializer(topic).serialize(value)
+
+    def deserialize(self, topic, data):
+        return self.serializer(topic).deserialize(data)
+
+
+def default_codec(kind=KAFKA_SERIALIZER):
+    """The app's topics: events in ``kind`` ("binary" or "json"), video frames as raw bytes"""
+    events = JsonSerializer() if kind == "json" else BinarySerializer()
+    codec = TopicCodec(events)
+    for topic in ("interview_updates", "interview_errors", "interview_transcripts"):
+        codec.register(topic, events)
+    return codec.register("video_stream", MediaSerializer())
+
+
+def encode_event(value):
+    """Binary encoding of an event, using its schema when it fits one"""
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return _HEADER.pack(MAGIC, FORMAT_VERSION, TYPE_MEDIA) + bytes(value)
+    if isinstance(value, dict):
+        try:
+            body = _encode_schema(value)
+        except (TypeError, ValueError, struct.error, UnicodeError):
+            body = None  # Out of range for the schema, e.g. a very long session id
+        if body is not None:
+            return body
+    return _HEADER.pack(MAGIC, FORMAT_VERSION, TYPE_JSON) + json.dumps(value).encode("utf-8")
+
+
+def decode_event(data):
+    """An event from either encoding: dict for events, bytes for media"""
+    data = bytes(data)
+    if len(data) < _HEADER.size or data[0] != MAGIC:
+        return json.loads(data.decode("utf-8"))
+    _, version, event_type = _HEADER.unpack_from(data)
+    if version > FORMAT_VERSION:
+        raise ValueError(f"Unsupported event format version {version}")
+    offset = _HEADER.size
+
+    if event_type == TYPE_MEDIA:
+        return data[offset:]
+    if event_type == TYPE_JSON:
+        return json.loads(data[offset:].decode("utf-8"))
+
+    session_id, offset = _read_str(data, offset, _U8)
+    event = {} if session_id is None else {"session_id": session_id}
+    if event_type == TYPE_SCORE:
+        count = data[offset]
+        offset += 1
+        for _ in range(count):
+            code, score = _SCORE.unpack_from(data, offset)
+            offset += _SCORE.size
+            if code < len(SCORE_FIELDS):  # Fields from a newer producer are skipped
+                event[SCORE_FIELDS[code]] = score
+    elif event_type == TYPE_TRANSCRIPT:
+        flags, confidence = _TRANSCRIPT.unpack_from(data, offset)
+        event["transcript"], _ = _read_str(data, offset + _TRANSCRIPT.size, _U32)
+        event["is_final"] = bool(flags & FINAL)
+        if flags & HAS_CONFIDENCE:
+            event["confidence"] = confidence
+    elif event_type == TYPE_ERROR:
+        error_type, offset = _read_str(data, offset, _U8)
+        event["error"], _ = _read_str(data, offset, _U32)
+        if error_type is not None:
+            event["type"] = error_type
+    else:
+        raise ValueError(f"Unknown event type {event_type}")
+    return event
+
+
+def _encode_schema(event):
+    keys = event.keys()
+    session = _str(event.get("session_id"), _U8)
+    if keys <= _SCORE_CODES.keys() | {"session_id"}:
+        scores = [(_SCORE_CODES[name], float(value)) for name, value in event.items()
+                  if name != "session_id" and value is not None]
+        if scores and len(scores) == len(keys) - ("session_id" in keys):
+            return b"".join([_HEADER.pack(MAGIC, FORMAT_VERSION, TYPE_SCORE), session, _U8.pack(len(scores))]
+                            + [_SCORE.pack(code, value) for code, value in scores])
+    elif "transcript" in keys and keys <= _TRANSCRIPT_KEYS:
+        confidence = event.get("confidence")
+        flags = (FINAL if event.get("is_final") else 0) | (HAS_CONFIDENCE if confidence is not None else 0)
+        return b"".join([_HEADER.pack(MAGIC, FORMAT_VERSION, TYPE_TRANSCRIPT), session,
+                         _TRANSCRIPT.pack(flags, confidence or 0.0), _str(event["transcript"], _U32)])
+    elif "error" in keys and keys <= _ERROR_KEYS:
+        return b"".join([_HEADER.pack(MAGIC, FORMAT_VERSION, TYPE_ERROR), session,
+                         _str(event.get("type"), _U8), _str(str(event["error"]), _U32)])
+    return None
+
+
+def _str(value, length):
+    """Length-prefixed UTF-8; None is written as the prefix's largest value"""
+    if value is None:
+        return length.pack(_none_marker(length))
+    encoded = str(value).encode("utf-8")
+    if len(encoded) >= _none_marker(length):
+        raise ValueError("String too long for its length prefix")
+    return length.pack(len(encoded)) + encoded
+
+
+def _read_str(data, offset, length):
+    size, = length.unpack_from(data, offset)
+    offset += length.size
+    if size == _none_marker(length):
+        return None, offset
+    return data[offset:offset + size].decode("utf-8"), offset + size
+
+
+def _none_marker(length):
+    return (1 << (8 * length.size)) - 1
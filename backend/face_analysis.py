@@ -0,0 +1,167 @@
+import logging
+import time
+
+import numpy as np
+import mediapipe as mp
+from deepface import DeepFace
+
+import landmark_geometry as geometry
+from emotion_batcher import EMOTION_INPUT_SIZE, face_roi_input
+from frame_decode import FRAME_HEIGHT, FRAME_WIDTH
+from quality_controller import DEFAULT_PROFILE
+from rolling_window import RollingWindow
+
+logger = logging.getLogger(__name__)
+
+mp_face_mesh = mp.solutions.face_mesh
+
+# Emotion weights for engagement score calculation
+emotion_weights = {
+    "happy": 1.0, "surprise": 0.8, "neutral": 0.5,
+    "angry": 0.2, "sad": 0.1, "fear": 0.3, "disgust": 0.2
+}
+
+def create_face_mesh():
+    return mp_face_mesh.FaceMesh(
+        min_detection_confidence=0.5,
+        min_tracking_confidence=0.5,
+        static_image_mode=False
+    )
+
+
+class FaceAnalyzer:
+    def __init__(self, emotion_batcher=None, quality=None):
+        self.face_mesh = create_face_mesh()
+        self.emotion_batcher = emotion_batcher
+        self.quality = quality
+        self.prev_face_center = None
+        self.blink_counter = 0
+        self.start_time = time.time()
+        self.engagement_history = RollingWindow(5)
+        self.last_emotion = "neutral"
+        self.last_mesh_time = None
+        self.last_emotion_time = None
+
+    def close(self):
+        if self.face_mesh is not None:
+            self.face_mesh.close()
+            self.face_mesh = None
+
+    def calculate_engagement(self, emotion, blinks_per_sec, head_movement, head_tilt_score):
+        emotion_score = emotion_weights.get(emotion, 0)
+        blink_score = min(blinks_per_sec / 5, 1.0)
+        movement_score = max(1.0 - min(head_movement / 50, 1.0), 0.1)
+        final_score = (0.5 * emotion_score) + (0.2 * blink_score) + (0.3 * movement_score) + (0.2 * head_tilt_score)
+        return max(0.0, min(final_score, 1.0))
+
+    def process_frame(self, frame):
+        """Analyse one RGB frame; returns None for frames skipped by the sampling profile"""
+        profile = self.quality.profile() if self.quality is not None else DEFAULT_PROFILE
+        now = time.monotonic()
+        if self.last_mesh_time is not None and now - self.last_mesh_time < profile.mesh_interval:
+            return None
+        self.last_mesh_time = now
+
+        try:
+            mesh_start = time.perf_counter()
+            results = self.face_mesh.process(frame)
+
+            dominant_emotion = self.last_emotion
+            head_movement = 0
+            head_tilt_score = 0
+            ear = 0.3  # Default
+            face_box = None
+
+            if results.multi_face_landmarks:
+                for face_landmarks in results.multi_face_landmarks:
+                    points = geometry.landmarks_to_array(face_landmarks, frame.shape[1], frame.shape[0])
+
+                    ear = float(geometry.eye_aspect_ratios(points).mean())
+                    if ear < 0.25:
+                        self.blink_counter += 1
+
+                    face_center = geometry.face_center(points)
+                    head_movement = geometry.head_movement(face_center, self.prev_face_center)
+                    self.prev_face_center = face_center
+                    head_tilt_score = geometry.head_tilt_score(points)
+                    face_box = geometry.face_bbox(points, frame.shape[1], frame.shape[0])
+
+            if self.quality is not None:
+                self.quality.observe_latency("mesh", time.perf_counter() - mesh_start)
+
+            elapsed_time = time.time() - self.start_time
+            blinks_per_sec = self.blink_counter / elapsed_time if elapsed_time > 0 else 0
+
+            if elapsed_time > 10:
+                self.blink_counter = 0
+                self.start_time = time.time()
+
+            if (face_box is not None and profile.emotion_interval is not None
+                    and (self.last_emotion_time is None or now - self.last_emotion_time >= profile.emotion_interval)):
+                self.last_emotion_time = now
+                self.detect_emotion(frame, face_box)
+
+            engagement_score = self.calculate_engagement(
+                self.last_emotion,
+                blinks_per_sec,
+                head_movement,
+                head_tilt_score
+            )
+
+            self.engagement_history.push(engagement_score)
+
+            return {
+                "status": "success",
+                "engagement_score": self.engagement_history.mean(),
+                "emotion": self.last_emotion,
+                "blink_rate": blinks_per_sec,
+                "head_movement": head_movement,
+                "positivity_score": self.calculate_positivity(self.last_emotion, engagement_score),
+                "analysis_mode": profile.mode
+            }
+
+        except Exception as e:
+            logger.error(f"Frame processing error: {str(e)}")
+            return {
+                "status": "error",
+                "error": str(e)
+            }
+
+    def detect_emotion(self, frame, face_box):
+        """Run emotion inference on the landmark face box rather than the whole frame"""
+        if self.emotion_batcher is not None:
+            self.emotion_batcher.submit(face_roi_input(frame, face_box), self._set_emotion, preprocessed=True)
+            return
+        try:
+            x0, y0, x1, y1 = face_box
+            face_bgr = np.ascontiguousarray(frame[y0:y1, x0:x1, ::-1])
+            result = DeepFace.analyze(face_bgr, actions=['emotion'],
+                                      detector_backend='skip', enforce_detection=False)
+            self.last_emotion = result[0]['dominant_emotion']
+        except Exception as e:
+            logger.error(f"Emotion detection error: {str(e)}")
+            self.last_emotion = "neutral"
+
+    def _set_emotion(self, emotion):
+        # None means the request missed its deadline; keep the previous emotion
+        if emotion is not None:
+            self.last_emotion = emotion
+
+    def calculate_positivity(self, emotion, engagement_score):
+        emotion_weights = {
+            "happy": 1.0, "surprise": 0.8, "neutral": 0.8,
+            "sad": 0.3, "angry": 0.1, "fear": 0.2, "disgust": -0.1
+        }
+        emotion_score = emotion_weights.get(emotion, 0.5)
+        return (0.6 * emotion_score) + (0.4 * engagement_score)
+
+
+def warm_up(emotion_batcher=None):
+    """Build the MediaPipe graph and emotion model once on blank input so the first real frame is fast"""
+    face_mesh = create_face_mesh()
+    try:
+        face_mesh.process(np.zeros((FRAME_HEIGHT, FRAME_WIDTH, 3), dtype=np.uint8))
+    finally:
+        face_mesh.close()
+    if emotion_batcher is not None:
+        emotion_batcher.model.predict([np.zeros((EMOTION_INPUT_SIZE, EMOTION_INPUT_SIZE), dtype=np.float32)])
@@ -0,0 +1,79 @@
+"""Single-pass decode of uploaded camera frames into RGB analysis buffers.
+
+JPEGs are decoded with libjpeg's DCT scaling (IMREAD_REDUCED_*) when the
+source is at least twice the working resolution, straight to RGB when the
+OpenCV build supports IMREAD_COLOR_RGB, and only resized if they are still
+larger than FRAME_WIDTH x FRAME_HEIGHT. MediaPipe gets the result as-is, so
+there is no BGR round trip.
+"""
+import os
+
+import cv2
+import numpy as np
+
+FRAME_WIDTH = int(os.getenv("FRAME_WIDTH", "640"))
+FRAME_HEIGHT = int(os.getenv("FRAME_HEIGHT", "480"))
+
+_REDUCE_FLAGS = {
+    1: 0,
+    2: cv2.IMREAD_REDUCED_GRAYSCALE_2,
+    4: cv2.IMREAD_REDUCED_GRAYSCALE_4,
+    8: cv2.IMREAD_REDUCED_GRAYSCALE_8,
+}
+_RGB_FLAG = getattr(cv2, "IMREAD_COLOR_RGB", None)  # OpenCV >= 4.10
+
+# SOF markers carry the frame size; C4 (DHT), C8 (JPG) and CC (DAC) share the range but do not
+_SOF_MARKERS = set(range(0xC0, 0xD0)) - {0xC4, 0xC8, 0xCC}
+
+
+def jpeg_size(data):
+    """(width, height) from a JPEG's SOF header without decoding it, or None"""
+    if bytes(data[:2]) != b"\xff\xd8":
+        return None
+    i, end = 2, len(data) - 9
+    while i < end:
+        if data[i] != 0xFF:
+            i += 1
+            continue
+        marker = data[i + 1]
+        if marker == 0xFF or marker == 0x01 or 0xD0 <= marker <= 0xD8:
+            i += 1 if marker == 0xFF else 2
+            continue
+        if marker in _SOF_MARKERS:
+            height = int.from_bytes(data[i + 5:i + 7], "big")
+            width = int.from_bytes(data[i + 7:i + 9], "big")
+            return width, height
+        i += 2 + int.from_bytes(data[i + 2:i + 4], "big")
+    return None
+
+
+def reduction_factor(size, width=FRAME_WIDTH, height=FRAME_HEIGHT):
+    """Largest DCT scale (1, 2, 4 or 8) that keeps the decode at least the working size"""
+    if size is None:
+        return 1
+    src_width, src_height = size
+    factor = 1
+    while factor < 8 and src_width >= width * factor * 2 and src_height >= height * factor * 2:
+        factor *= 2
+    return factor
+
+
+def decode_frame(data, width=FRAME_WIDTH, height=FRAME_HEIGHT):
+    """Decode an encoded image into an RGB uint8 array no larger than width x height"""
+    flags = _REDUCE_FLAGS[reduction_factor(jpeg_size(data), width, height)]
+    buf = np.frombuffer(data, dtype=np.uint8)
+    if _RGB_FLAG is not None:
+        frame = cv2.imdecode(buf, flags | _RGB_FLAG)
+    else:
+        frame = cv2.imdecode(buf, flags | cv2.IMREAD_COLOR)
+        if frame is not None:
+            cv2.cvtColor(frame, cv2.COLOR_BGR2RGB, dst=frame)
+    if frame is None:
+        raise ValueError("Could not decode frame")
+
+    frame_height, frame_width = frame.shape[:2]
+    if frame_width > width or frame_height > height:
+        scale = min(width / frame_width, height / frame_height)
+        frame = cv2.resize(frame, (int(frame_width * scale), int(frame_height * scale)),
+                           interpolation=cv2.INTER_AREA)
+    return frame
@@ -0,0 +1,248 @@
+"""Frame analysis worker processes fed through shared-memory frame rings.
+
+Each worker process owns a ring of fixed-size frame slots in one
+``multiprocessing.shared_memory`` block. The request thread copies the
+uploaded, still-compressed frame into a free slot and only sends
+``(session_id, seq, credit, slot, nbytes)`` over the task queue, so frames are never
+pickled and queued frames cost their JPEG size rather than a decoded array.
+The worker decodes each frame once, straight into its RGB analysis buffer. Sessions are pinned to one worker by
+a stable hash of their ID, which keeps each session's FaceAnalyzer (and its
+MediaPipe graph) local to a single process.
+"""
+import functools
+import logging
+import multiprocessing
+import os
+import queue
+import threading
+import time
+import zlib
+from multiprocessing import shared_memory
+
+from quality_controller import QualityController
+from session_registry import SessionRegistry
+
+logger = logging.getLogger(__name__)
+
+# Each worker loads its own TensorFlow/DeepFace and MediaPipe models, so workers cost memory and warm-up time
+FRAME_WORKERS = int(os.getenv("FRAME_WORKERS", str(min(4, os.cpu_count() or 1))))
+FRAME_RING_SLOTS = int(os.getenv("FRAME_RING_SLOTS", "8"))
+FRAME_SLOT_BYTES = int(os.getenv("FRAME_SLOT_BYTES", str(512 * 1024)))
+
+# Per-worker analyzer limits
+MAX_ANALYZER_SESSIONS = int(os.getenv("MAX_ANALYZER_SESSIONS", "32"))
+ANALYZER_IDLE_TIMEOUT = float(os.getenv("ANALYZER_IDLE_TIMEOUT", "300"))
+
+
+class FrameRing:
+    """Fixed-size byte slots for encoded frames in a single shared-memory block"""
+
+    def __init__(self, slots, slot_bytes, name=None):
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        if name is None:
+            self.shm = shared_memory.SharedMemory(create=True, size=slots * slot_bytes)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def read(self, slot, nbytes):
+        offset = slot * self.slot_bytes
+        return self.shm.buf[offset:offset + nbytes]
+
+    def write(self, slot, data):
+        offset = slot * self.slot_bytes
+        self.shm.buf[offset:offset + len(data)] = data
+        return len(data)
+
+    def close(self):
+        self.shm.close()
+
+    def unlink(self):
+        self.shm.unlink()
+
+
+def _worker_main(ring_name, slots, slot_bytes, tasks, free_slots, results, analyzer_factory, ready):
+    # Imported here so the API process never loads OpenCV
+    from frame_decode import decode_frame
+
+    emotion_batcher = None
+    quality = QualityController()
+    if analyzer_factory is None:
+        # Imported here so only the worker processes load MediaPipe and DeepFace
+        from emotion_batcher import EmotionBatcher
+        from face_analysis import FaceAnalyzer, warm_up
+        emotion_batcher = EmotionBatcher()
+        analyzer_factory = functools.partial(FaceAnalyzer, emotion_batcher=emotion_batcher, quality=quality)
+        try:
+            warm_up(emotion_batcher)
+        except Exception as e:
+            logger.error(f"Frame worker warm-up failed: {str(e)}")
+    ready.set()
+
+    ring = FrameRing(slots, slot_bytes, name=ring_name)
+    analyzers = SessionRegistry(analyzer_factory, MAX_ANALYZER_SESSIONS, ANALYZER_IDLE_TIMEOUT, label="analyzer")
+    try:
+        while True:
+            try:
+                task = tasks.get(timeout=1)
+            except queue.Empty:
+                analyzers.sweep()
+                continue
+            if task is None:
+                break
+
+            session_id, seq, credit, slot, nbytes = task
+            quality.observe_queue(_queue_depth(tasks), slots)
+            if emotion_batcher is not None and emotion_batcher.batches:
+                quality.observe_latency("emotion", emotion_batcher.batch_latency)
+            result = None
+            try:
+                try:
+                    frame = decode_frame(ring.read(slot, nbytes))
+                finally:
+                    free_slots.put(slot)
+                result = analyzers.get(session_id).process_frame(frame)
+            except Exception as e:
+                logger.error(f"Frame worker error: {str(e)}")
+                result = {"status": "error", "error": str(e)}
+            if result is None:
+                # Sampled out by the quality profile; still reported so the frame's credit comes back
+                result = {"status": "skipped"}
+            result["seq"] = seq
+            result["credit"] = credit
+            results.put((session_id, result))
+    finally:
+        analyzers.close_all()
+        if emotion_batcher is not None:
+            emotion_batcher.close()
+        ring.close()
+
+
+def _queue_depth(tasks):
+    try:
+        return tasks.qsize()
+    except NotImplementedError:  # macOS has no sem_getvalue
+        return 0
+
+
+class _Worker:
+    def __init__(self, ctx, index, slots, slot_bytes, results, analyzer_factory):
+        self.ring = FrameRing(slots, slot_bytes)
+        self.tasks = ctx.Queue()
+        self.free_slots = ctx.Queue()
+        for slot in range(slots):
+            self.free_slots.put(slot)
+        self.ready = ctx.Event()
+        self.process = ctx.Process(
+            target=_worker_main,
+            args=(self.ring.name, slots, slot_bytes, self.tasks, self.free_slots, results, analyzer_factory,
+                  self.ready),
+            name=f"frame-worker-{index}",
+            daemon=True
+        )
+
+
+class FrameWorkerPool:
+    """Sticky pool of frame analysis processes.
+
+    ``on_result(session_id, result)`` is called from a collector thread in the
+    parent for every submitted frame, with status "skipped" for frames the
+    quality profile sampled out; ``result["seq"]`` and ``result["credit"]``
+    are what the frame was submitted with. Processes are started on first use.
+    """
+
+    def __init__(self, num_workers=FRAME_WORKERS, slots=FRAME_RING_SLOTS,
+                 slot_bytes=FRAME_SLOT_BYTES, on_result=None, analyzer_factory=None):
+        self.num_workers = max(1, num_workers)
+        self.slots = slots
+        self.slot_bytes = slot_bytes
+        self.on_result = on_result
+        self.analyzer_factory = analyzer_factory
+        self._workers = []
+        self._results = None
+        self._collector = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        with self._lock:
+            if self._workers:
+                return
+            ctx = multiprocessing.get_context("spawn")
+            self._results = ctx.Queue()
+            workers = [
+                _Worker(ctx, i, self.slots, self.slot_bytes, self._results, self.analyzer_factory)
+                for i in range(self.num_workers)
+            ]
+            for worker in workers:
+                worker.process.start()
+            self._collector = threading.Thread(target=self._collect, name="frame-results", daemon=True)
+            self._collector.start()
+            self._workers = workers
+            logger.info(f"Started {self.num_workers} frame analysis workers")
+
+    def wait_ready(self, timeout=None):
+        """Start the workers if needed and block until each has loaded and warmed its models.
+
+        Returns False on timeout and raises RuntimeError if a worker died while loading.
+        """
+        self.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for worker in self._workers:
+            while not worker.ready.wait(0.5):
+                if not worker.process.is_alive():
+                    raise RuntimeError(f"{worker.process.name} exited with code {worker.process.exitcode}")
+                if deadline is not None and time.monotonic() >= deadline:
+                    return False
+        return True
+
+    def worker_for(self, session_id):
+        return zlib.crc32(session_id.encode("utf-8")) % self.num_workers
+
+    def submit(self, session_id, data, seq=None, credit=False):
+        """Queue an encoded frame for its session's worker; False if that worker's ring is full.
+
+        ``credit`` marks a frame that holds a flow-control credit to hand back once it is processed.
+        """
+        if len(data) > self.slot_bytes:
+            raise ValueError(f"Frame of {len(data)} bytes exceeds the {self.slot_bytes} byte slot size")
+        if not self._workers:
+            self.start()
+        worker = self._workers[self.worker_for(session_id)]
+        try:
+            slot = worker.free_slots.get_nowait()
+        except queue.Empty:
+            return False
+        nbytes = worker.ring.write(slot, data)
+        worker.tasks.put((session_id, seq, credit, slot, nbytes))
+        return True
+
+    def shutdown(self, timeout=5):
+        with self._lock:
+            workers, self._workers = self._workers, []
+        for worker in workers:
+            worker.tasks.put(None)
+        for worker in workers:
+            worker.process.join(timeout)
+            if worker.process.is_alive():
+                worker.process.terminate()
+            worker.ring.close()
+            worker.ring.unlink()
+        if self._results is not None:
+            self._results.put(None)
+
+    def _collect(self):
+        while True:
+            item = self._results.get()
+            if item is None:
+                break
+            session_id, result = item
+            if self.on_result is None:
+                continue
+            try:
+                self.on_result(session_id, result)
+            except Exception as e:
+                logger.error(f"Frame result handler error: {str(e)}")
@@ -0,0 +1,147 @@
+"""Process-wide Google Cloud API clients.
+
+Building a SpeechClient or ImageAnnotatorClient loads credentials and opens a
+gRPC channel with its own TLS handshake. GoogleClients builds each client once
+per process on a channel with keepalive pings and shares it across threads
+(gRPC channels are thread-safe). Clients are rebuilt after a fork. ``call()``
+and ``timed()`` apply per-call deadlines and record call counts, errors and
+latency; ``stats()`` reports them together with how often clients were reused.
+"""
+import importlib
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from rolling_window import RollingWindow
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_KEEPALIVE_MS = int(os.getenv("GOOGLE_KEEPALIVE_MS", "120000"))
+GOOGLE_KEEPALIVE_TIMEOUT_MS = int(os.getenv("GOOGLE_KEEPALIVE_TIMEOUT_MS", "20000"))
+GOOGLE_CALL_TIMEOUT = float(os.getenv("GOOGLE_CALL_TIMEOUT", "10"))
+LATENCY_WINDOW = 256
+
+# name -> (module, client class)
+CLIENT_TYPES = {
+    "speech": ("google.cloud.speech", "SpeechClient"),
+    "vision": ("google.cloud.vision", "ImageAnnotatorClient"),
+}
+
+
+def keepalive_options(keepalive_ms=GOOGLE_KEEPALIVE_MS, timeout_ms=GOOGLE_KEEPALIVE_TIMEOUT_MS):
+    return [
+        ("grpc.keepalive_time_ms", keepalive_ms),
+        ("grpc.keepalive_timeout_ms", timeout_ms),
+        ("grpc.keepalive_permit_without_calls", 1),
+        ("grpc.http2.max_pings_without_data", 0),
+    ]
+
+
+class CallStats:
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.latency = RollingWindow(LATENCY_WINDOW)
+
+    def record(self, seconds, failed):
+        self.calls += 1
+        self.errors += failed
+        self.latency.push(seconds * 1000.0)
+
+    def summary(self):
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "latency_ms": {
+                "mean": self.latency.mean(),
+                "p50": self.latency.percentile(50),
+                "p95": self.latency.percentile(95)
+            }
+        }
+
+
+class GoogleClients:
+    """Lazily built, shared Google API clients with call deadlines and metrics"""
+
+    def __init__(self, timeout=GOOGLE_CALL_TIMEOUT, channel_options=None, credentials=None):
+        self.timeout = timeout
+        self.channel_options = channel_options if channel_options is not None else keepalive_options()
+        self.credentials = credentials
+        self._clients = {}
+        self._created = {}
+        self._reused = {}
+        self._calls = {}
+        self._pid = os.getpid()
+        self._lock = threading.Lock()
+
+    def client(self, name):
+        """The process's client for ``name`` (a CLIENT_TYPES key), built on first use"""
+        with self._lock:
+            if self._pid != os.getpid():
+                # gRPC channels do not survive a fork; the child builds its own
+                self._clients.clear()
+                self._pid = os.getpid()
+            client = self._clients.get(name)
+            if client is not None:
+                self._reused[name] = self._reused.get(name, 0) + 1
+                return client
+            client = self._clients[name] = self._build(name)
+            self._created[name] = self._created.get(name, 0) + 1
+            return client
+
+    def call(self, name, method, *args, timeout=None, **kwargs):
+        """Call ``method`` on the shared client with a deadline, recording its latency"""
+        client = self.client(name)
+        with self.timed(name, method):
+            return getattr(client, method)(*args, timeout=timeout or self.timeout, **kwargs)
+
+    @contextmanager
+    def timed(self, name, method):
+        start = time.perf_counter()
+        failed = False
+        try:
+            yield
+        except Exception:
+            failed = True
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            key = f"{name}.{method}"
+            with self._lock:
+                stats = self._calls.get(key)
+                if stats is None:
+                    stats = self._calls[key] = CallStats()
+                stats.record(elapsed, failed)
+
+    def stats(self):
+        with self._lock:
+            return {
+                "clients": {
+                    name: {
+                        "created": self._created.get(name, 0),
+                        "reused": self._reused.get(name, 0)
+                    }
+                    for name in self._created
+                },
+                "calls": {key: stats.summary() for key, stats in self._calls.items()}
+            }
+
+    def close(self):
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            try:
+                client.transport.close()
+            except Exception as e:
+                logger.error(f"Error closing Google client: {str(e)}")
+
+    def _build(self, name):
+        module_name, class_name = CLIENT_TYPES[name]
+        client_cls = getattr(importlib.import_module(module_name), class_name)
+        transport_cls = client_cls.get_transport_class("grpc")
+        channel = transport_cls.create_channel(credentials=self.credentials, options=self.channel_options)
+        logger.info(f"Created shared Google {name} client")
+        return client_cls(transport=transport_cls(channel=channel))
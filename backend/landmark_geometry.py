@@ -0,0 +1,73 @@
+"""Vectorized face-mesh geometry on (468, 2) landmark arrays"""
+from itertools import chain
+from operator import attrgetter
+
+import numpy as np
+
+NUM_LANDMARKS = 468
+
+# Landmark indices
+LEFT_EYE = [33, 160, 158, 133, 153, 144]
+RIGHT_EYE = [362, 385, 387, 263, 373, 380]
+NOSE_TIP = 1
+CHIN = 199
+LEFT_EAR = 234
+RIGHT_EAR = 454
+
+# EAR = (|p1-p5| + |p2-p4|) / (2 |p0-p3|); both eyes are gathered in one (2, 3) lookup
+_EAR_FROM = np.array([[eye[1], eye[2], eye[0]] for eye in (LEFT_EYE, RIGHT_EYE)], dtype=np.intp)
+_EAR_TO = np.array([[eye[5], eye[4], eye[3]] for eye in (LEFT_EYE, RIGHT_EYE)], dtype=np.intp)
+
+_xy = attrgetter("x", "y")
+
+
+def landmarks_to_array(face_landmarks, width, height):
+    """Copy MediaPipe landmarks into a contiguous (468, 2) float32 array in pixels"""
+    points = np.fromiter(
+        chain.from_iterable(map(_xy, face_landmarks.landmark)),
+        dtype=np.float32,
+        count=2 * NUM_LANDMARKS
+    ).reshape(NUM_LANDMARKS, 2)
+    points *= np.array([width, height], dtype=np.float32)
+    return points
+
+
+def eye_aspect_ratios(points):
+    """EAR for the left and right eye as a length-2 array"""
+    diff = points[_EAR_FROM] - points[_EAR_TO]
+    dist = np.sqrt(np.einsum("ijk,ijk->ij", diff, diff))
+    return (dist[:, 0] + dist[:, 1]) / (2.0 * dist[:, 2])
+
+
+def face_center(points):
+    return points[:NUM_LANDMARKS].mean(axis=0)
+
+
+def head_movement(center, prev_center):
+    if prev_center is None:
+        return 0.0
+    dx, dy = (center - prev_center).tolist()
+    return (dx * dx + dy * dy) ** 0.5
+
+
+def head_tilt_score(points):
+    nose_y, chin_y = points[[NOSE_TIP, CHIN], 1].tolist()
+    left_x, right_x = points[[LEFT_EAR, RIGHT_EAR], 0].tolist()
+    vertical_angle = abs(nose_y - chin_y) / abs(left_x - right_x + 1e-6)
+    return -0.5 if vertical_angle < 0.8 else 0.0
+
+
+def face_bbox(points, width, height, margin=0.1):
+    """Square pixel box (x0, y0, x1, y1) around the face, padded by ``margin`` and clipped to the frame.
+
+    Returns None when too little of the box is inside the frame.
+    """
+    face = points[:NUM_LANDMARKS]
+    (x0, y0), (x1, y1) = face.min(axis=0).tolist(), face.max(axis=0).tolist()
+    half = max(x1 - x0, y1 - y0) * (1.0 + margin) / 2.0
+    cx, cy = (x0 + x1) / 2.0, (y0 + y1) / 2.0
+    box = (max(int(cx - half), 0), max(int(cy - half), 0),
+           min(int(cx + half), width), min(int(cy + half), height))
+    if box[2] - box[0] < 2 or box[3] - box[1] < 2:
+        return None  # Face is (almost) entirely outside the frame
+    return box
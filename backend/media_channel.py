@@ -0,0 +1,167 @@
+"""Socket.IO namespace for streaming camera frames and audio chunks.
+
+Clients connect to MEDIA_NAMESPACE with ``?session_id=`` and emit binary
+``frame`` and ``audio`` events shaped ``{"seq": int, "data": bytes}`` over the
+already-open connection instead of POSTing one multipart upload per frame.
+Every event is acknowledged with its seq and a status.
+
+Frames are flow-controlled with credits: a session starts with
+MEDIA_FRAME_CREDITS, each queued frame spends one, and each frame hands one
+back once its worker is done with it, analysed or sampled out. The
+session's credit count rides on every result sent over the same connection;
+results may be coalesced (update_coalescer.py), so it is an absolute count,
+not one per result. A client that only sends while it
+holds credits never has more frames in flight than the workers can absorb.
+Frames older than the newest one seen for the session are acknowledged as
+``stale`` and skipped.
+"""
+import logging
+import os
+import threading
+
+from flask import request
+from flask_socketio import Namespace, join_room
+
+from session_registry import SessionRegistry
+
+logger = logging.getLogger(__name__)
+
+MEDIA_NAMESPACE = os.getenv("MEDIA_NAMESPACE", "/media")
+MEDIA_FRAME_CREDITS = int(os.getenv("MEDIA_FRAME_CREDITS", "4"))
+MAX_MEDIA_SESSIONS = int(os.getenv("MAX_MEDIA_SESSIONS", "1024"))
+MEDIA_IDLE_TIMEOUT = float(os.getenv("MEDIA_IDLE_TIMEOUT", "600"))
+MEDIA_MAX_AUDIO_BYTES = int(os.getenv("MEDIA_MAX_AUDIO_BYTES", str(4 * 1024 * 1024)))
+
+
+class MediaSession:
+    """Credit window and last accepted sequence numbers for one interview session"""
+
+    def __init__(self, credits=MEDIA_FRAME_CREDITS):
+        self.max_credits = credits
+        self.credits = credits
+        self.last_seq = {"frame": 0, "audio": 0}
+        self._lock = threading.Lock()
+
+    def accept(self, kind, seq):
+        """Record seq as the newest of its kind; False if it is not newer than the last one"""
+        with self._lock:
+            if seq <= self.last_seq[kind]:
+                return False
+            self.last_seq[kind] = seq
+            return True
+
+    def take_credit(self):
+        with self._lock:
+            if self.credits <= 0:
+                return False
+            self.credits -= 1
+            return True
+
+    def return_credit(self):
+        with self._lock:
+            self.credits = min(self.credits + 1, self.max_credits)
+            return self.credits
+
+
+class MediaChannel(Namespace):
+    """Binary frame/audio ingest with per-message acks and frame credits.
+
+    ``submit_frame(session_id, data, seq, credit=True)`` queues a frame that
+    holds one of the session's credits and returns False when it had to be dropped; ``submit_audio(session_id, data)`` queues
+    an audio chunk and returns False when the session's audio backlog is full.
+    Results come back through ``send()``, credits through ``return_credit()``.
+    """
+
+    def __init__(self, submit_frame, submit_audio, namespace=MEDIA_NAMESPACE,
+                 credits=MEDIA_FRAME_CREDITS, max_frame_bytes=None, max_audio_bytes=MEDIA_MAX_AUDIO_BYTES):
+        super().__init__(namespace)
+        self.submit_frame = submit_frame
+        self.submit_audio = submit_audio
+        self.max_bytes = {"frame": max_frame_bytes, "audio": max_audio_bytes}
+        self.sessions = SessionRegistry(lambda: MediaSession(credits), MAX_MEDIA_SESSIONS,
+                                        MEDIA_IDLE_TIMEOUT, label="media session")
+        self._socket_sessions = {}  # Socket.IO sid -> session_id
+
+    def on_connect(self, auth=None):
+        session_id = (auth or {}).get("session_id") or request.args.get("session_id")
+        if not session_id:
+            return False
+        join_room(session_id)
+        self._socket_sessions[request.sid] = session_id
+        session = self.sessions.get(session_id)
+        self.socketio.emit("credits", {"credits": session.credits}, to=request.sid, namespace=self.namespace)
+
+    def on_disconnect(self, reason=None):
+        self._socket_sessions.pop(request.sid, None)
+
+    def on_frame(self, message):
+        return self._receive("frame", message, self._queue_frame)
+
+    def on_audio(self, message):
+        return self._receive("audio", message, self._queue_audio)
+
+    def return_credit(self, session_id):
+        """Hand back the credit of a processed frame; False when the session is not streaming here.
+
+        Credits normally travel with the next update sent to the session, but
+        a client that ran out is told straight away so it can resume.
+        """
+        session = self.sessions.peek(session_id)
+        if session is None:
+            return False
+        if session.return_credit() == 1:
+            self.socketio.emit("credits", {"credits": 1}, to=session_id, namespace=self.namespace)
+        return True
+
+    def send(self, session_id, event, payload):
+        """Send a result over the media channel with the session's current credits.
+
+        Returns False when the session is not streaming over this namespace,
+        so the caller can fall back to the default one.
+        """
+        session = self.sessions.peek(session_id)
+        if session is None:
+            return False
+        payload["credits"] = session.credits
+        self.socketio.emit(event, payload, to=session_id, namespace=self.namespace)
+        return True
+
+    def _receive(self, kind, message, queue):
+        seq = message.get("seq") if isinstance(message, dict) else None
+        data = message.get("data") if isinstance(message, dict) else None
+        if not isinstance(seq, int) or not isinstance(data, (bytes, bytearray)) or not data:
+            return {"status": "error", "seq": seq, "error": "Expected {seq: int, data: binary}"}
+        if self.max_bytes[kind] is not None and len(data) > self.max_bytes[kind]:
+            return {"status": "error", "seq": seq, "error": "Payload too large"}
+
+        session_id = self._socket_sessions.get(request.sid)
+        if session_id is None:
+            return {"status": "error", "seq": seq, "error": "Unknown session"}
+        session = self.sessions.get(session_id)
+        if not session.accept(kind, seq):
+            return {"status": "stale", "seq": seq}
+
+        try:
+            ack = queue(session_id, session, bytes(data), seq)
+        except Exception as e:
+            logger.error(f"Media {kind} error: {str(e)}")
+            return {"status": "error", "seq": seq, "error": str(e)}
+        ack["seq"] = seq
+        return ack
+
+    def _queue_frame(self, session_id, session, data, seq):
+        if not session.take_credit():
+            return {"status": "throttled", "credits": 0}
+        try:
+            queued = self.submit_frame(session_id, data, seq, credit=True)
+        except Exception:
+            session.return_credit()
+            raise
+        if not queued:
+            return {"status": "dropped", "credits": session.return_credit()}
+        return {"status": "queued", "credits": session.credits}
+
+    def _queue_audio(self, session_id, session, data, seq):
+        if not self.submit_audio(session_id, data):
+            return {"status": "throttled"}
+        return {"status": "processing"}
@@ -0,0 +1,167 @@
+"""Prosody features of speech chunks, computed as whole-chunk array operations.
+
+A chunk is cut into the same frames vad.py uses, and every frame is analysed
+at once as rows of one matrix:
+
+- RMS energy in dBFS over the speech frames
+- the share of frames that are speech (speaking-energy ratio)
+- per-frame pitch from the FFT autocorrelation of the speech frames, searched
+  between PROSODY_MIN_PITCH_HZ and PROSODY_MAX_PITCH_HZ and refined by
+  parabolic interpolation; frames whose normalised peak is below
+  PROSODY_VOICING are unvoiced
+- median pitch, and pitch spread in semitones so it compares across voices
+
+A ProsodyTracker smooths the per-chunk features for one session and turns
+them into a 0-1 vocal engagement score that is fused with the face score.
+"""
+import os
+import threading
+import time
+from collections import namedtuple
+
+import numpy as np
+from scipy import fft
+
+from timeline import RunningStats
+from vad import VoiceActivityDetector
+
+PROSODY_MIN_PITCH_HZ = float(os.getenv("PROSODY_MIN_PITCH_HZ", "70"))
+PROSODY_MAX_PITCH_HZ = float(os.getenv("PROSODY_MAX_PITCH_HZ", "400"))
+PROSODY_VOICING = float(os.getenv("PROSODY_VOICING", "0.5"))
+# The shortest lag whose peak comes this close to the best one is the period, not a multiple of it
+PROSODY_PEAK_RATIO = 0.9
+PROSODY_EMA_ALPHA = float(os.getenv("PROSODY_EMA_ALPHA", "0.3"))
+PROSODY_STALE_SECONDS = float(os.getenv("PROSODY_STALE_SECONDS", "5"))
+PROSODY_ENGAGEMENT_WEIGHT = float(os.getenv("PROSODY_ENGAGEMENT_WEIGHT", "0.3"))
+
+# Ranges mapped onto 0-1 for the vocal engagement score
+EXPRESSIVE_PITCH_STD_ST = 4.0  # Monotone speech sits around 1-2 semitones
+ENERGY_RANGE_DB = (-40.0, -15.0)
+
+Prosody = namedtuple("Prosody", ["rms_db", "pitch_hz", "pitch_std_st", "speaking_ratio", "voiced_ratio"])
+PITCH_FIELDS = ("pitch_hz", "pitch_std_st")
+
+# Frame sizes and speech thresholds shared with the VAD; speech_frames() keeps no state
+_speech_detector = VoiceActivityDetector()
+
+
+def _pitch(frames, rate):
+    """Per-frame pitch in Hz (0 where unvoiced) for a (frames, samples) matrix"""
+    size = frames.shape[1]
+    low = max(1, int(rate / PROSODY_MAX_PITCH_HZ))
+    high = min(int(rate / PROSODY_MIN_PITCH_HZ), size - 2)
+    if not len(frames) or high <= low:
+        return np.zeros(len(frames), dtype=np.float32)
+
+    frames = frames - frames.mean(axis=1, keepdims=True)
+    # Zero padding only as far as the longest lag searched, not the full 2 * size
+    n_fft = fft.next_fast_len(size + high + 2, real=True)
+    spectrum = fft.rfft(frames, n=n_fft, axis=1)
+    ac = fft.irfft(spectrum.real ** 2 + spectrum.imag ** 2, n=n_fft, axis=1)[:, :high + 2]
+    # Unbiased estimate, so longer lags are not penalised for overlapping less
+    ac /= (size - np.arange(high + 2)) / size
+    energy = ac[:, 0].copy()
+    energy[energy <= 0] = np.inf
+    ac /= energy[:, np.newaxis]
+
+    rows = np.arange(len(frames))
+    search = ac[:, low - 1:high + 2]
+    centre = search[:, 1:-1]
+    is_peak = (centre > search[:, :-2]) & (centre >= search[:, 2:])
+    candidates = is_peak & (centre >= PROSODY_PEAK_RATIO * centre.max(axis=1, keepdims=True))
+    lag = low + np.where(candidates.any(axis=1), np.argmax(candidates, axis=1), np.argmax(centre, axis=1))
+    peak = ac[rows, lag]
+    # Parabolic interpolation around the peak for sub-sample lag
+    before, after = ac[rows, lag - 1], ac[rows, lag + 1]
+    curvature = before - 2 * peak + after
+    shift = np.where(curvature < 0, 0.5 * (before - after) / np.where(curvature < 0, curvature, -1), 0.0)
+    pitch = rate / (lag + np.clip(shift, -0.5, 0.5))
+    return np.where(peak >= PROSODY_VOICING, pitch, 0.0).astype(np.float32)
+
+
+def extract_prosody(mono, rate):
+    """Prosody of one float32 mono chunk, or None when it is too short for a frame"""
+    mask, size = _speech_detector.speech_frames(mono, rate)
+    if not len(mask):
+        return None
+    frames = mono[:len(mask) * size].reshape(len(mask), size)
+    speech = frames[mask]
+    if not len(speech):
+        return Prosody(-100.0, 0.0, 0.0, 0.0, 0.0)
+
+    rms_db = 10 * np.log10(np.mean(np.square(speech)) + 1e-10)
+    pitch = _pitch(speech, rate)
+    voiced = pitch[pitch > 0]
+    if len(voiced):
+        semitones = 12 * np.log2(voiced / np.median(voiced))
+        pitch_hz, pitch_std = float(np.median(voiced)), float(np.std(semitones))
+    else:
+        pitch_hz, pitch_std = 0.0, 0.0
+    return Prosody(float(rms_db), pitch_hz, pitch_std, float(np.mean(mask)), len(voiced) / len(mask))
+
+
+def vocal_engagement(prosody):
+    """0-1 score: varied pitch, steady talking and a confident level read as engaged"""
+    variability = min(prosody.pitch_std_st / EXPRESSIVE_PITCH_STD_ST, 1.0)
+    low, high = ENERGY_RANGE_DB
+    energy = min(max((prosody.rms_db - low) / (high - low), 0.0), 1.0)
+    return 0.5 * variability + 0.3 * min(prosody.speaking_ratio, 1.0) + 0.2 * energy
+
+
+class ProsodyTracker:
+    """Smoothed prosody for one session and its vocal engagement score"""
+
+    def __init__(self, alpha=PROSODY_EMA_ALPHA, stale_seconds=PROSODY_STALE_SECONDS):
+        self.alpha = alpha
+        self.stale_seconds = stale_seconds
+        self.smoothed = None
+        self.updated_at = None
+        self.stats = {name: RunningStats() for name in Prosody._fields + ("vocal_engagement",)}
+        self._lock = threading.Lock()
+
+    def push(self, prosody, timestamp=None):
+        """Fold one chunk's features in; returns the smoothed features and score"""
+        with self._lock:
+            if self.smoothed is None:
+                self.smoothed = prosody
+            else:
+                values = self.smoothed._asdict()
+                for name, value in prosody._asdict().items():
+                    if name in PITCH_FIELDS and not prosody.voiced_ratio:
+                        continue  # Pitch only moves on chunks with voiced frames
+                    previous = values[name]
+                    values[name] = value if name == "pitch_hz" and not previous \
+                        else self.alpha * value + (1 - self.alpha) * previous
+                self.smoothed = Prosody(**values)
+            self.updated_at = time.time() if timestamp is None else timestamp
+            score = vocal_engagement(self.smoothed)
+            for name, value in prosody._asdict().items():
+                if prosody.voiced_ratio or name not in PITCH_FIELDS:
+                    self.stats[name].push(value)
+            self.stats["vocal_engagement"].push(score)
+            return self._report(self.smoothed, score)
+
+    def current(self, now=None):
+        """The smoothed features and score, or None if no speech arrived recently"""
+        with self._lock:
+            now = time.time() if now is None else now
+            if self.smoothed is None or now - self.updated_at > self.stale_seconds:
+                return None
+            return self._report(self.smoothed, vocal_engagement(self.smoothed))
+
+    def summary(self):
+        with self._lock:
+            return {name: stats.summary() for name, stats in self.stats.items()}
+
+    @staticmethod
+    def _report(prosody, score):
+        report = {name: round(value, 3) for name, value in prosody._asdict().items()}
+        report["vocal_engagement"] = round(score, 3)
+        return report
+
+
+def fuse_engagement(face_score, vocal, weight=PROSODY_ENGAGEMENT_WEIGHT):
+    """Face engagement blended with a current ProsodyTracker report; the face score alone without one"""
+    if vocal is None:
+        return face_score
+    return (1 - weight) * face_score + weight * vocal["vocal_engagement"]
@@ -0,0 +1,108 @@
+"""Adaptive analysis quality for a frame worker process.
+
+The controller turns queue depth, per-stage latency and CPU usage into a
+single pressure value and picks one of QUALITY_LEVELS from it. CPU usage
+only counts while frames are waiting or a stage runs over its budget: a
+worker that keeps up is busy by design, and is no reason to lower quality. The level is
+per worker process, as the load it answers to is; each session's FaceAnalyzer
+asks for the current profile on every frame and applies its intervals to
+that session alone, so mesh sampling and the emotion interval follow the
+load without a restart. Under saturation it drops to ``mesh_only``, where
+emotion inference is skipped entirely.
+"""
+import os
+import time
+from collections import namedtuple
+
+QualityProfile = namedtuple("QualityProfile", ["mode", "mesh_interval", "emotion_interval"])
+
+# Ordered from best quality to cheapest. Intervals are the least seconds between two analyses of
+# one session, so sampling does not depend on how fast the client sends; None disables the stage.
+QUALITY_LEVELS = [
+    QualityProfile("full", 0.0, 0.33),
+    QualityProfile("balanced", 0.2, 1.0),
+    QualityProfile("reduced", 0.33, 2.0),
+    QualityProfile("mesh_only", 0.5, None),
+]
+DEFAULT_PROFILE = QUALITY_LEVELS[1]
+
+QUALITY_HIGH_WATER = float(os.getenv("QUALITY_HIGH_WATER", "0.85"))
+QUALITY_LOW_WATER = float(os.getenv("QUALITY_LOW_WATER", "0.5"))
+MESH_LATENCY_BUDGET_MS = float(os.getenv("MESH_LATENCY_BUDGET_MS", "40"))
+EMOTION_LATENCY_BUDGET_MS = float(os.getenv("EMOTION_LATENCY_BUDGET_MS", "250"))
+
+
+class QualityController:
+    """Picks a QualityProfile from load, with hysteresis between levels"""
+
+    def __init__(self, start_level=1, high_water=QUALITY_HIGH_WATER, low_water=QUALITY_LOW_WATER,
+                 mesh_budget_ms=MESH_LATENCY_BUDGET_MS, emotion_budget_ms=EMOTION_LATENCY_BUDGET_MS,
+                 interval=1.0, recover_after=3, clock=time.monotonic, cpu_clock=time.process_time):
+        self.level = start_level
+        self.high_water = high_water
+        self.low_water = low_water
+        self.budgets = {"mesh": mesh_budget_ms / 1000.0, "emotion": emotion_budget_ms / 1000.0}
+        self.interval = interval
+        self.recover_after = recover_after
+        self._clock = clock
+        self._cpu_clock = cpu_clock
+        self._latency = {}
+        self._queue_fill = 0.0
+        self._cpu_usage = 0.0
+        self._calm_checks = 0
+        self._last_check = clock()
+        self._last_cpu = cpu_clock()
+        self.pressure = 0.0
+
+    def observe_latency(self, stage, seconds):
+        previous = self._latency.get(stage)
+        self._latency[stage] = seconds if previous is None else 0.8 * previous + 0.2 * seconds
+
+    def observe_queue(self, depth, capacity):
+        self._queue_fill = min(depth / capacity, 1.0) if capacity else 0.0
+
+    def profile(self):
+        now = self._clock()
+        if now - self._last_check >= self.interval:
+            self._update(now)
+        return QUALITY_LEVELS[self.level]
+
+    def stats(self):
+        return {
+            "mode": QUALITY_LEVELS[self.level].mode,
+            "pressure": self.pressure,
+            "queue_fill": self._queue_fill,
+            "cpu_usage": self._cpu_usage,
+            "latency_ms": {stage: value * 1000.0 for stage, value in self._latency.items()}
+        }
+
+    def _update(self, now):
+        cpu = self._cpu_clock()
+        self._cpu_usage = min((cpu - self._last_cpu) / (now - self._last_check), 1.0)
+        self._last_check, self._last_cpu = now, cpu
+
+        signals = [self._queue_fill]
+        for stage, budget in self.budgets.items():
+            if stage in self._latency:
+                signals.append(self._latency[stage] / budget)
+        if self._queue_fill > 0 or max(signals) > 1.0:
+            # Falling behind: how busy the CPU is tells how close to saturation that is
+            signals += [self._cpu_usage, _system_load()]
+        self.pressure = max(signals)
+
+        if self.pressure >= self.high_water:
+            self.level = min(self.level + 1, len(QUALITY_LEVELS) - 1)
+            self._calm_checks = 0
+        elif self.pressure <= self.low_water:
+            self._calm_checks += 1
+            if self._calm_checks >= self.recover_after:
+                self.level = max(self.level - 1, 0)
+                self._calm_checks = 0
+        else:
+            self._calm_checks = 0
+
+
+def _system_load():
+    if not hasattr(os, "getloadavg"):
+        return 0.0
+    return os.getloadavg()[0] / (os.cpu_count() or 1)
@@ -0,0 +1,55 @@
+"""Background warm-up of slow subsystems and the state behind /readyz"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Readiness:
+    """Tracks warm-up steps; the app is ready once every required step has succeeded"""
+
+    def __init__(self):
+        self._steps = {}  # name -> {"status", "required", "seconds", "error"}
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def add(self, name, fn, required=True):
+        with self._lock:
+            self._steps[name] = {"status": "pending", "required": required, "fn": fn}
+
+    def start(self):
+        """Run the registered steps in order on a background thread"""
+        self._thread = threading.Thread(target=self._run, name="warmup", daemon=True)
+        self._thread.start()
+
+    def is_ready(self):
+        with self._lock:
+            return all(step["status"] == "ready" for step in self._steps.values() if step["required"])
+
+    def report(self):
+        with self._lock:
+            return {
+                name: {key: value for key, value in step.items() if key != "fn"}
+                for name, step in self._steps.items()
+            }
+
+    def _run(self):
+        for name in list(self._steps):
+            step = self._steps[name]
+            start = time.perf_counter()
+            with self._lock:
+                step["status"] = "warming"
+            try:
+                step["fn"]()
+            except Exception as e:
+                logger.error(f"Warm-up step {name} failed: {str(e)}")
+                status, error = "failed", str(e)
+            else:
+                status, error = "ready", None
+            with self._lock:
+                step["status"] = status
+                step["seconds"] = round(time.perf_counter() - start, 3)
+                if error:
+                    step["error"] = error
+            logger.info(f"Warm-up step {name}: {status} in {step['seconds']}s")
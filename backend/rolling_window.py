@@ -0,0 +1,33 @@
+"""Mean and percentiles over a trailing window of values.
+
+Kept free of third-party imports: google_clients.py uses it for call
+latencies, and importing app.py must not load NumPy or OpenCV through it.
+"""
+import bisect
+from collections import deque
+
+
+class RollingWindow:
+    """Mean and percentiles of the last ``size`` values, updated per value"""
+
+    def __init__(self, size):
+        self.values = deque(maxlen=size)
+        self.sorted = []
+        self.total = 0.0
+
+    def push(self, value):
+        if len(self.values) == self.values.maxlen:
+            oldest = self.values[0]
+            self.total -= oldest
+            del self.sorted[bisect.bisect_left(self.sorted, oldest)]
+        self.values.append(value)
+        self.total += value
+        bisect.insort(self.sorted, value)
+
+    def mean(self):
+        return self.total / len(self.values) if self.values else 0.0
+
+    def percentile(self, q):
+        if not self.sorted:
+            return 0.0
+        return self.sorted[min(int(q / 100.0 * len(self.sorted)), len(self.sorted) - 1)]
@@ -0,0 +1,107 @@
+"""Bounded worker pool that keeps each session's tasks in order.
+
+Tasks are queued per session and a fixed number of worker threads take them
+round-robin across sessions, one task per turn, so one session's work runs
+strictly in submission order while different sessions run in parallel. A
+session whose backlog reaches ``max_backlog`` has further tasks rejected,
+letting callers shed load (HTTP 429) instead of piling up threads and memory.
+Tasks that must not be shed can be given a higher bound of their own.
+"""
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger(__name__)
+
+
+class SessionExecutor:
+    def __init__(self, max_workers=2, max_backlog=8, label="session"):
+        self.max_workers = max(1, max_workers)
+        self.max_backlog = max_backlog
+        self.label = label
+        self._queues = {}  # session_id -> deque of waiting (fn, args)
+        self._ready = deque()  # Sessions with waiting tasks and none running
+        self._running = set()
+        self._cond = threading.Condition()
+        self._closed = False
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+        self._threads = [
+            threading.Thread(target=self._work, name=f"{label}-worker-{i}", daemon=True)
+            for i in range(self.max_workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+
+    def submit(self, session_id, fn, *args, max_backlog=None):
+        """Queue ``fn(*args)`` behind the session's earlier tasks; False if its backlog is full.
+
+        ``max_backlog`` replaces the executor's bound for this task.
+        """
+        with self._cond:
+            if self._closed:
+                return False
+            waiting = self._queues.setdefault(session_id, deque())
+            if len(waiting) >= (self.max_backlog if max_backlog is None else max_backlog):
+                self.rejected += 1
+                return False
+            waiting.append((fn, args))
+            if len(waiting) == 1 and session_id not in self._running:
+                self._ready.append(session_id)
+                self._cond.notify()
+        return True
+
+    def backlog(self, session_id):
+        with self._cond:
+            return len(self._queues.get(session_id, ()))
+
+    def stats(self):
+        with self._cond:
+            depths = [len(waiting) for waiting in self._queues.values()]
+            return {
+                "workers": self.max_workers,
+                "sessions": len(self._queues),
+                "running": len(self._running),
+                "queued": sum(depths),
+                "max_session_backlog": max(depths, default=0),
+                "completed": self.completed,
+                "failed": self.failed,
+                "rejected": self.rejected
+            }
+
+    def shutdown(self, timeout=5):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        for thread in self._threads:
+            thread.join(timeout=timeout)
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not self._ready and not self._closed:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                session_id = self._ready.popleft()
+                fn, args = self._queues[session_id].popleft()
+                self._running.add(session_id)
+
+            try:
+                fn(*args)
+                failed = False
+            except Exception as e:
+                logger.error(f"{self.label} task failed for session {session_id}: {str(e)}")
+                failed = True
+
+            with self._cond:
+                self._running.discard(session_id)
+                self.completed += 1
+                self.failed += failed
+                if self._queues[session_id]:
+                    # Back of the line, so busy sessions cannot starve the others
+                    self._ready.append(session_id)
+                    self._cond.notify()
+                else:
+                    del self._queues[session_id]
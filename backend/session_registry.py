@@ -0,0 +1,117 @@
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class SessionRegistry:
+    """Per-session objects, created lazily and evicted by idle time or LRU pressure.
+
+    Values are built with ``factory()`` on first use, or ``factory(session_id)``
+    when ``keyed`` is set, and closed (if they have a ``close`` method) when
+    they are evicted or released.
+    """
+
+    def __init__(self, factory, max_sessions=32, idle_timeout=300.0, label="session", keyed=False):
+        self.factory = factory
+        self.keyed = keyed
+        self.max_sessions = max_sessions
+        self.idle_timeout = idle_timeout
+        self.label = label
+        self._entries = OrderedDict()  # session_id -> (value, last_used), oldest first
+        self._lock = threading.Lock()
+
+    def get(self, session_id):
+        """Return the value for a session, creating it on first use"""
+        now = time.monotonic()
+        evicted = []
+        with self._lock:
+            evicted.extend(self._pop_idle(now))
+            entry = self._entries.pop(session_id, None)
+            if entry is None:
+                evicted.extend(self._pop_lru())
+                value = self.factory(session_id) if self.keyed else self.factory()
+            else:
+                value = entry[0]
+            self._entries[session_id] = (value, now)
+        self._close(evicted)
+        return value
+
+    def peek(self, session_id, touch=False):
+        """Return the value for a session without creating it; ``touch`` marks it as used"""
+        with self._lock:
+            entry = self._entries.get(session_id)
+            if entry is not None and touch:
+                self._entries.move_to_end(session_id)
+                self._entries[session_id] = (entry[0], time.monotonic())
+        return entry[0] if entry is not None else None
+
+    def put(self, session_id, value):
+        """Store a value built by the caller, closing the one it replaces"""
+        now = time.monotonic()
+        with self._lock:
+            evicted = self._pop_idle(now)
+            entry = self._entries.pop(session_id, None)
+            if entry is not None:
+                evicted.append(entry[0])
+            evicted.extend(self._pop_lru())
+            self._entries[session_id] = (value, now)
+        self._close(evicted)
+
+    def release(self, session_id):
+        with self._lock:
+            entry = self._entries.pop(session_id, None)
+        if entry is not None:
+            self._close([entry[0]])
+
+    def sweep(self):
+        """Close values that have been idle longer than the timeout"""
+        with self._lock:
+            evicted = self._pop_idle(time.monotonic())
+        self._close(evicted)
+        return len(evicted)
+
+    def close_all(self):
+        with self._lock:
+            values = [value for value, _ in self._entries.values()]
+            self._entries.clear()
+        self._close(values)
+
+    def __len__(self):
+        return len(self._entries)
+
+    def __contains__(self, session_id):
+        return session_id in self._entries
+
+    def _pop_lru(self):
+        # Make room for one more entry
+        evicted = []
+        while len(self._entries) >= self.max_sessions:
+            lru_id, (lru_value, _) = self._entries.popitem(last=False)
+            logger.warning(f"Session limit reached for {self.label} - evicting session {lru_id}")
+            evicted.append(lru_value)
+        return evicted
+
+    def _pop_idle(self, now):
+        # Entries are kept in last-used order, so idle ones are always at the front
+        evicted = []
+        while self._entries:
+            session_id, (value, last_used) = next(iter(self._entries.items()))
+            if now - last_used < self.idle_timeout:
+                break
+            del self._entries[session_id]
+            logger.info(f"Evicting idle {self.label} for session {session_id}")
+            evicted.append(value)
+        return evicted
+
+    @staticmethod
+    def _close(values):
+        for value in values:
+            close = getattr(value, "close", None)
+            if close is not None:
+                try:
+                    close()
+                except Exception as e:
+                    logger.error(f"Error closing session state: {str(e)}")
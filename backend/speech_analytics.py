@@ -0,0 +1,155 @@
+"""Per-session speaking metrics, updated word by word from final transcripts.
+
+Each in-order transcript segment (transcript.py) is folded into running
+totals, so the cost of an update is proportional to the words it adds and
+reading a snapshot never rescans the transcript:
+
+- words per minute over the whole answer and over a trailing window
+- pauses between consecutive words, as count, total, longest and a histogram
+- filler words and two-word filler phrases, counted across segment boundaries
+- spans of consecutive words the recognizer reported low confidence for
+
+Times are on the session's captured-audio timeline (speech_stream.py), so
+silence that vad.py cut before recognition still counts in pauses and rates.
+"""
+import bisect
+import os
+import threading
+from collections import Counter, deque
+
+from transcript import normalize_word
+
+SPEECH_PAUSE_MIN_SECONDS = float(os.getenv("SPEECH_PAUSE_MIN_SECONDS", "0.3"))
+SPEECH_WPM_WINDOW = float(os.getenv("SPEECH_WPM_WINDOW", "30"))
+SPEECH_LOW_CONFIDENCE = float(os.getenv("SPEECH_LOW_CONFIDENCE", "0.6"))
+SPEECH_MAX_LOW_CONFIDENCE_SPANS = int(os.getenv("SPEECH_MAX_LOW_CONFIDENCE_SPANS", "20"))
+
+# Upper edges, in seconds, of the pause histogram buckets; the last bucket is open-ended
+PAUSE_BUCKETS = (0.5, 1.0, 2.0, 3.0)
+
+FILLER_WORDS = frozenset(("um", "umm", "uh", "uhh", "uhm", "er", "erm", "ah", "hmm", "mm"))
+FILLER_PHRASES = frozenset((("you", "know"), ("i", "mean"), ("sort", "of"), ("kind", "of")))
+
+
+def _bucket_labels():
+    edges = (SPEECH_PAUSE_MIN_SECONDS,) + PAUSE_BUCKETS
+    labels = [f"{low:g}-{high:g}s" for low, high in zip(edges, edges[1:])]
+    return labels + [f"{PAUSE_BUCKETS[-1]:g}s+"]
+
+
+class SpeechAnalytics:
+    def __init__(self, pause_min=SPEECH_PAUSE_MIN_SECONDS, wpm_window=SPEECH_WPM_WINDOW,
+                 low_confidence=SPEECH_LOW_CONFIDENCE, max_spans=SPEECH_MAX_LOW_CONFIDENCE_SPANS):
+        self.pause_min = pause_min
+        self.wpm_window = wpm_window
+        self.low_confidence = low_confidence
+        self.words = 0
+        self.timed_words = 0
+        self.first_start = None
+        self.last_end = None
+        self.pauses = 0
+        self.pause_seconds = 0.0
+        self.longest_pause = 0.0
+        self.pause_histogram = [0] * (len(PAUSE_BUCKETS) + 1)
+        self.fillers = Counter()
+        self.confidence_total = 0.0
+        self.confidence_words = 0
+        self.low_confidence_words = 0
+        self.low_confidence_spans = deque(maxlen=max_spans)
+        self.low_confidence_span_count = 0
+        self._open_span = None  # [start, end, texts] while low-confidence words keep coming
+        self._recent = deque()  # End times of the words inside the trailing WPM window
+        self._previous = None  # Last normalised word, for phrases split across segments
+        self._lock = threading.Lock()
+
+    def add(self, segment):
+        """Fold a transcript Segment's words into the metrics"""
+        with self._lock:
+            if segment.words:
+                for word in segment.words:
+                    self._add_timed(word)
+            else:
+                for text in segment.text.split():
+                    self._add_text(text)
+
+    def snapshot(self):
+        with self._lock:
+            speaking = self.last_end - self.first_start if self.timed_words else 0.0
+            window = min(self.wpm_window, speaking)
+            spans = list(self.low_confidence_spans)
+            if self._open_span is not None:
+                spans.append(self._open_span)
+            filler_total = sum(self.fillers.values())
+            return {
+                "words": self.words,
+                "speaking_seconds": round(speaking, 2),
+                "wpm": round(self.timed_words * 60.0 / speaking, 1) if speaking > 0 else 0.0,
+                "recent_wpm": round(len(self._recent) * 60.0 / window, 1) if window > 0 else 0.0,
+                "pauses": {
+                    "count": self.pauses,
+                    "total_seconds": round(self.pause_seconds, 2),
+                    "mean_seconds": round(self.pause_seconds / self.pauses, 2) if self.pauses else 0.0,
+                    "longest_seconds": round(self.longest_pause, 2),
+                    "histogram": dict(zip(_bucket_labels(), self.pause_histogram))
+                },
+                "fillers": {
+                    "total": filler_total,
+                    "per_100_words": round(100.0 * filler_total / self.words, 1) if self.words else 0.0,
+                    "counts": dict(self.fillers.most_common())
+                },
+                "confidence": {
+                    "mean": round(self.confidence_total / self.confidence_words, 3) if self.confidence_words else None,
+                    "low_words": self.low_confidence_words,
+                    "low_spans": self.low_confidence_span_count + (self._open_span is not None),
+                    "recent_low_spans": [
+                        {"start": round(start, 2), "end": round(end, 2), "text": " ".join(texts)}
+                        for start, end, texts in spans[-self.low_confidence_spans.maxlen:]
+                    ]
+                }
+            }
+
+    def _add_timed(self, word):
+        if self.last_end is None:
+            self.first_start = word.start
+        else:
+            gap = word.start - self.last_end
+            if gap >= self.pause_min:
+                self.pauses += 1
+                self.pause_seconds += gap
+                self.longest_pause = max(self.longest_pause, gap)
+                self.pause_histogram[bisect.bisect_left(PAUSE_BUCKETS, gap)] += 1
+        self.last_end = max(word.end, self.last_end or word.end)
+        self.timed_words += 1
+
+        self._recent.append(word.end)
+        while self._recent[0] < self.last_end - self.wpm_window:
+            self._recent.popleft()
+
+        if word.confidence is not None:
+            self.confidence_total += word.confidence
+            self.confidence_words += 1
+            if word.confidence < self.low_confidence:
+                self.low_confidence_words += 1
+                if self._open_span is None:
+                    self._open_span = [word.start, word.end, [word.text]]
+                else:
+                    self._open_span[1] = word.end
+                    self._open_span[2].append(word.text)
+            else:
+                self._close_span()
+        self._add_text(word.text)
+
+    def _add_text(self, text):
+        self.words += 1
+        normalized = normalize_word(text)
+        if normalized in FILLER_WORDS:
+            self.fillers[normalized] += 1
+        elif (self._previous, normalized) in FILLER_PHRASES:
+            self.fillers[f"{self._previous} {normalized}"] += 1
+        self._previous = normalized
+
+    def _close_span(self):
+        if self._open_span is not None:
+            self.low_confidence_spans.append(tuple(self._open_span))
+            self.low_confidence_span_count += 1
+            self._open_span = None
@@ -0,0 +1,283 @@
+"""Streaming speech recognition, one long-lived stream per interview session.
+
+Audio chunks are fed to a SpeechSession as raw LINEAR16 PCM as soon as they
+arrive. A background thread keeps a provider stream open and hands interim and
+final transcripts to a callback as the provider produces them. Providers cap
+how long a single stream may run, so the session closes the stream shortly
+before SPEECH_STREAM_LIMIT seconds and opens a new one. Audio that has not yet
+been covered by a final result is replayed into the new stream, so words
+spoken across the switch are not lost. Finals are numbered and their word
+times moved onto the session's captured-audio timeline, so transcript.py can
+put them in order and drop the words a replay recognised twice. That timeline
+counts the audio as it was recorded, including silence vad.py cut before
+recognition, so pauses and speaking rates keep their real length.
+
+Providers sit behind SpeechBackend; FakeSpeechBackend needs no network and
+treats audio chunks as UTF-8 text, for tests and local development.
+"""
+import bisect
+import logging
+import os
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+from contextlib import nullcontext
+
+logger = logging.getLogger(__name__)
+
+SPEECH_SAMPLE_RATE = int(os.getenv("SPEECH_SAMPLE_RATE", "16000"))
+SPEECH_LANGUAGE = os.getenv("SPEECH_LANGUAGE", "en-US")
+SPEECH_STREAM_LIMIT = float(os.getenv("SPEECH_STREAM_LIMIT", "290"))  # Google closes streams at ~305 s
+SPEECH_IDLE_SECONDS = float(os.getenv("SPEECH_IDLE_SECONDS", "8"))
+SPEECH_RETRY_SECONDS = float(os.getenv("SPEECH_RETRY_SECONDS", "1"))
+SPEECH_MAX_PENDING_CHUNKS = int(os.getenv("SPEECH_MAX_PENDING_CHUNKS", "256"))
+SPEECH_REPLAY_CHUNKS = int(os.getenv("SPEECH_REPLAY_CHUNKS", "64"))
+
+# Times in seconds of audio; confidence (0-1) is only reported on final results
+Word = namedtuple("Word", ["text", "start", "end", "confidence"], defaults=(None,))
+TranscriptResult = namedtuple("TranscriptResult", ["text", "is_final", "confidence", "words", "seq"],
+                              defaults=((), None))
+
+
+class SpeechBackend:
+    """Speech provider: turns a stream of PCM chunks into transcript results"""
+
+    def recognize(self, chunks):
+        """Yield TranscriptResults for ``chunks`` until the iterator is exhausted"""
+        raise NotImplementedError
+
+
+class GoogleSpeechBackend(SpeechBackend):
+    """Google Cloud Speech-to-Text streaming recognition with interim results.
+
+    With ``clients`` (a google_clients.GoogleClients) streams run on the
+    process's shared SpeechClient and are timed in its metrics.
+    """
+
+    def __init__(self, clients=None, sample_rate=SPEECH_SAMPLE_RATE, language_code=SPEECH_LANGUAGE,
+                 stream_timeout=SPEECH_STREAM_LIMIT + 30):
+        from google.cloud import speech
+        self._speech = speech
+        self.clients = clients
+        self._client = None if clients is not None else speech.SpeechClient()
+        self.stream_timeout = stream_timeout
+        self.streaming_config = speech.StreamingRecognitionConfig(
+            config=speech.RecognitionConfig(
+                encoding=speech.RecognitionConfig.AudioEncoding.LINEAR16,
+                sample_rate_hertz=sample_rate,
+                language_code=language_code,
+                enable_automatic_punctuation=True,
+                model="latest_long",
+                use_enhanced=True,
+                audio_channel_count=1,
+                enable_word_time_offsets=True,
+                enable_word_confidence=True
+            ),
+            interim_results=True
+        )
+
+    def recognize(self, chunks):
+        client = self.clients.client("speech") if self.clients is not None else self._client
+        timed = self.clients.timed("speech", "streaming_recognize") if self.clients is not None else nullcontext()
+        requests = (self._speech.StreamingRecognizeRequest(audio_content=chunk) for chunk in chunks)
+        with timed:
+            responses = client.streaming_recognize(config=self.streaming_config, requests=requests,
+                                                   timeout=self.stream_timeout)
+            for response in responses:
+                for result in response.results:
+                    if not result.alternatives:
+                        continue
+                    alternative = result.alternatives[0]
+                    confidence = alternative.confidence if result.is_final else result.stability
+                    words = tuple(
+                        Word(word.word, word.start_time.total_seconds(), word.end_time.total_seconds(),
+                             word.confidence if result.is_final else None)
+                        for word in alternative.words
+                    )
+                    yield TranscriptResult(alternative.transcript.strip(), result.is_final, confidence, words)
+
+
+class FakeSpeechBackend(SpeechBackend):
+    """Offline backend that decodes each chunk as UTF-8 text.
+
+    Every chunk yields an interim result with the words heard so far in the
+    stream; the end of the stream yields them as one final result. Chunks are
+    timed as if their bytes were LINEAR16 audio, with words spread evenly.
+    """
+
+    def __init__(self, sample_rate=SPEECH_SAMPLE_RATE):
+        self.sample_rate = sample_rate
+        self.streams = 0
+        self.chunks = []
+
+    def recognize(self, chunks):
+        self.streams += 1
+        words = []
+        position = 0.0
+        for chunk in chunks:
+            self.chunks.append(chunk)
+            duration = len(chunk) / (2.0 * self.sample_rate)
+            texts = chunk.decode("utf-8", "replace").split()
+            step = duration / max(len(texts), 1)
+            words.extend(Word(text, position + i * step, position + (i + 1) * step) for i, text in enumerate(texts))
+            position += duration
+            yield TranscriptResult(" ".join(word.text for word in words), False, 0.0)
+        if words:
+            yield TranscriptResult(" ".join(word.text for word in words), True, 1.0,
+                                   tuple(word._replace(confidence=1.0) for word in words))
+
+
+class SpeechSession:
+    """Keeps one provider stream fed with a session's audio, reconnecting as needed.
+
+    ``on_result(result)`` is called from the session's thread for every
+    interim and final TranscriptResult; finals carry a per-session ``seq`` and
+    word times on the session's captured-audio timeline. A stream is only open while audio is
+    arriving: it is closed after SPEECH_IDLE_SECONDS without audio and
+    reopened by the next chunk.
+    """
+
+    def __init__(self, backend, on_result, stream_limit=SPEECH_STREAM_LIMIT, idle_seconds=SPEECH_IDLE_SECONDS,
+                 max_pending=SPEECH_MAX_PENDING_CHUNKS, sample_rate=SPEECH_SAMPLE_RATE, clock=time.monotonic):
+        self.backend = backend
+        self.on_result = on_result
+        self.stream_limit = stream_limit
+        self.idle_seconds = idle_seconds
+        self._clock = clock
+        self.sample_rate = sample_rate
+        self._chunks = queue.Queue(maxsize=max_pending)
+        # (start, end, chunk) in seconds of session audio, sent but not yet covered by a final result
+        self._unfinalized = deque(maxlen=SPEECH_REPLAY_CHUNKS)
+        self._unfinalized_lock = threading.Lock()
+        self._position = 0.0  # Session audio queued into streams so far, in seconds
+        self._captured = 0.0  # Session audio fed so far, trimmed or not, in seconds
+        # (start, captured start) of each chunk on the session timeline, back to the last final
+        self._timeline = []
+        self._stream_offset = 0.0  # Where the current stream's audio starts on the session timeline
+        self._final_seq = 0
+        self._closed = threading.Event()
+        self.streams = 0
+        self.dropped = 0
+        self._thread = threading.Thread(target=self._run, name="speech-stream", daemon=True)
+        self._thread.start()
+
+    def feed(self, pcm, offset=0.0, duration=None):
+        """Queue a LINEAR16 chunk; False if the session is closed or too far behind.
+
+        ``duration`` is how much audio was captured for the chunk and ``offset``
+        where in it ``pcm`` starts, when silence was trimmed before feeding; a
+        chunk trimmed to nothing is fed as empty ``pcm`` so its time still counts.
+        """
+        if self._closed.is_set():
+            return False
+        captured = self._captured + offset
+        self._captured += len(pcm) / (2.0 * self.sample_rate) if duration is None else duration
+        if not pcm:
+            return True
+        try:
+            self._chunks.put_nowait((pcm, captured))
+        except queue.Full:
+            self.dropped += 1
+            logger.warning("Speech stream backlog full - dropping audio chunk")
+            return False
+        return True
+
+    def close(self):
+        self._closed.set()
+        self._thread.join(timeout=5)
+
+    def _run(self):
+        while not self._closed.is_set():
+            # Idle sessions hold no provider stream; the next chunk opens one
+            chunk = self._next_chunk(timeout=0.5)
+            if chunk is None:
+                continue
+            with self._unfinalized_lock:
+                self._unfinalized.append(chunk)
+
+            self.streams += 1
+            try:
+                for result in self.backend.recognize(self._stream_chunks()):
+                    if result.is_final:
+                        self._finalized(result)
+                        result = self._place(result)
+                    self._deliver(result)
+            except Exception as e:
+                # The unfinalized audio is replayed into the next stream
+                logger.error(f"Speech stream error: {str(e)}")
+                self._closed.wait(SPEECH_RETRY_SECONDS)
+
+    def _stream_chunks(self):
+        """Audio for one provider stream: replayed chunks first, then live ones until a limit"""
+        started = self._clock()
+        with self._unfinalized_lock:
+            replay = list(self._unfinalized)
+        if replay:
+            self._stream_offset = replay[0][0]
+        for _, _, chunk in replay:
+            yield chunk
+
+        last_audio = self._clock()
+        while not self._closed.is_set():
+            now = self._clock()
+            if now - started >= self.stream_limit or now - last_audio >= self.idle_seconds:
+                return
+            chunk = self._next_chunk(timeout=0.1)
+            if chunk is None:
+                continue
+            last_audio = self._clock()
+            with self._unfinalized_lock:
+                self._unfinalized.append(chunk)
+            yield chunk[2]
+
+    def _next_chunk(self, timeout):
+        """Next queued chunk as (start, end, pcm) on the session timeline, or None"""
+        try:
+            pcm, captured = self._chunks.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        start = self._position
+        self._position += len(pcm) / (2.0 * self.sample_rate)
+        self._timeline.append((start, captured))
+        return start, self._position, pcm
+
+    def _place(self, result):
+        """Number a final result and move its word times onto the captured-audio timeline"""
+        self._final_seq += 1
+        offset = self._stream_offset
+        words = tuple(word._replace(start=self._to_captured(word.start + offset),
+                                    end=self._to_captured(word.end + offset, end=True))
+                      for word in result.words)
+        if words:
+            # Later finals start where this one ended; the chunk holding that point stays mapped
+            covered = bisect.bisect_right(self._timeline, (result.words[-1].end + offset, float("inf")))
+            del self._timeline[:max(0, covered - 1)]
+        return result._replace(words=words, seq=self._final_seq)
+
+    def _to_captured(self, position, end=False):
+        """A session-timeline time as captured time; an end on a chunk boundary stays with the earlier chunk"""
+        if not self._timeline:
+            return position
+        if end:
+            index = bisect.bisect_left(self._timeline, (position,))
+        else:
+            index = bisect.bisect_right(self._timeline, (position, float("inf")))
+        start, captured = self._timeline[max(0, index - 1)]
+        return captured + position - start
+
+    def _finalized(self, result):
+        # Keep audio the final result did not reach, so a reconnect replays only that
+        with self._unfinalized_lock:
+            if not result.words:
+                self._unfinalized.clear()
+                return
+            covered = result.words[-1].end + self._stream_offset
+            while self._unfinalized and self._unfinalized[0][1] <= covered:
+                self._unfinalized.popleft()
+
+    def _deliver(self, result):
+        try:
+            self.on_result(result)
+        except Exception as e:
+            logger.error(f"Transcript callback error: {str(e)}")
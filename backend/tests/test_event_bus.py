@@ -0,0 +1,64 @@
+import threading
+
+import pytest
+
+from event_bus import InProcessEventBus, create_event_bus
+
+
+@pytest.fixture
+def bus():
+    bus = InProcessEventBus()
+    yield bus
+    bus.close()
+
+
+def drain(bus):
+    done = threading.Event()
+    bus.subscribe("drained", lambda event, session_id: done.set())
+    bus.publish("drained", None)
+    assert done.wait(5)
+
+
+def test_events_reach_subscribers_in_order_with_their_session(bus):
+    received = []
+    bus.subscribe("updates", lambda event, session_id: received.append((event["n"], session_id)))
+    for n in range(3):
+        bus.publish("updates", {"session_id": "s1", "n": n})
+    bus.publish("updates", {"n": 3}, session_id="s2")
+    drain(bus)
+    assert received == [(0, "s1"), (1, "s1"), (2, "s1"), (3, "s2")]
+
+
+def test_topics_without_subscribers_are_not_queued(bus):
+    assert bus.publish("nobody_listens", {"session_id": "s1"})
+    assert bus.stats()["published"] == 0
+
+
+def test_a_full_queue_drops_instead_of_blocking():
+    bus = InProcessEventBus(max_queue=4)
+    release = threading.Event()
+    bus.subscribe("slow", lambda event, session_id: release.wait(5))
+    results = [bus.publish("slow", {"n": n}) for n in range(10)]
+    release.set()
+    bus.close()
+    assert not all(results)
+    assert bus.stats()["dropped"] == results.count(False)
+
+
+def test_a_failing_handler_does_not_stop_the_others(bus):
+    received = []
+
+    def fail(event, session_id):
+        raise RuntimeError("boom")
+
+    bus.subscribe("updates", fail)
+    bus.subscribe("updates", lambda event, session_id: received.append(event))
+    bus.publish("updates", {"session_id": "s1"})
+    drain(bus)
+    assert received == [{"session_id": "s1"}]
+    assert bus.stats()["failed"] == 1
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError):
+        create_event_bus("carrier-pigeon")
@@ -0,0 +1,95 @@
+import json
+
+import pytest
+
+import event_codec
+from event_codec import (FORMAT_VERSION, MAGIC, TYPE_JSON, TYPE_MEDIA, TYPE_SCORE, TYPE_TRANSCRIPT, JsonSerializer,
+                         decode_event, default_codec, encode_event)
+
+
+def event_type(data):
+    assert data[0] == MAGIC and data[1] == FORMAT_VERSION
+    return data[2]
+
+
+def test_scores_round_trip_in_their_schema():
+    event = {"session_id": "s1", "engagement_score": 0.75, "positivity_score": 0.5}
+    data = encode_event(event)
+    assert event_type(data) == TYPE_SCORE
+    assert decode_event(data) == pytest.approx(event)
+    assert len(data) < len(json.dumps(event))
+
+
+@pytest.mark.parametrize("event", [
+    {"session_id": "s1", "transcript": "hello world", "confidence": 0.875, "is_final": True},
+    {"session_id": "s1", "transcript": "hello", "is_final": False},
+    {"transcript": "no session"},
+])
+def test_transcripts_round_trip(event):
+    data = encode_event(event)
+    assert event_type(data) == TYPE_TRANSCRIPT
+    expected = dict(event, is_final=event.get("is_final", False))
+    assert decode_event(data) == expected
+
+
+def test_errors_round_trip_with_and_without_a_type():
+    for event in ({"session_id": "s1", "error": "boom", "type": "audio_processing"},
+                  {"session_id": "s1", "error": "boom"}):
+        assert decode_event(encode_event(event)) == event
+
+
+def test_events_outside_the_schemas_fall_back_to_tagged_json():
+    for event in ({"session_id": "s1", "speech_metrics": {"wpm": 120.0}},
+                  {"session_id": "s1", "engagement_score": None},
+                  {"session_id": "x" * 300, "engagement_score": 0.5}):
+        data = encode_event(event)
+        assert event_type(data) == TYPE_JSON
+        assert decode_event(data) == event
+
+
+def test_legacy_json_messages_are_still_read():
+    event = {"session_id": "s1", "engagement_score": 0.5}
+    assert decode_event(json.dumps(event).encode("utf-8")) == event
+    assert decode_event(JsonSerializer().serialize(event)) == event
+
+
+def test_a_newer_format_version_is_rejected():
+    data = bytearray(encode_event({"session_id": "s1", "transcript": "hi"}))
+    data[1] = FORMAT_VERSION + 1
+    with pytest.raises(ValueError):
+        decode_event(bytes(data))
+
+
+def test_an_unknown_event_type_is_rejected():
+    with pytest.raises(ValueError):
+        decode_event(bytes([MAGIC, FORMAT_VERSION, 99, 2]) + b"s1")
+
+
+def test_score_fields_from_a_newer_producer_are_skipped(monkeypatch):
+    monkeypatch.setattr(event_codec, "SCORE_FIELDS", event_codec.SCORE_FIELDS + ("future_score",))
+    monkeypatch.setattr(event_codec, "_SCORE_CODES",
+                        {name: code for code, name in enumerate(event_codec.SCORE_FIELDS)})
+    data = encode_event({"session_id": "s1", "engagement_score": 0.5, "future_score": 0.25})
+    monkeypatch.undo()
+    assert decode_event(data) == {"session_id": "s1", "engagement_score": 0.5}
+
+
+@pytest.mark.parametrize("kind", ["binary", "json"])
+def test_topic_codec_round_trips_every_topic(kind):
+    codec = default_codec(kind)
+    events = {
+        "interview_updates": {"session_id": "s1", "engagement_score": 0.5},
+        "interview_transcripts": {"session_id": "s1", "transcript": "hi", "confidence": 0.5, "is_final": True},
+        "interview_errors": {"session_id": "s1", "error": "boom", "type": "audio_processing"},
+        "some_other_topic": {"session_id": "s1", "anything": [1, 2]},
+    }
+    for topic, event in events.items():
+        assert codec.deserialize(topic, codec.serialize(topic, event)) == event
+
+
+def test_video_frames_travel_as_raw_bytes():
+    codec = default_codec()
+    frame = b"\xff\xd8jpeg bytes\xff\xd9"
+    data = codec.serialize("video_stream", frame)
+    assert event_type(data) == TYPE_MEDIA and data.endswith(frame)
+    assert codec.deserialize("video_stream", data) == frame
@@ -0,0 +1,61 @@
+from quality_controller import QUALITY_LEVELS, QualityController
+
+
+class Clocks:
+    """Wall and CPU clocks advanced by hand"""
+
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+
+    def tick(self, seconds, busy):
+        self.wall += seconds
+        self.cpu += seconds * busy
+
+
+def controller(clocks, **kwargs):
+    return QualityController(clock=lambda: clocks.wall, cpu_clock=lambda: clocks.cpu, **kwargs)
+
+
+def run(quality, clocks, checks, busy, depth=0, capacity=8):
+    for _ in range(checks):
+        clocks.tick(1.0, busy)
+        quality.observe_queue(depth, capacity)
+        profile = quality.profile()
+    return profile.mode
+
+
+def test_a_busy_worker_without_backlog_keeps_its_quality():
+    clocks = Clocks()
+    quality = controller(clocks)
+    assert run(quality, clocks, checks=5, busy=1.0) != "mesh_only"
+    assert quality.level <= 1
+
+
+def test_a_backlog_with_a_busy_cpu_steps_down_to_mesh_only():
+    clocks = Clocks()
+    quality = controller(clocks)
+    assert run(quality, clocks, checks=5, busy=1.0, depth=1) == "mesh_only"
+
+
+def test_a_full_queue_steps_down_even_on_an_idle_cpu():
+    clocks = Clocks()
+    quality = controller(clocks)
+    assert run(quality, clocks, checks=5, busy=0.1, depth=8) == "mesh_only"
+
+
+def test_a_latency_overrun_counts_as_falling_behind():
+    clocks = Clocks()
+    quality = controller(clocks)
+    quality.observe_latency("emotion", 0.5)
+    run(quality, clocks, checks=1, busy=0.2)
+    assert quality.level == 2
+
+
+def test_quality_recovers_one_level_per_calm_spell():
+    clocks = Clocks()
+    quality = controller(clocks, start_level=len(QUALITY_LEVELS) - 1, recover_after=3)
+    run(quality, clocks, checks=3, busy=0.1)
+    assert quality.level == len(QUALITY_LEVELS) - 2
+    run(quality, clocks, checks=6, busy=0.1)
+    assert quality.level == 0
@@ -0,0 +1,72 @@
+import time
+
+from session_registry import SessionRegistry
+
+
+class Closable:
+    def __init__(self, session_id=None):
+        self.session_id = session_id
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+def test_get_creates_once_per_session():
+    registry = SessionRegistry(Closable)
+    first = registry.get("a")
+    assert registry.get("a") is first
+    assert registry.get("b") is not first
+    assert len(registry) == 2
+
+
+def test_keyed_factory_receives_session_id():
+    registry = SessionRegistry(Closable, keyed=True)
+    assert registry.get("a").session_id == "a"
+
+
+def test_least_recently_used_is_evicted_and_closed():
+    registry = SessionRegistry(Closable, max_sessions=2)
+    a, b = registry.get("a"), registry.get("b")
+    registry.get("a")  # b is now the least recently used
+    registry.get("c")
+    assert "b" not in registry and b.closed
+    assert "a" in registry and not a.closed
+
+
+def test_peek_does_not_create_and_touch_refreshes_lru_order():
+    registry = SessionRegistry(Closable, max_sessions=2)
+    assert registry.peek("a") is None and "a" not in registry
+    a = registry.get("a")
+    registry.get("b")
+    assert registry.peek("a", touch=True) is a
+    registry.get("c")
+    assert "a" in registry and "b" not in registry
+
+
+def test_idle_sessions_are_swept():
+    registry = SessionRegistry(Closable, idle_timeout=0.05)
+    a = registry.get("a")
+    time.sleep(0.1)
+    b = registry.get("b")  # Evicts a on the way
+    assert a.closed and "a" not in registry
+    time.sleep(0.1)
+    assert registry.sweep() == 1 and b.closed
+
+
+def test_put_closes_the_value_it_replaces():
+    registry = SessionRegistry(None)
+    old, new = Closable(), Closable()
+    registry.put("a", old)
+    registry.put("a", new)
+    assert old.closed and not new.closed
+    assert registry.peek("a") is new
+
+
+def test_release_and_close_all_close_values():
+    registry = SessionRegistry(Closable)
+    a, b = registry.get("a"), registry.get("b")
+    registry.release("a")
+    assert a.closed and "a" not in registry
+    registry.close_all()
+    assert b.closed and len(registry) == 0
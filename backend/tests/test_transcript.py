@@ -0,0 +1,73 @@
+from speech_stream import TranscriptResult, Word
+from transcript import TranscriptAssembler
+
+
+def final(seq, *words, text=None):
+    """A final result from (text, start, end) triples, or from text alone"""
+    timed = tuple(Word(word, start, end, 0.9) for word, start, end in words)
+    return TranscriptResult(text if text is not None else " ".join(w.text for w in timed), True, 0.9, timed, seq)
+
+
+def texts(segments):
+    return [segment.text for segment in segments]
+
+
+def test_results_are_released_in_seq_order():
+    assembler = TranscriptAssembler()
+    assert assembler.add(final(2, ("world", 1.0, 1.5))) == []
+    assert texts(assembler.add(final(1, ("hello", 0.0, 0.5)))) == ["hello", "world"]
+    assert assembler.text() == "hello world"
+
+
+def test_a_seq_already_released_is_ignored():
+    assembler = TranscriptAssembler()
+    assembler.add(final(1, ("hello", 0.0, 0.5)))
+    assert assembler.add(final(1, ("hello", 0.0, 0.5))) == []
+
+
+def test_a_lost_result_does_not_hold_the_transcript_back_forever():
+    assembler = TranscriptAssembler(max_pending=2)
+    assembler.add(final(2, ("b", 1.0, 1.5)))
+    assembler.add(final(3, ("c", 2.0, 2.5)))
+    assert texts(assembler.add(final(4, ("d", 3.0, 3.5)))) == ["b", "c", "d"]
+
+
+def test_replayed_words_are_dropped_by_time():
+    assembler = TranscriptAssembler()
+    assembler.add(final(1, ("hello", 0.0, 0.5), ("there", 0.6, 1.0)))
+    segments = assembler.add(final(2, ("there", 0.6, 1.0), ("friend", 1.1, 1.6)))
+    assert texts(segments) == ["friend"]
+    assert segments[0].start == 1.1 and segments[0].end == 1.6
+    assert assembler.summary()["duplicate_words"] == 1
+
+
+def test_boundary_word_with_shifted_times_is_dropped():
+    assembler = TranscriptAssembler()
+    assembler.add(final(1, ("hello", 0.0, 0.5), ("there", 0.6, 1.0)))
+    assert texts(assembler.add(final(2, ("there", 0.62, 1.04), ("friend", 1.1, 1.6)))) == ["friend"]
+
+
+def test_words_at_the_start_of_the_session_are_kept():
+    assembler = TranscriptAssembler()
+    assert texts(assembler.add(final(1, ("um", 0.0, 0.0), ("hello", 0.0, 0.4)))) == ["um hello"]
+
+
+def test_text_only_results_drop_the_repeated_tail():
+    assembler = TranscriptAssembler()
+    assembler.add(final(1, text="I have worked on"))
+    segments = assembler.add(final(2, text="worked on distributed systems"))
+    assert texts(segments) == ["distributed systems"]
+
+
+def test_a_fully_repeated_result_adds_nothing():
+    assembler = TranscriptAssembler()
+    assembler.add(final(1, ("hello", 0.0, 0.5)))
+    assert assembler.add(final(2, ("hello", 0.0, 0.5))) == []
+    assert assembler.summary()["segments"] == 1
+
+
+def test_finals_are_counted_whether_kept_or_not():
+    assembler = TranscriptAssembler()
+    assembler.add(final(1, ("hello", 0.0, 0.5)))
+    assembler.add(final(1, ("hello", 0.0, 0.5)))
+    assert assembler.finals == 2
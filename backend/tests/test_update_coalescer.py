@@ -0,0 +1,89 @@
+import time
+
+import pytest
+
+from update_coalescer import UpdateCoalescer
+
+
+class Recorder:
+    def __init__(self):
+        self.sent = []
+
+    def __call__(self, session_id, payload):
+        self.sent.append((time.monotonic(), session_id, payload))
+
+    def payloads(self):
+        return [payload for _, _, payload in self.sent]
+
+
+@pytest.fixture
+def recorder():
+    return Recorder()
+
+
+@pytest.fixture
+def coalescer(recorder):
+    coalescer = UpdateCoalescer(recorder, max_rate=10, epsilon=0.01)
+    yield coalescer
+    coalescer.close()
+
+
+def test_first_update_is_sent_at_once(coalescer, recorder):
+    coalescer.update("s1", {"engagement_score": 0.5})
+    assert recorder.payloads() == [{"engagement_score": 0.5}]
+
+
+def test_updates_within_the_interval_are_merged_into_one_flush(coalescer, recorder):
+    coalescer.update("s1", {"engagement_score": 0.5})
+    coalescer.update("s1", {"engagement_score": 0.6})
+    coalescer.update("s1", {"engagement_score": 0.7, "emotion": "happy"})
+    time.sleep(0.25)
+    assert recorder.payloads() == [{"engagement_score": 0.5}, {"engagement_score": 0.7, "emotion": "happy"}]
+
+
+def test_flushes_per_session_are_capped_at_the_max_rate(coalescer, recorder):
+    until = time.monotonic() + 0.5
+    value = 0.0
+    while time.monotonic() < until:
+        value += 0.1
+        coalescer.update("s1", {"engagement_score": value})
+        time.sleep(0.005)
+    time.sleep(0.15)
+    times = [sent_at for sent_at, _, _ in recorder.sent]
+    assert len(times) <= 7
+    assert min(b - a for a, b in zip(times, times[1:])) >= 0.09
+    assert recorder.payloads()[-1] == {"engagement_score": value}
+
+
+def test_sessions_are_rate_limited_independently(coalescer, recorder):
+    coalescer.update("s1", {"engagement_score": 0.5})
+    coalescer.update("s2", {"engagement_score": 0.5})
+    assert [session_id for _, session_id, _ in recorder.sent] == ["s1", "s2"]
+
+
+def test_changes_below_epsilon_are_not_sent(coalescer, recorder):
+    coalescer.update("s1", {"engagement_score": 0.5, "emotion": "happy"})
+    time.sleep(0.15)
+    coalescer.update("s1", {"engagement_score": 0.505, "emotion": "happy"})
+    time.sleep(0.15)
+    assert len(recorder.sent) == 1
+    coalescer.update("s1", {"engagement_score": 0.52})
+    assert recorder.payloads()[-1] == {"engagement_score": 0.52}
+
+
+def test_meta_fields_travel_with_a_flush_but_never_cause_one(coalescer, recorder):
+    coalescer.update("s1", {"seq": 1})
+    time.sleep(0.15)
+    assert recorder.sent == []
+    coalescer.update("s1", {"engagement_score": 0.5, "seq": 2})
+    assert recorder.payloads() == [{"engagement_score": 0.5, "seq": 2}]
+
+
+def test_discard_drops_the_pending_update(coalescer, recorder):
+    coalescer.update("s1", {"text": "hello"})
+    coalescer.update("s1", {"text": "hello wor"})
+    coalescer.discard("s1")
+    time.sleep(0.2)
+    assert recorder.payloads() == [{"text": "hello"}]
+    coalescer.update("s1", {"text": "hello"})  # Forgotten, so sent again
+    assert recorder.payloads()[-1] == {"text": "hello"}
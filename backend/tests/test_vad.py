@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from vad import VoiceActivityDetector
+
+RATE = 16000
+
+
+def level(samples, db):
+    return (samples / np.sqrt(np.mean(samples ** 2)) * 10 ** (db / 20)).astype(np.float32)
+
+
+def noise(seconds, db, seed=0):
+    return level(np.random.default_rng(seed).standard_normal(int(seconds * RATE)), db)
+
+
+def voice(seconds, db=-20):
+    """A 150 Hz voice with syllable-rate loudness changes"""
+    t = np.arange(int(seconds * RATE)) / RATE
+    envelope = 0.55 + 0.45 * np.sin(2 * np.pi * 4 * t)
+    return level(envelope * (np.sin(2 * np.pi * 150 * t) + 0.4 * np.sin(2 * np.pi * 300 * t)), db)
+
+
+def test_silence_is_dropped_whole():
+    vad = VoiceActivityDetector()
+    chunk = noise(1.0, -70)
+    assert vad.trim(chunk, RATE) == (None, len(chunk))
+    assert vad.stats()["silent_chunks"] == 1
+
+
+@pytest.mark.parametrize("db", [-50, -40, -30])
+def test_steady_noise_is_not_speech_however_loud(db):
+    vad = VoiceActivityDetector()
+    speech, _ = vad.trim(noise(2.0, db), RATE)
+    assert speech is None
+
+
+def test_speech_is_trimmed_to_its_region_plus_hangover():
+    vad = VoiceActivityDetector()
+    chunk = np.concatenate([noise(1.0, -60, seed=1), voice(1.0), noise(1.0, -60, seed=2)])
+    speech, start = vad.trim(chunk, RATE)
+    hangover = int(RATE * vad.hangover_ms / 1000)
+    frame = int(RATE * vad.frame_ms / 1000)
+    assert RATE - hangover - frame <= start <= RATE - hangover + frame
+    assert RATE <= len(speech) <= RATE + 2 * (hangover + frame)
+    np.testing.assert_array_equal(speech, chunk[start:start + len(speech)])
+
+
+def test_continuous_speech_is_kept_whole():
+    vad = VoiceActivityDetector()
+    chunk = voice(1.0)
+    speech, start = vad.trim(chunk, RATE)
+    assert start == 0 and len(speech) == len(chunk)
+
+
+def test_speech_shorter_than_the_minimum_is_dropped():
+    vad = VoiceActivityDetector(min_speech_ms=300)
+    chunk = np.concatenate([noise(1.0, -60), voice(0.1), noise(1.0, -60, seed=1)])
+    speech, _ = vad.trim(chunk, RATE)
+    assert speech is None
+
+
+def test_stats_count_the_audio_skipped():
+    vad = VoiceActivityDetector()
+    vad.trim(noise(1.0, -70), RATE)
+    vad.trim(voice(1.0), RATE)
+    stats = vad.stats()
+    assert stats["chunks"] == 2
+    assert stats["seconds_in"] == pytest.approx(2.0)
+    assert stats["skipped_fraction"] == pytest.approx(0.5, abs=0.01)
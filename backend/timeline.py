@@ -0,0 +1,132 @@
+"""Per-session engagement timeline in fixed-capacity NumPy ring buffers.
+
+Every analysed frame appends one timestamped row. Summary statistics (running
+mean, EMA and percentiles over a trailing window) are updated as rows arrive,
+so reading them never rescans the series. ``series()`` returns the recorded
+interview downsampled into time buckets for plotting.
+"""
+import os
+import threading
+import time
+
+import numpy as np
+
+from emotion_labels import EMOTION_LABELS
+from rolling_window import RollingWindow
+
+TIMELINE_CAPACITY = int(os.getenv("TIMELINE_CAPACITY", "8192"))
+TIMELINE_WINDOW = int(os.getenv("TIMELINE_WINDOW", "30"))
+TIMELINE_EMA_ALPHA = float(os.getenv("TIMELINE_EMA_ALPHA", "0.1"))
+
+EMOTION_CODES = {label: code for code, label in enumerate(EMOTION_LABELS)}
+UNKNOWN_EMOTION = 255
+
+# "engagement" is the face score alone; "fused_engagement" also weighs in the voice (prosody.py)
+METRICS = ("engagement", "blink_rate", "head_movement", "positivity", "fused_engagement")
+PERCENTILES = (10, 50, 90)
+
+
+class RunningStats:
+    def __init__(self, window=TIMELINE_WINDOW, alpha=TIMELINE_EMA_ALPHA):
+        self.alpha = alpha
+        self.count = 0
+        self.total = 0.0
+        self.ema = None
+        self.window = RollingWindow(window)
+
+    def push(self, value):
+        self.count += 1
+        self.total += value
+        self.ema = value if self.ema is None else self.alpha * value + (1 - self.alpha) * self.ema
+        self.window.push(value)
+
+    def summary(self):
+        summary = {
+            "mean": self.total / self.count if self.count else 0.0,
+            "ema": self.ema or 0.0,
+            "window_mean": self.window.mean()
+        }
+        for q in PERCENTILES:
+            summary[f"p{q}"] = self.window.percentile(q)
+        return summary
+
+
+class EngagementTimeline:
+    """Fixed-capacity, column-oriented ring buffer of frame metrics for one session"""
+
+    def __init__(self, capacity=TIMELINE_CAPACITY):
+        self.capacity = capacity
+        self.timestamps = np.zeros(capacity, dtype=np.float64)
+        self.emotions = np.full(capacity, UNKNOWN_EMOTION, dtype=np.uint8)
+        self.columns = {name: np.zeros(capacity, dtype=np.float32) for name in METRICS}
+        self.stats = {name: RunningStats() for name in METRICS}
+        self.count = 0  # Total rows ever appended; the buffer keeps the last `capacity`
+        self.started_at = None
+        self._lock = threading.Lock()
+
+    def append(self, engagement, emotion, blink_rate, head_movement, positivity, timestamp=None,
+               fused_engagement=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        values = {
+            "engagement": engagement,
+            "blink_rate": blink_rate,
+            "head_movement": head_movement,
+            "positivity": positivity,
+            "fused_engagement": engagement if fused_engagement is None else fused_engagement
+        }
+        with self._lock:
+            if self.started_at is None:
+                self.started_at = timestamp
+            i = self.count % self.capacity
+            self.timestamps[i] = timestamp
+            self.emotions[i] = EMOTION_CODES.get(emotion, UNKNOWN_EMOTION)
+            for name, value in values.items():
+                self.columns[name][i] = value
+                self.stats[name].push(float(value))
+            self.count += 1
+
+    def summary(self):
+        with self._lock:
+            return {
+                "count": self.count,
+                "started_at": self.started_at,
+                "metrics": {name: stats.summary() for name, stats in self.stats.items()}
+            }
+
+    def series(self, resolution=100):
+        """The recorded rows averaged into at most ``resolution`` equal time buckets"""
+        with self._lock:
+            order = self._chronological()
+            timestamps = self.timestamps[order]
+            emotions = self.emotions[order]
+            columns = {name: column[order] for name, column in self.columns.items()}
+
+        result = {"t": [], "emotion": []}
+        result.update({name: [] for name in METRICS})
+        if not len(timestamps):
+            return result
+
+        edges = np.linspace(timestamps[0], timestamps[-1], max(1, resolution) + 1)
+        starts = np.unique(np.searchsorted(timestamps, edges[:-1], side="left"))
+        starts = starts[starts < len(timestamps)]
+        sizes = np.diff(np.append(starts, len(timestamps)))
+
+        result["t"] = (np.add.reduceat(timestamps, starts) / sizes).tolist()
+        for name, column in columns.items():
+            result[name] = (np.add.reduceat(column.astype(np.float64), starts) / sizes).tolist()
+        # Most frequent emotion per bucket
+        result["emotion"] = [
+            _emotion_label(np.bincount(emotions[start:start + size]).argmax())
+            for start, size in zip(starts.tolist(), sizes.tolist())
+        ]
+        return result
+
+    def _chronological(self):
+        if self.count <= self.capacity:
+            return np.arange(self.count)
+        head = self.count % self.capacity
+        return np.concatenate((np.arange(head, self.capacity), np.arange(head)))
+
+
+def _emotion_label(code):
+    return EMOTION_LABELS[code] if code < len(EMOTION_LABELS) else None
@@ -0,0 +1,111 @@
+"""Per-session transcript assembled from numbered final speech results.
+
+Final results carry a per-session ``seq`` and word times on the session's
+audio timeline (see speech_stream.py). Results are released strictly in seq
+order; one that arrives early waits for the gaps before it. Consecutive
+results may overlap where audio was replayed into a new stream, so words that
+end before the transcript's current end (within TRANSCRIPT_OVERLAP_TOLERANCE)
+are dropped. Results without word times fall back to trimming the longest
+run of leading words that repeats the transcript's tail.
+"""
+import os
+import threading
+from collections import namedtuple
+
+TRANSCRIPT_OVERLAP_TOLERANCE = float(os.getenv("TRANSCRIPT_OVERLAP_TOLERANCE", "0.05"))
+TRANSCRIPT_MAX_PENDING = int(os.getenv("TRANSCRIPT_MAX_PENDING", "32"))
+TEXT_OVERLAP_WORDS = 8
+
+# ``words`` are the kept Words, or () for a result without word times
+Segment = namedtuple("Segment", ["seq", "text", "start", "end", "words"])
+
+
+def normalize_word(word):
+    return word.strip(".,!?;:\"'").lower()
+
+
+class TranscriptAssembler:
+    def __init__(self, tolerance=TRANSCRIPT_OVERLAP_TOLERANCE, max_pending=TRANSCRIPT_MAX_PENDING):
+        self.tolerance = tolerance
+        self.max_pending = max_pending
+        self.segments = []
+        self.words = []  # Every kept word, for text-only overlap checks
+        self.end = None  # Session audio time covered so far; None until a timed word is kept
+        self.duplicates = 0
+        self.finals = 0  # Final results received, kept or not; what interim transcripts are versioned by
+        self._pending = {}
+        self._next_seq = 1
+        self._lock = threading.Lock()
+
+    def add(self, result):
+        """Accept a final result; returns the new Segments now ready, in order"""
+        with self._lock:
+            self.finals += 1
+            if result.seq is None:
+                return self._append(result)
+            if result.seq < self._next_seq:
+                return []
+            self._pending[result.seq] = result
+            if len(self._pending) > self.max_pending:
+                # A result was lost; skip the gap rather than hold the transcript back forever
+                self._next_seq = min(self._pending)
+
+            ready = []
+            while self._next_seq in self._pending:
+                ready.extend(self._append(self._pending.pop(self._next_seq)))
+                self._next_seq += 1
+            return ready
+
+    def text(self):
+        with self._lock:
+            return " ".join(segment.text for segment in self.segments)
+
+    def summary(self):
+        with self._lock:
+            return {
+                "segments": len(self.segments),
+                "words": len(self.words),
+                "duplicate_words": self.duplicates,
+                "pending": len(self._pending),
+                "audio_seconds": self.end or 0.0
+            }
+
+    def _append(self, result):
+        if result.words:
+            kept = list(result.words)
+            if self.end is not None:
+                kept = [word for word in kept if word.end > self.end + self.tolerance]
+                # The boundary word can be re-recognised with slightly shifted times
+                if kept and self.words and normalize_word(kept[0].text) == normalize_word(self.words[-1]) \
+                        and kept[0].start < self.end + self.tolerance:
+                    kept = kept[1:]
+            self.duplicates += len(result.words) - len(kept)
+            if not kept:
+                return []
+            texts = [word.text for word in kept]
+            start, end = kept[0].start, kept[-1].end
+            self.end = end if self.end is None else max(self.end, end)
+            kept = tuple(kept)
+        else:
+            texts = result.text.split()
+            overlap = self._text_overlap(texts)
+            self.duplicates += overlap
+            texts = texts[overlap:]
+            if not texts:
+                return []
+            start = end = self.end or 0.0
+            kept = ()
+
+        segment = Segment(result.seq, " ".join(texts), start, end, kept)
+        self.words.extend(texts)
+        self.segments.append(segment)
+        return [segment]
+
+    def _text_overlap(self, texts):
+        """Length of the longest prefix of texts that repeats the end of the transcript"""
+        tail = [normalize_word(word) for word in self.words[-TEXT_OVERLAP_WORDS:]]
+        head = [normalize_word(word) for word in texts[:TEXT_OVERLAP_WORDS]]
+        for size in range(min(len(tail), len(head)), 0, -1):
+            if tail[-size:] == head[:size]:
+                return size
+        return 0
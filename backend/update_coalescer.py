@@ -0,0 +1,138 @@
+"""Per-session coalescing of Socket.IO updates, flushed at a bounded rate.
+
+Producers hand over fields as they compute them (a frame's scores, a Kafka
+update, speech metrics). Fields waiting for the same session are merged,
+later values replacing earlier ones, and sent together at most
+UPDATE_MAX_RATE times a second. Only fields that differ from what the
+session was last sent go out; numbers count as changed once they move by
+UPDATE_EPSILON, below what the client can display. ``META_FIELDS`` such as
+the frame seq travel with a flush but never cause one.
+"""
+import heapq
+import logging
+import os
+import threading
+import time
+
+from session_registry import SessionRegistry
+
+logger = logging.getLogger(__name__)
+
+UPDATE_MAX_RATE = float(os.getenv("UPDATE_MAX_RATE", "4"))  # Flushes per second per session
+UPDATE_EPSILON = float(os.getenv("UPDATE_EPSILON", "0.005"))  # Scores are shown as whole percents
+
+META_FIELDS = frozenset(("seq",))
+
+_MISSING = object()
+
+
+class _SessionUpdates:
+    def __init__(self):
+        self.pending = {}
+        self.meta = {}
+        self.sent = {}
+        self.last_flush = float("-inf")
+        self.scheduled = False
+        self.emit_lock = threading.Lock()  # Keeps one session's flushes in order
+
+
+def _changed(old, new, epsilon):
+    if old is _MISSING:
+        return True
+    if isinstance(new, float) and isinstance(old, (int, float)) and not isinstance(old, bool):
+        return abs(new - old) >= epsilon
+    return old != new
+
+
+class UpdateCoalescer:
+    def __init__(self, emit, max_rate=UPDATE_MAX_RATE, epsilon=UPDATE_EPSILON, label="update"):
+        self.emit = emit  # emit(session_id, payload)
+        self.interval = 1.0 / max_rate if max_rate > 0 else 0.0
+        self.epsilon = epsilon
+        self.label = label
+        self.sessions = SessionRegistry(_SessionUpdates, max_sessions=4096, idle_timeout=3600,
+                                        label=f"{label} coalescer")
+        self.received = 0
+        self.emitted = 0
+        self.suppressed = 0
+        self._due = []  # Heap of (flush time, session_id)
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, name=f"{label}-coalescer", daemon=True)
+        self._thread.start()
+
+    def update(self, session_id, fields):
+        """Merge fields into the session's pending update and flush it now or when the rate allows"""
+        state = self.sessions.get(session_id)
+        with self._cond:
+            self.received += 1
+            for name, value in fields.items():
+                if name in META_FIELDS:
+                    state.meta[name] = value
+                elif _changed(state.sent.get(name, _MISSING), value, self.epsilon):
+                    state.pending[name] = value
+                else:
+                    # Back to what the client already shows: nothing to send for it
+                    state.pending.pop(name, None)
+                    self.suppressed += 1
+
+            if not state.pending:
+                return
+            due = state.last_flush + self.interval
+            if time.monotonic() < due:
+                if not state.scheduled:
+                    state.scheduled = True
+                    heapq.heappush(self._due, (due, session_id))
+                    self._cond.notify()
+                return
+        self._flush(session_id, state)
+
+    def discard(self, session_id):
+        """Forget what was sent to a session and drop anything pending for it"""
+        self.sessions.release(session_id)
+
+    def stats(self):
+        with self._cond:
+            return {
+                "received": self.received,
+                "emitted": self.emitted,
+                "suppressed_fields": self.suppressed,
+                "scheduled": len(self._due),
+                "max_rate": 1.0 / self.interval if self.interval else None
+            }
+
+    def close(self, timeout=5):
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+        self._thread.join(timeout=timeout)
+
+    def _flush(self, session_id, state):
+        with state.emit_lock:
+            with self._cond:
+                state.scheduled = False
+                if not state.pending:
+                    return
+                payload = state.pending
+                state.pending = {}
+                state.sent.update(payload)
+                payload.update(state.meta)
+                state.meta = {}
+                state.last_flush = time.monotonic()
+                self.emitted += 1
+            try:
+                self.emit(session_id, payload)
+            except Exception as e:
+                logger.error(f"{self.label} emit failed for session {session_id}: {str(e)}")
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and (not self._due or self._due[0][0] > time.monotonic()):
+                    self._cond.wait(self._due[0][0] - time.monotonic() if self._due else None)
+                if self._closed:
+                    return
+                _, session_id = heapq.heappop(self._due)
+            state = self.sessions.peek(session_id)
+            if state is not None:
+                self._flush(session_id, state)
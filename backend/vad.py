@@ -0,0 +1,110 @@
+"""Energy and zero-crossing voice activity detection for speech chunks.
+
+Each chunk is split into VAD_FRAME_MS frames. A frame is voiced when its
+energy clears the chunk's noise floor (10th percentile of frame energy) by
+VAD_MARGIN_DB, and is at least the absolute VAD_MIN_DB. Steady noise, hiss
+or hum, never rises that far above its own floor, however loud it is, so a
+chunk of it has no voiced frames. Speech dips between syllables and words,
+so even a chunk of continuous speech does. Quieter frames with a
+fricative-like zero-crossing rate also count, but only within
+UNVOICED_REACH_MS of a voiced frame, so the "s" and "f" sounds at word edges
+are kept without accepting hiss alone. The detected region is padded by
+VAD_HANGOVER_MS so word onsets and tails survive the trim.
+
+Chunks with less than VAD_MIN_SPEECH_MS of voiced frames are dropped before
+any network call; the rest are trimmed to the speech region.
+"""
+import os
+import threading
+
+import numpy as np
+
+VAD_FRAME_MS = float(os.getenv("VAD_FRAME_MS", "30"))
+VAD_MIN_DB = float(os.getenv("VAD_MIN_DB", "-45"))
+VAD_MARGIN_DB = float(os.getenv("VAD_MARGIN_DB", "10"))
+VAD_HANGOVER_MS = float(os.getenv("VAD_HANGOVER_MS", "200"))
+VAD_MIN_SPEECH_MS = float(os.getenv("VAD_MIN_SPEECH_MS", "150"))
+
+# Zero crossings per sample typical of unvoiced consonants, how far below the threshold they may sit
+# and how far from a voiced frame
+UNVOICED_ZCR = (0.15, 0.5)
+UNVOICED_DROP_DB = 8.0
+UNVOICED_REACH_MS = 150.0
+
+
+def frame_features(mono, rate, frame_ms=VAD_FRAME_MS):
+    """Per-frame energy in dBFS and zero-crossing rate (crossings per sample)"""
+    size = max(1, int(rate * frame_ms / 1000))
+    count = len(mono) // size
+    frames = mono[:count * size].reshape(count, size)
+    energy_db = 10 * np.log10(np.mean(np.square(frames), axis=1) + 1e-10)
+    zcr = np.count_nonzero(np.diff(np.signbit(frames), axis=1), axis=1) / size
+    return energy_db, zcr, size
+
+
+class VoiceActivityDetector:
+    """Trims chunks to their speech and counts how much audio was skipped"""
+
+    def __init__(self, frame_ms=VAD_FRAME_MS, min_db=VAD_MIN_DB, margin_db=VAD_MARGIN_DB,
+                 hangover_ms=VAD_HANGOVER_MS, min_speech_ms=VAD_MIN_SPEECH_MS):
+        self.frame_ms = frame_ms
+        self.min_db = min_db
+        self.margin_db = margin_db
+        self.hangover_ms = hangover_ms
+        self.min_speech_ms = min_speech_ms
+        self.chunks = 0
+        self.silent_chunks = 0
+        self.seconds_in = 0.0
+        self.seconds_out = 0.0
+        self._lock = threading.Lock()
+
+    def speech_frames(self, mono, rate):
+        """Boolean speech mask per frame, and the frame size in samples"""
+        energy_db, zcr, size = frame_features(mono, rate, self.frame_ms)
+        if not len(energy_db):
+            return np.zeros(0, dtype=bool), size
+        threshold = max(self.min_db, np.percentile(energy_db, 10) + self.margin_db)
+        voiced = energy_db >= threshold
+        if len(np.flatnonzero(voiced)) * self.frame_ms < self.min_speech_ms:
+            # Nothing stands out from the floor: silence or steady noise
+            return np.zeros(len(energy_db), dtype=bool), size
+
+        reach = int(UNVOICED_REACH_MS // self.frame_ms)
+        near_voiced = np.convolve(voiced, np.ones(2 * reach + 1), mode="same") > 0
+        unvoiced = (near_voiced & (energy_db >= threshold - UNVOICED_DROP_DB)
+                    & (zcr >= UNVOICED_ZCR[0]) & (zcr <= UNVOICED_ZCR[1]))
+        return voiced | unvoiced, size
+
+    def trim(self, mono, rate):
+        """(speech, start): the chunk cut to its speech region and the sample that region starts at.
+
+        A chunk without speech comes back as (None, len(mono)), all of it dropped.
+        """
+        mask, size = self.speech_frames(mono, rate)
+        speech = np.flatnonzero(mask)
+        if len(speech) * self.frame_ms < self.min_speech_ms:
+            self._record(len(mono), 0, rate)
+            return None, len(mono)
+
+        pad = int(rate * self.hangover_ms / 1000)
+        start = max(0, int(speech[0]) * size - pad)
+        end = min(len(mono), (int(speech[-1]) + 1) * size + pad)
+        self._record(len(mono), end - start, rate)
+        return mono[start:end], start
+
+    def stats(self):
+        with self._lock:
+            return {
+                "chunks": self.chunks,
+                "silent_chunks": self.silent_chunks,
+                "seconds_in": self.seconds_in,
+                "seconds_sent": self.seconds_out,
+                "skipped_fraction": 1.0 - self.seconds_out / self.seconds_in if self.seconds_in else 0.0
+            }
+
+    def _record(self, samples_in, samples_out, rate):
+        with self._lock:
+            self.chunks += 1
+            self.silent_chunks += int(samples_out == 0)
+            self.seconds_in += samples_in / rate
+            self.seconds_out += samples_out / rate
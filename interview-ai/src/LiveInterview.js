@@ -29,13 +29,21 @@ function LiveInterview({ interviewData }) {
   const [answeredQuestions, setAnsweredQuestions] = useState([]);
   const [allFeedback, setAllFeedback] = useState([]);
   const [lastUpdate, setLastUpdate] = useState(null);
+  const [speechMetrics, setSpeechMetrics] = useState(null);
   const [videoProcessing, setVideoProcessing] = useState(false);
   const [engagementTips, setEngagementTips] = useState([]);
 
   const mediaRecorder = useRef(null);
   const webcamRef = useRef(null);
   const socket = useRef(null);
+  const mediaSocket = useRef(null);
+  const frameCredits = useRef(0);
+  const frameSeq = useRef(0);
+  const audioSeq = useRef(0);
+  const finalTranscript = useRef("");
+  const latestScores = useRef({});
   const videoIntervalRef = useRef(null);
+  const sessionId = useRef(window.crypto.randomUUID());
   const [retryCount, setRetryCount] = useState(0);
 
   // Engagement tips based on score
@@ -99,6 +107,8 @@ function LiveInterview({ interviewData }) {
       socket.current = io(API_URL, {
         reconnectionAttempts: 5,
         reconnectionDelay: 1000,
+        // Joins this interview's room so only our own analysis updates arrive
+        query: { session_id: sessionId.current },
       });
 
       socket.current.on("connect", () => {
@@ -120,7 +130,11 @@ function LiveInterview({ interviewData }) {
         console.error("Socket connection error:", err);
       });
 
-      socket.current.on("update", (data) => {
+      const handleAnalysisError = (data) => {
+        console.error("Video processing error:", data.error);
+      };
+
+      const handleUpdate = (data) => {
         if (data.transcript) {
           // Clean up the transcript before setting state
           const cleanTranscript = data.transcript
@@ -135,19 +149,65 @@ function LiveInterview({ interviewData }) {
           });
         }
 
-        if (data.engagement_score !== undefined || data.emotion) {
+        if (data.speech_metrics) {
+          setSpeechMetrics(data.speech_metrics);
+        }
+
+        if (data.engagement_score !== undefined || data.fused_engagement_score !== undefined || data.emotion) {
+          // Updates carry only the fields that changed; the rest are as last sent
+          const scores = { ...latestScores.current, ...data };
+          latestScores.current = scores;
+
           const positivityScore = calculatePositivityScore(
-            data.emotion || 'neutral',
-            data.engagement_score || 0
+            scores.emotion || 'neutral',
+            scores.engagement_score || 0
           );
 
           setPositivityScore(Math.round(positivityScore * 100));
           setLastUpdate(Date.now());
 
-          if (data.engagement_score !== undefined) {
-            setEngagementScore(Math.round(data.engagement_score * 100));
+          // Face and voice combined when the server has recent speech for this session
+          const engagement = scores.fused_engagement_score ?? scores.engagement_score;
+          if (engagement !== undefined) {
+            setEngagementScore(Math.round(engagement * 100));
           }
         }
+      };
+
+      socket.current.on("analysis_error", handleAnalysisError);
+      socket.current.on("update", handleUpdate);
+
+      // Streaming recognition: interim text is replaced until its final result arrives
+      socket.current.on("transcript", (data) => {
+        const text = (data.text || "").replace(/\s+/g, ' ').trim();
+        if (data.is_final) {
+          finalTranscript.current = `${finalTranscript.current} ${text}`.trim();
+          setTranscript(finalTranscript.current);
+        } else {
+          setTranscript(`${finalTranscript.current} ${text}`.trim());
+        }
+      });
+
+      // Frames and audio chunks are streamed as binary events on the same
+      // connection; the server grants frame credits and returns them with results
+      mediaSocket.current = io(`${API_URL}/media`, {
+        reconnectionAttempts: 5,
+        reconnectionDelay: 1000,
+        query: { session_id: sessionId.current },
+      });
+
+      mediaSocket.current.on("credits", (data) => {
+        frameCredits.current = data.credits;
+      });
+
+      mediaSocket.current.on("analysis_error", (data) => {
+        frameCredits.current = data.credits;
+        handleAnalysisError(data);
+      });
+
+      mediaSocket.current.on("update", (data) => {
+        frameCredits.current = data.credits;
+        handleUpdate(data);
       });
 
       const calculatePositivityScore = (emotion, engagementScore) => {
@@ -168,6 +228,7 @@ function LiveInterview({ interviewData }) {
 
       return () => {
         socket.current.disconnect();
+        mediaSocket.current.disconnect();
       };
     };
 
@@ -175,6 +236,7 @@ function LiveInterview({ interviewData }) {
 
     return () => {
       if (socket.current) socket.current.disconnect();
+      if (mediaSocket.current) mediaSocket.current.disconnect();
       if (videoIntervalRef.current) clearInterval(videoIntervalRef.current);
       if (mediaRecorder.current) {
         mediaRecorder.current.stopRecording();
@@ -218,20 +280,25 @@ function LiveInterview({ interviewData }) {
         video: true
       });
 
+      // Opus in WebM is about a tenth of the size of 16 kHz WAV; the server keeps
+      // one decoder per recording, so each slice only carries new audio
       mediaRecorder.current = new RecordRTC(stream, {
         type: "audio",
-        mimeType: "audio/wav",
-        recorderType: RecordRTC.StereoAudioRecorder,
-        timeSlice: 5000,
-        desiredSampRate: 16000,
-        numberOfAudioChannels: 1,
-        bufferSize: 4096,
+        mimeType: "audio/webm;codecs=opus",
+        recorderType: RecordRTC.MediaStreamRecorder,
+        timeSlice: 1000,
+        audioBitsPerSecond: 16000,
         ondataavailable: async (blob) => {
           try {
             const audioBuffer = await blob.arrayBuffer();
-            const formData = new FormData();
-            formData.append("audio", new Blob([audioBuffer], { type: "audio/wav" }), "audio.wav");
-            await axios.post(`${API_URL}/send_audio`, formData);
+            audioSeq.current += 1;
+            const ack = await mediaSocket.current
+              .timeout(10000)
+              .emitWithAck("audio", { seq: audioSeq.current, data: audioBuffer });
+
+            if (ack.status === "error") {
+              throw new Error(ack.error);
+            }
           } catch (err) {
             console.error("Error sending audio:", err);
             setError({
@@ -246,30 +313,31 @@ function LiveInterview({ interviewData }) {
       mediaRecorder.current.startRecording();
 
       videoIntervalRef.current = setInterval(async () => {
-        if (webcamRef.current) {
+        // Skip the tick while every granted frame is still being analysed
+        if (webcamRef.current && frameCredits.current > 0) {
           try {
             setVideoProcessing(true);
             const screenshot = webcamRef.current.getScreenshot();
             if (screenshot) {
               const res = await fetch(screenshot);
-              const blob = await res.blob();
-              const formData = new FormData();
-              formData.append("video", blob, "frame.jpeg");
-
-              const response = await axios.post(`${API_URL}/send_video`, formData, {
-                headers: {
-                  'Content-Type': 'multipart/form-data'
-                },
-                timeout: 5000
-              });
+              const frame = await (await res.blob()).arrayBuffer();
+              frameSeq.current += 1;
+              frameCredits.current -= 1;
 
-              if (response.data.status === "error") {
-                console.error("Video processing error:", response.data.error);
+              const ack = await mediaSocket.current
+                .timeout(5000)
+                .emitWithAck("frame", { seq: frameSeq.current, data: frame });
+
+              if (ack.credits !== undefined) {
+                frameCredits.current = ack.credits;
+              }
+              if (ack.status === "error") {
+                console.error("Video processing error:", ack.error);
               }
             }
           } catch (err) {
             console.error("Error sending video:", err);
-            if (!err.response) {
+            if (!mediaSocket.current?.connected) {
               setError({
                 message: "Video analysis service unavailable",
                 type: "analysis",
@@ -323,6 +391,7 @@ function LiveInterview({ interviewData }) {
         {
           question: getCurrentQuestion(),
           response: transcript,
+          session_id: sessionId.current,
         },
         { timeout: 20000 }
       );
@@ -361,9 +430,14 @@ function LiveInterview({ interviewData }) {
     }
   };
 
+  const clearTranscript = () => {
+    finalTranscript.current = "";
+    setTranscript("");
+  };
+
   const changeQuestion = (index) => {
     setCurrentQuestionIndex(index);
-    setTranscript("");
+    clearTranscript();
     setFeedback(null);
     setPositivityScore(0);
     setEngagementScore(0);
@@ -384,7 +458,7 @@ function LiveInterview({ interviewData }) {
   const moveToNextQuestion = () => {
     if (currentQuestionIndex < interviewData.questions.length - 1) {
       setCurrentQuestionIndex(prev => prev + 1);
-      setTranscript("");
+      clearTranscript();
       setFeedback(null);
       setPositivityScore(0);
       setEngagementScore(0);
@@ -567,6 +641,18 @@ function LiveInterview({ interviewData }) {
                         ></div>
                       </div>
                     </div>
+                    {speechMetrics && (
+                      <div className="metric">
+                        <div className="metric-header">
+                          <span className="metric-label">Pace</span>
+                          <span className="metric-value">{Math.round(speechMetrics.recent_wpm)} wpm</span>
+                        </div>
+                        <div className="metric-header">
+                          <span className="metric-label">Fillers</span>
+                          <span className="metric-value">{speechMetrics.fillers.total}</span>
+                        </div>
+                      </div>
+                    )}
                     <div className="metric">
                       <span className="metric-label">Analysis</span>
                       <div className="update-indicator" data-active={lastUpdate > Date.now() - 4000}>
@@ -592,7 +678,7 @@ function LiveInterview({ interviewData }) {
                   <h3>Live Transcript:</h3>
                   <button
                     className="btn-clear-transcript"
-                    onClick={() => setTranscript("")}
+                    onClick={clearTranscript}
                     disabled={!transcript}
                   >
                     Clear
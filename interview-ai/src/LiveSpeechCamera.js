@@ -3,13 +3,18 @@ import Webcam from "react-webcam";
 import RecordRTC from "recordrtc";
 import { io } from "socket.io-client";
 
-const API_URL = "http://127.0.0.1:5000";
 const SOCKET_URL = "http://127.0.0.1:5000"; // Using HTTP URL for Socket.IO
 
 function LiveSpeechCamera() {
   const webcamRef = useRef(null);
   const mediaRecorder = useRef(null);
   const videoIntervalRef = useRef(null);
+  const sessionId = useRef(window.crypto.randomUUID());
+  const mediaSocket = useRef(null);
+  const frameCredits = useRef(0);
+  const frameSeq = useRef(0);
+  const audioSeq = useRef(0);
+  const finalTranscript = useRef("");
 
   const [recording, setRecording] = useState(false);
   const [transcript, setTranscript] = useState("");
@@ -19,7 +24,10 @@ function LiveSpeechCamera() {
 
   // ✅ Connect via Socket.IO instead of raw WebSocket
   useEffect(() => {
-    const socket = io(SOCKET_URL, { transports: ["websocket"] });
+    const socket = io(SOCKET_URL, {
+      transports: ["websocket"],
+      query: { session_id: sessionId.current },
+    });
 
     socket.on("connect", () => {
       console.log("✅ Connected to Socket.IO!");
@@ -39,6 +47,18 @@ function LiveSpeechCamera() {
       }
     });
 
+    // Interim results overwrite the current line until the final one arrives
+    socket.on("transcript", (data) => {
+      if (data.is_final) {
+        finalTranscript.current = finalTranscript.current
+          ? `${finalTranscript.current}\n${data.text}`
+          : data.text;
+        setTranscript(finalTranscript.current);
+      } else {
+        setTranscript(`${finalTranscript.current}\n${data.text}`.trim());
+      }
+    });
+
     socket.on("error", (err) => {
       console.error("❌ Socket.IO Error:", err);
       setError(err);
@@ -48,8 +68,38 @@ function LiveSpeechCamera() {
       console.log("❌ Socket.IO Disconnected!");
     });
 
+    // Binary frame/audio channel, multiplexed over the same connection
+    mediaSocket.current = io(`${SOCKET_URL}/media`, {
+      transports: ["websocket"],
+      query: { session_id: sessionId.current },
+    });
+
+    mediaSocket.current.on("credits", (data) => {
+      frameCredits.current = data.credits;
+    });
+
+    mediaSocket.current.on("update", (data) => {
+      console.log("📡 Frame result:", data);
+      frameCredits.current = data.credits;
+      // Only changed fields are sent; keep the others as they were
+      if (data.emotion !== undefined || data.engagement_score !== undefined) {
+        setEmotions((prev) => ({
+          dominant: data.emotion ?? prev.dominant,
+          engagement: data.engagement_score ?? prev.engagement,
+        }));
+      }
+      if (data.positivity_score !== undefined) {
+        setPositivityScore(data.positivity_score);
+      }
+    });
+
+    mediaSocket.current.on("analysis_error", (data) => {
+      frameCredits.current = data.credits;
+    });
+
     return () => {
       socket.disconnect();
+      mediaSocket.current.disconnect();
     };
   }, []);
 
@@ -64,25 +114,23 @@ function LiveSpeechCamera() {
       // Capture an image every 3 seconds for emotion analysis
       videoIntervalRef.current = setInterval(() => captureImage(), 3000);
 
+      // Opus slices of one WebM stream, decoded incrementally on the server
       mediaRecorder.current = new RecordRTC(stream, {
         type: "audio",
-        mimeType: "audio/wav",
-        recorderType: RecordRTC.StereoAudioRecorder,
-        timeSlice: 2000,
+        mimeType: "audio/webm;codecs=opus",
+        recorderType: RecordRTC.MediaStreamRecorder,
+        timeSlice: 1000,
+        audioBitsPerSecond: 16000,
         ondataavailable: async (blob) => {
-          if (blob.size < 500) return;
-
-          const formData = new FormData();
-          formData.append("audio", blob, "audio.wav");
+          if (!blob.size) return;
 
           try {
-            const response = await fetch(`${API_URL}/send_audio`, {
-              method: "POST",
-              body: formData,
-            });
-            if (!response.ok) {
-              const errorData = await response.json();
-              throw new Error(errorData.error || "Error sending audio to server");
+            audioSeq.current += 1;
+            const ack = await mediaSocket.current
+              .timeout(10000)
+              .emitWithAck("audio", { seq: audioSeq.current, data: await blob.arrayBuffer() });
+            if (ack.status === "error") {
+              throw new Error(ack.error || "Error sending audio to server");
             }
           } catch (err) {
             console.error("❌ Error sending audio:", err);
@@ -123,22 +171,24 @@ function LiveSpeechCamera() {
 
   // ✅ Capture an image from the webcam and send it for video processing
   const captureImage = async () => {
-    if (!webcamRef.current) return;
+    // Wait for a credit rather than queueing frames the server cannot analyse yet
+    if (!webcamRef.current || frameCredits.current <= 0) return;
     const imageSrc = webcamRef.current.getScreenshot();
     if (!imageSrc) return;
 
     try {
       const blob = await fetch(imageSrc).then((res) => res.blob());
-      const formData = new FormData();
-      formData.append("video", blob, "video.jpeg");
-
-      const response = await fetch(`${API_URL}/send_video`, {
-        method: "POST",
-        body: formData,
-      });
-      if (!response.ok) {
-        const errorData = await response.json();
-        throw new Error(errorData.error || "Error sending video frame to server");
+      frameSeq.current += 1;
+      frameCredits.current -= 1;
+
+      const ack = await mediaSocket.current
+        .timeout(5000)
+        .emitWithAck("frame", { seq: frameSeq.current, data: await blob.arrayBuffer() });
+      if (ack.credits !== undefined) {
+        frameCredits.current = ack.credits;
+      }
+      if (ack.status === "error") {
+        throw new Error(ack.error || "Error sending video frame to server");
       }
     } catch (err) {
       console.error("❌ Error sending video:", err);